@@ -516,18 +516,7 @@ class TaskRoutes:
         if detailed:
             task_info.update({
                 'payload': task.payload,
-                'requirements': {
-                    'min_cpu_cores': task.requirements.min_cpu_cores,
-                    'min_memory_gb': task.requirements.min_memory_gb,
-                    'min_storage_gb': task.requirements.min_storage_gb,
-                    'required_platform': task.requirements.required_platform,
-                    'required_role': task.requirements.required_role,
-                    'required_tags': task.requirements.required_tags,
-                    'gpu_required': task.requirements.gpu_required,
-                    'internet_required': task.requirements.internet_required,
-                    'timeout_seconds': task.requirements.timeout_seconds,
-                    'max_retries': task.requirements.max_retries
-                },
+                'requirements': task.requirements.to_dict(),
                 'metadata': task.metadata,
                 'error_history': task.error_history,
                 'result': task.result.to_dict() if task.result else None
@@ -8,6 +8,7 @@ import sys
 import os
 import platform
 import socket
+from functools import lru_cache
 from pathlib import Path
 
 from ..core.config import WorkerConfig
@@ -15,6 +16,7 @@ from ..core.logger import get_logger
 from ..communication.client import ClusterClient
 
 
+@lru_cache(maxsize=1)
 def generate_device_id():
     """Generate a unique device ID based on system information"""
     try:
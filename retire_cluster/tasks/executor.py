@@ -98,8 +98,7 @@ class TaskExecutor:
         # Tags check
         if requirements.required_tags:
             device_tags = set(self.capabilities.get('tags', []))
-            required_tags = set(requirements.required_tags)
-            if not required_tags.issubset(device_tags):
+            if not requirements.required_tags.issubset(device_tags):
                 return False
         
         return True
@@ -4,11 +4,54 @@ Integration modules for external task execution frameworks
 
 import asyncio
 import json
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Callable, List
 import logging
 
-from .task import Task, TaskStatus, TaskResult, TaskRequirements
+from .task import Task, TaskStatus, TaskResult, TaskRequirements, TERMINAL_STATUSES
+
+
+class TerminalResultCache:
+    """
+    Thread-safe LRU cache of results for tasks in a terminal status
+    
+    Terminal results never change, so repeated status polls for finished
+    tasks can be answered locally instead of calling the cluster again.
+    """
+    
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._results: OrderedDict = OrderedDict()  # task_id -> TaskResult
+        self._lock = threading.Lock()
+    
+    def get(self, task_id: str) -> Optional[TaskResult]:
+        """Return the cached result for a task, if any"""
+        with self._lock:
+            result = self._results.get(task_id)
+            if result is not None:
+                self._results.move_to_end(task_id)
+            return result
+    
+    def put(self, task_id: str, result: Optional[TaskResult]) -> None:
+        """Cache a result if it is terminal, evicting the least recently used"""
+        if result is None or result.status not in TERMINAL_STATUSES:
+            return
+        
+        with self._lock:
+            self._results[task_id] = result
+            self._results.move_to_end(task_id)
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+    
+    def discard(self, task_id: str) -> None:
+        """Forget a cached result"""
+        with self._lock:
+            self._results.pop(task_id, None)
+    
+    def __len__(self) -> int:
+        return len(self._results)
 
 
 class ExternalFrameworkIntegration(ABC):
@@ -17,6 +60,7 @@ class ExternalFrameworkIntegration(ABC):
     def __init__(self, cluster_client):
         self.cluster_client = cluster_client
         self.logger = logging.getLogger(f"integration.{self.__class__.__name__}")
+        self._terminal_cache = TerminalResultCache()
     
     @abstractmethod
     def submit_task(self, task_type: str, payload: Dict[str, Any], **kwargs) -> str:
@@ -113,6 +157,10 @@ class TemporalIntegration(ExternalFrameworkIntegration):
         if not workflow_info:
             return None
         
+        cached = self._terminal_cache.get(workflow_id)
+        if cached is not None:
+            return cached.status
+        
         # Get status from cluster
         task_id = workflow_info['task_id']
         return self.cluster_client.get_task_status(task_id)
@@ -123,8 +171,14 @@ class TemporalIntegration(ExternalFrameworkIntegration):
         if not workflow_info:
             return None
         
+        cached = self._terminal_cache.get(workflow_id)
+        if cached is not None:
+            return cached
+        
         task_id = workflow_info['task_id']
-        return self.cluster_client.get_task_result(task_id)
+        result = self.cluster_client.get_task_result(task_id)
+        self._terminal_cache.put(workflow_id, result)
+        return result
     
     def cancel_task(self, workflow_id: str) -> bool:
         """Cancel task via Temporal"""
@@ -176,6 +230,16 @@ class CeleryIntegration(ExternalFrameworkIntegration):
     tasks on Retire-Cluster devices
     """
     
+    # Map Celery states to TaskStatus
+    _CELERY_STATE_MAPPING = {
+        'PENDING': TaskStatus.PENDING,
+        'STARTED': TaskStatus.RUNNING,
+        'SUCCESS': TaskStatus.SUCCESS,
+        'FAILURE': TaskStatus.FAILED,
+        'REVOKED': TaskStatus.CANCELLED,
+        'RETRY': TaskStatus.RUNNING
+    }
+    
     def __init__(self, cluster_client, celery_app=None):
         super().__init__(cluster_client)
         self.celery_app = celery_app
@@ -208,61 +272,61 @@ class CeleryIntegration(ExternalFrameworkIntegration):
     
     def _register_cluster_task(self):
         """Register a Celery task that executes on Retire-Cluster"""
+        integration = self
         
         @self.celery_app.task(bind=True)
         def execute_on_retire_cluster(self, task_type: str, payload: Dict[str, Any], requirements: Dict[str, Any] = None):
             """Celery task that executes on Retire-Cluster"""
-            # Create cluster task
-            task_requirements = TaskRequirements(**requirements) if requirements else TaskRequirements()
-            task = Task(
-                task_type=task_type,
-                payload=payload,
-                requirements=task_requirements
-            )
-            
-            # Submit to cluster
-            cluster_task_id = self.cluster_client.submit_task(task)
-            
-            # Store mapping
-            celery_task_id = self.request.id
-            self._task_mapping[celery_task_id] = cluster_task_id
-            
-            # Wait for completion (using Celery's retry mechanism)
+            return integration._execute_on_cluster(self, task_type, payload, requirements)
+        
+        self.execute_on_retire_cluster = execute_on_retire_cluster
+    
+    def _execute_on_cluster(self, celery_task, task_type: str, payload: Dict[str, Any],
+                            requirements: Optional[Dict[str, Any]] = None):
+        """Body of the registered Celery task, bound to celery_task"""
+        # Create cluster task
+        task_requirements = TaskRequirements(**requirements) if requirements else TaskRequirements()
+        task = Task(
+            task_type=task_type,
+            payload=payload,
+            requirements=task_requirements
+        )
+        
+        # Submit to cluster
+        cluster_task_id = self.cluster_client.submit_task(task)
+        self._task_mapping[celery_task.request.id] = cluster_task_id
+        
+        wait_for_task = getattr(self.cluster_client, 'wait_for_task', None)
+        if wait_for_task is not None:
+            # Block on the queue's terminal event instead of re-publishing
+            # retries through the broker while the task runs
+            if not wait_for_task(cluster_task_id, timeout=task_requirements.timeout_seconds):
+                raise TimeoutError(
+                    f"Cluster task {cluster_task_id} did not finish within "
+                    f"{task_requirements.timeout_seconds}s"
+                )
+        else:
+            # Remote clients have no event source, fall back to Celery's retry mechanism
             status = self.cluster_client.get_task_status(cluster_task_id)
             
             if status in [TaskStatus.PENDING, TaskStatus.QUEUED, TaskStatus.ASSIGNED, TaskStatus.RUNNING]:
                 # Task still running, retry after delay
-                raise self.retry(countdown=5, max_retries=None)
-            
-            # Task completed
-            result = self.cluster_client.get_task_result(cluster_task_id)
-            
-            if result.status == TaskStatus.SUCCESS:
-                return result.result_data
-            else:
-                raise Exception(result.error_message)
+                raise celery_task.retry(countdown=5, max_retries=None)
         
-        self.execute_on_retire_cluster = execute_on_retire_cluster
+        # Task completed
+        result = self.cluster_client.get_task_result(cluster_task_id)
+        
+        if result.status == TaskStatus.SUCCESS:
+            return result.result_data
+        else:
+            raise Exception(result.error_message)
     
     def submit_task(self, task_type: str, payload: Dict[str, Any], **kwargs) -> str:
         """Submit task via Celery"""
         if not self.celery_available or not self.celery_app:
             raise RuntimeError("Celery not available or not initialized")
         
-        requirements = kwargs.get('requirements', {})
-        if isinstance(requirements, TaskRequirements):
-            requirements = {
-                'min_cpu_cores': requirements.min_cpu_cores,
-                'min_memory_gb': requirements.min_memory_gb,
-                'min_storage_gb': requirements.min_storage_gb,
-                'required_platform': requirements.required_platform,
-                'required_role': requirements.required_role,
-                'required_tags': requirements.required_tags,
-                'gpu_required': requirements.gpu_required,
-                'internet_required': requirements.internet_required,
-                'timeout_seconds': requirements.timeout_seconds,
-                'max_retries': requirements.max_retries
-            }
+        requirements = self._requirements_to_dict(kwargs.get('requirements', {}))
         
         # Submit via Celery
         celery_task = self.execute_on_retire_cluster.delay(
@@ -273,25 +337,50 @@ class CeleryIntegration(ExternalFrameworkIntegration):
         
         return celery_task.id
     
+    def submit_tasks(self, specs: List[Dict[str, Any]]) -> List[str]:
+        """
+        Submit several tasks via Celery in one group publish
+        
+        Each spec is a dict with 'task_type', 'payload' and optional
+        'requirements'. The group is sent over a single producer, so the
+        broker sees one publish round instead of one per task.
+        """
+        if not self.celery_available or not self.celery_app:
+            raise RuntimeError("Celery not available or not initialized")
+        
+        if not specs:
+            return []
+        
+        signatures = [
+            self.execute_on_retire_cluster.s(
+                task_type=spec['task_type'],
+                payload=spec.get('payload', {}),
+                requirements=self._requirements_to_dict(spec.get('requirements', {}))
+            )
+            for spec in specs
+        ]
+        
+        group_result = self.celery_module.group(signatures).apply_async()
+        return [result.id for result in group_result.results]
+    
+    def _requirements_to_dict(self, requirements) -> Dict[str, Any]:
+        """Convert task requirements to a Celery-serializable dict"""
+        if isinstance(requirements, TaskRequirements):
+            return requirements.to_dict()
+        return requirements or {}
+    
     def get_task_status(self, celery_task_id: str) -> Optional[TaskStatus]:
         """Get task status via Celery"""
         if not self.celery_app:
             return None
         
+        cached = self._terminal_cache.get(celery_task_id)
+        if cached is not None:
+            return cached.status
+        
         try:
             celery_task = self.celery_app.AsyncResult(celery_task_id)
-            
-            # Map Celery states to TaskStatus
-            state_mapping = {
-                'PENDING': TaskStatus.PENDING,
-                'STARTED': TaskStatus.RUNNING,
-                'SUCCESS': TaskStatus.SUCCESS,
-                'FAILURE': TaskStatus.FAILED,
-                'REVOKED': TaskStatus.CANCELLED,
-                'RETRY': TaskStatus.RUNNING
-            }
-            
-            return state_mapping.get(celery_task.state, TaskStatus.PENDING)
+            return self._CELERY_STATE_MAPPING.get(celery_task.state, TaskStatus.PENDING)
         
         except Exception:
             return None
@@ -301,29 +390,87 @@ class CeleryIntegration(ExternalFrameworkIntegration):
         if not self.celery_app:
             return None
         
+        cached = self._terminal_cache.get(celery_task_id)
+        if cached is not None:
+            return cached
+        
         try:
             celery_task = self.celery_app.AsyncResult(celery_task_id)
-            
-            if celery_task.state == 'SUCCESS':
-                return TaskResult(
-                    task_id=celery_task_id,
-                    status=TaskStatus.SUCCESS,
-                    result_data=celery_task.result
-                )
-            elif celery_task.state == 'FAILURE':
-                return TaskResult(
-                    task_id=celery_task_id,
-                    status=TaskStatus.FAILED,
-                    error_message=str(celery_task.info)
-                )
-            else:
-                return TaskResult(
-                    task_id=celery_task_id,
-                    status=self.get_task_status(celery_task_id) or TaskStatus.PENDING
-                )
+            result = self._build_task_result(celery_task_id, celery_task.state, celery_task.info)
         
         except Exception:
             return None
+        
+        self._terminal_cache.put(celery_task_id, result)
+        return result
+    
+    def get_task_results_bulk(self, celery_task_ids: List[str]) -> Dict[str, TaskResult]:
+        """
+        Get results for many tasks with as few backend round-trips as possible
+        
+        Key-value result backends (Redis, Memcached, ...) are read with a
+        single MGET. Other backends fall back to per-task lookups that share
+        one backend handle.
+        """
+        if not self.celery_app or not celery_task_ids:
+            return {}
+        
+        backend = self.celery_app.backend
+        results: Dict[str, TaskResult] = {}
+        
+        # Finished tasks are answered from the local cache
+        uncached_ids = []
+        for task_id in celery_task_ids:
+            cached = self._terminal_cache.get(task_id)
+            if cached is not None:
+                results[task_id] = cached
+            else:
+                uncached_ids.append(task_id)
+        
+        if not uncached_ids:
+            return results
+        
+        try:
+            if hasattr(backend, 'mget') and hasattr(backend, 'get_key_for_task'):
+                keys = [backend.get_key_for_task(task_id) for task_id in uncached_ids]
+                for task_id, value in zip(uncached_ids, backend.mget(keys)):
+                    if value is None:
+                        results[task_id] = self._build_task_result(task_id, 'PENDING', None)
+                    else:
+                        meta = backend.decode_result(value)
+                        results[task_id] = self._build_task_result(task_id, meta['status'], meta['result'])
+            else:
+                for task_id in uncached_ids:
+                    celery_task = self.celery_app.AsyncResult(task_id, backend=backend)
+                    results[task_id] = self._build_task_result(task_id, celery_task.state, celery_task.info)
+        
+        except Exception as e:
+            self.logger.error(f"Failed to fetch bulk task results: {e}")
+        
+        for task_id in uncached_ids:
+            self._terminal_cache.put(task_id, results.get(task_id))
+        
+        return results
+    
+    def _build_task_result(self, celery_task_id: str, state: str, info: Any) -> TaskResult:
+        """Convert a Celery state and result payload to a TaskResult"""
+        if state == 'SUCCESS':
+            return TaskResult(
+                task_id=celery_task_id,
+                status=TaskStatus.SUCCESS,
+                result_data=info
+            )
+        elif state == 'FAILURE':
+            return TaskResult(
+                task_id=celery_task_id,
+                status=TaskStatus.FAILED,
+                error_message=str(info)
+            )
+        else:
+            return TaskResult(
+                task_id=celery_task_id,
+                status=self._CELERY_STATE_MAPPING.get(state, TaskStatus.PENDING)
+            )
     
     def cancel_task(self, celery_task_id: str) -> bool:
         """Cancel task via Celery"""
@@ -358,35 +505,69 @@ class SimpleTaskBridge:
         self.host = host
         self.port = port
         self.logger = logging.getLogger("task_bridge")
+        self._terminal_cache = TerminalResultCache()
+        
+        # Use orjson for request/response bodies when available
+        try:
+            import orjson
+            self.orjson = orjson
+        except ImportError:
+            self.orjson = None
+        
+        # Prefer an ASGI app served by uvicorn for concurrent requests
+        try:
+            import fastapi
+            import uvicorn
+            self.asgi_available = True
+            self.fastapi_module = fastapi
+            self.uvicorn_module = uvicorn
+        except ImportError:
+            self.asgi_available = False
         
         # Try to import Flask for HTTP interface
         try:
-            from flask import Flask, request, jsonify
+            from flask import Flask, Response, request, jsonify
             self.flask_available = True
             self.Flask = Flask
+            self.Response = Response
             self.request = request
             self.jsonify = jsonify
         except ImportError:
             self.flask_available = False
-            self.logger.warning("Flask not available. Install with: pip install flask")
+            if not self.asgi_available:
+                self.logger.warning("Flask not available. Install with: pip install flask")
     
     def start_http_bridge(self):
         """Start HTTP bridge for external task submission"""
+        if self.asgi_available:
+            self._start_asgi_bridge()
+            return
+        
         if not self.flask_available:
             raise RuntimeError("Flask not available")
         
+        app = self._create_flask_app()
+        
+        self.logger.info(f"Starting HTTP task bridge on {self.host}:{self.port}")
+        app.run(host=self.host, port=self.port)
+    
+    def _create_flask_app(self):
+        """Build the Flask app serving the bridge endpoints"""
         app = self.Flask(__name__)
         
         @app.route('/tasks', methods=['POST'])
         def submit_task():
-            data = self.request.json
+            try:
+                data = self._parse_task_request(self.request.get_data())
+            except ValueError as e:
+                return self._json_response({'error': str(e)}, 400)
             
             task_type = data.get('task_type')
             payload = data.get('payload', {})
             requirements = data.get('requirements', {})
             
             if not task_type:
-                return self.jsonify({'error': 'task_type is required'}), 400
+                return self._json_response({'error': 'task_type is required'}, 400)
             
             try:
                 # Create task
@@ -400,44 +581,174 @@ class SimpleTaskBridge:
                 # Submit to cluster
                 task_id = self.cluster_client.submit_task(task)
                 
-                return self.jsonify({
+                return self._json_response({
                     'task_id': task_id,
                     'status': 'submitted'
                 })
             
             except Exception as e:
-                return self.jsonify({'error': str(e)}), 500
+                return self._json_response({'error': str(e)}, 500)
         
         @app.route('/tasks/<task_id>', methods=['GET'])
         def get_task_status(task_id):
             try:
-                status = self.cluster_client.get_task_status(task_id)
-                result = self.cluster_client.get_task_result(task_id)
+                status, result = self._lookup_task(task_id)
+                etag = self._task_etag(status, result)
                 
-                response = {
-                    'task_id': task_id,
-                    'status': status.value if status else 'not_found'
-                }
+                if self.request.headers.get('If-None-Match') == etag:
+                    return '', 304, {'ETag': etag}
                 
-                if result:
-                    response['result'] = result.to_dict()
-                
-                return self.jsonify(response)
+                response = self._json_response(self._task_status_response(task_id, status, result))
+                response.headers['ETag'] = etag
+                return response
             
             except Exception as e:
-                return self.jsonify({'error': str(e)}), 500
+                return self._json_response({'error': str(e)}, 500)
         
         @app.route('/tasks/<task_id>', methods=['DELETE'])
         def cancel_task(task_id):
             try:
                 success = self.cluster_client.cancel_task(task_id)
-                return self.jsonify({
+                return self._json_response({
                     'task_id': task_id,
                     'cancelled': success
                 })
             
             except Exception as e:
-                return self.jsonify({'error': str(e)}), 500
+                return self._json_response({'error': str(e)}, 500)
         
-        self.logger.info(f"Starting HTTP task bridge on {self.host}:{self.port}")
-        app.run(host=self.host, port=self.port)
\ No newline at end of file
+        return app
+    
+    def _start_asgi_bridge(self):
+        """Start the HTTP bridge as a FastAPI app under uvicorn"""
+        if self.orjson is not None:
+            JSONResponse = self.fastapi_module.responses.ORJSONResponse
+        else:
+            JSONResponse = self.fastapi_module.responses.JSONResponse
+        app = self.fastapi_module.FastAPI(default_response_class=JSONResponse)
+        
+        @app.post('/tasks')
+        async def submit_task(request: self.fastapi_module.Request):
+            try:
+                data = self._parse_task_request(await request.body())
+            except ValueError as e:
+                return JSONResponse({'error': str(e)}, status_code=400)
+            
+            task_type = data.get('task_type')
+            payload = data.get('payload', {})
+            requirements = data.get('requirements', {})
+            
+            if not task_type:
+                return JSONResponse({'error': 'task_type is required'}, status_code=400)
+            
+            try:
+                # Create task
+                task_requirements = TaskRequirements(**requirements)
+                task = Task(
+                    task_type=task_type,
+                    payload=payload,
+                    requirements=task_requirements
+                )
+                
+                # Submit to cluster without blocking the event loop
+                task_id = await asyncio.to_thread(self.cluster_client.submit_task, task)
+                
+                return {
+                    'task_id': task_id,
+                    'status': 'submitted'
+                }
+            
+            except Exception as e:
+                return JSONResponse({'error': str(e)}, status_code=500)
+        
+        @app.get('/tasks/{task_id}')
+        async def get_task_status(task_id: str, request: self.fastapi_module.Request):
+            try:
+                status, result = await asyncio.to_thread(self._lookup_task, task_id)
+                etag = self._task_etag(status, result)
+                
+                if request.headers.get('if-none-match') == etag:
+                    return self.fastapi_module.Response(status_code=304, headers={'ETag': etag})
+                
+                return JSONResponse(
+                    self._task_status_response(task_id, status, result),
+                    headers={'ETag': etag}
+                )
+            
+            except Exception as e:
+                return JSONResponse({'error': str(e)}, status_code=500)
+        
+        @app.delete('/tasks/{task_id}')
+        async def cancel_task(task_id: str):
+            try:
+                success = await asyncio.to_thread(self.cluster_client.cancel_task, task_id)
+                return {
+                    'task_id': task_id,
+                    'cancelled': success
+                }
+            
+            except Exception as e:
+                return JSONResponse({'error': str(e)}, status_code=500)
+        
+        self.logger.info(f"Starting ASGI task bridge on {self.host}:{self.port}")
+        # loop='auto' picks uvloop when it is installed
+        self.uvicorn_module.run(app, host=self.host, port=self.port, workers=1, loop='auto')
+    
+    def _parse_task_request(self, body: bytes) -> Dict[str, Any]:
+        """
+        Decode a task submission body
+        
+        Raises ValueError when the body is not a JSON object, which the
+        endpoints report as a 400 response.
+        """
+        try:
+            if self.orjson is not None:
+                data = self.orjson.loads(body)
+            else:
+                data = json.loads(body)
+        except ValueError:
+            # orjson.JSONDecodeError and json.JSONDecodeError are both ValueErrors
+            raise ValueError("Request body must be valid JSON")
+        
+        if not isinstance(data, dict):
+            raise ValueError("Request body must be a JSON object")
+        return data
+    
+    def _json_response(self, payload: Any, status: int = 200):
+        """Build a Flask JSON response, encoded with orjson when available"""
+        if self.orjson is not None:
+            return self.Response(self.orjson.dumps(payload), status=status, mimetype='application/json')
+        
+        response = self.jsonify(payload)
+        response.status_code = status
+        return response
+    
+    def _lookup_task(self, task_id: str):
+        """Get (status, result) for a task, answering finished tasks from the cache"""
+        cached = self._terminal_cache.get(task_id)
+        if cached is not None:
+            return cached.status, cached
+        
+        status = self.cluster_client.get_task_status(task_id)
+        result = self.cluster_client.get_task_result(task_id)
+        self._terminal_cache.put(task_id, result)
+        return status, result
+    
+    def _task_etag(self, status: Optional[TaskStatus], result: Optional[TaskResult]) -> str:
+        """Entity tag for a task status response"""
+        status_value = status.value if status else 'not_found'
+        completed_at = result.completed_at.isoformat() if result and result.completed_at else ''
+        return f'"{status_value}-{completed_at}"'
+    
+    def _task_status_response(self, task_id: str, status: Optional[TaskStatus],
+                              result: Optional[TaskResult]) -> Dict[str, Any]:
+        """Build the JSON body for GET /tasks/<task_id>"""
+        response = {
+            'task_id': task_id,
+            'status': status.value if status else 'not_found'
+        }
+        
+        if result:
+            response['result'] = result.to_dict()
+        
+        return response
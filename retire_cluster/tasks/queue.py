@@ -2,14 +2,17 @@
 Task queue management for distributed task execution
 """
 
+import asyncio
+import copy
 import heapq
+import itertools
+import queue
 import threading
 import time
-from datetime import datetime, timezone
-from typing import Dict, List, Optional, Set, Callable, Any
+from typing import Dict, List, Optional, Set, Tuple, Callable, Any
 from collections import defaultdict
 
-from .task import Task, TaskStatus, TaskPriority
+from .task import Task, TaskStatus, TaskPriority, TaskRequirements, DeviceFingerprint, device_matches, TERMINAL_STATUSES
 
 
 class TaskQueue:
@@ -18,13 +21,23 @@ class TaskQueue:
     """
     
     def __init__(self):
-        self._lock = threading.RLock()
-        self._priority_queue: List[tuple] = []  # (priority, timestamp, task)
+        self._lock = threading.Lock()
+        self._priority_queues: Dict[tuple, List[list]] = {}  # requirements key -> heap of [priority, timestamp, task_id]
+        self._queue_requirements: Dict[tuple, TaskRequirements] = {}  # requirements key -> shared requirements
+        self._queue_entries: Dict[str, list] = {}  # task_id -> live heap entry
+        self._removed_entries = 0  # Heap entries marked as removed
         self._tasks: Dict[str, Task] = {}  # task_id -> Task
         self._device_assignments: Dict[str, str] = {}  # task_id -> device_id
+        self._tasks_by_device: Dict[str, Set[str]] = defaultdict(set)  # device_id -> assigned task_ids
         self._device_queues: Dict[str, Set[str]] = defaultdict(set)  # device_id -> set of task_ids
         self._listeners: List[Callable[[str, Task], None]] = []  # Event listeners
-        self._counter = 0  # For unique timestamps
+        self._async_listeners: Dict[asyncio.Queue, Callable[[str, Task], None]] = {}  # asyncio queue -> bridge listener
+        self._event_queue: queue.Queue = queue.Queue()  # (event_type, task snapshot) awaiting dispatch
+        self._dispatch_thread: Optional[threading.Thread] = None
+        self._tasks_by_status: Dict[TaskStatus, Dict[str, Task]] = defaultdict(dict)  # status -> task_id -> Task
+        self._priority_counts: Dict[TaskPriority, int] = defaultdict(int)  # priority -> number of tasks
+        self._device_counts: Dict[str, int] = defaultdict(int)  # assigned_device_id -> number of tasks
+        self._counter = itertools.count()  # For unique timestamps
 
     def add_task(self, task: Task) -> None:
         """Add a task to the queue"""
@@ -37,48 +50,82 @@ class TaskQueue:
             
             # Add to priority queue if not assigned to a specific device
             if task.status == TaskStatus.PENDING:
-                priority_value = -task.priority.value  # Negative for max-heap behavior
-                timestamp = self._counter
-                self._counter += 1
-                heapq.heappush(self._priority_queue, (priority_value, timestamp, task.task_id))
+                self._push_to_priority_queue(task)
                 task.status = TaskStatus.QUEUED
             
-            self._notify_listeners('task_added', task)
+            self._count_task(task, 1)
+        
+        self._notify_listeners('task_added', task)
 
     def get_next_task(self, device_id: str, device_capabilities: Dict[str, Any]) -> Optional[Task]:
         """Get the next suitable task for a device"""
         with self._lock:
-            # First check device-specific assignments
-            if device_id in self._device_queues:
-                for task_id in list(self._device_queues[device_id]):
-                    task = self._tasks.get(task_id)
-                    if task and task.status == TaskStatus.QUEUED:
-                        self._device_queues[device_id].remove(task_id)
-                        task.assign_to_device(device_id)
-                        self._device_assignments[task_id] = device_id
-                        self._notify_listeners('task_assigned', task)
-                        return task
-            
-            # Then check general priority queue
-            while self._priority_queue:
-                priority, timestamp, task_id = heapq.heappop(self._priority_queue)
+            assigned = self._pop_next_task(device_id, device_capabilities)
+        
+        if assigned:
+            self._notify_listeners('task_assigned', assigned)
+        return assigned
+
+    def _pop_next_task(self, device_id: str, device_capabilities: Dict[str, Any]) -> Optional[Task]:
+        """Pick and assign the next task for a device (caller holds the lock)"""
+        # First check device-specific assignments
+        if device_id in self._device_queues:
+            for task_id in list(self._device_queues[device_id]):
                 task = self._tasks.get(task_id)
-                
-                if not task or task.status != TaskStatus.QUEUED:
-                    continue
-                
-                # Check if device meets task requirements
-                if self._device_meets_requirements(device_capabilities, task.requirements):
+                if task and task.status == TaskStatus.QUEUED:
+                    self._device_queues[device_id].remove(task_id)
                     task.assign_to_device(device_id)
-                    self._device_assignments[task_id] = device_id
-                    self._notify_listeners('task_assigned', task)
+                    self._record_assignment(task_id, device_id)
+                    self._count_assignment(task, device_id)
                     return task
-                else:
-                    # Put task back if device doesn't meet requirements
-                    heapq.heappush(self._priority_queue, (priority, timestamp, task_id))
-                    break
+        
+        # Then check general priority queues. Tasks sharing the same
+        # requirements share a heap, so requirements are checked once per
+        # heap and the best matching head wins.
+        fingerprint = DeviceFingerprint.from_capabilities(device_capabilities)
+        best_heap = None
+        empty_keys = []
+        
+        for key, heap in self._priority_queues.items():
+            self._discard_stale_heads(heap)
+            if not heap:
+                empty_keys.append(key)
+                continue
+            
+            if best_heap is not None and heap[0] >= best_heap[0]:
+                continue
             
+            if self._device_meets_requirements(fingerprint, self._queue_requirements[key]):
+                best_heap = heap
+        
+        for key in empty_keys:
+            del self._priority_queues[key]
+            del self._queue_requirements[key]
+        
+        if best_heap is None:
             return None
+        
+        task_id = heapq.heappop(best_heap)[-1]
+        del self._queue_entries[task_id]
+        
+        task = self._tasks[task_id]
+        task.assign_to_device(device_id)
+        self._record_assignment(task_id, device_id)
+        self._count_assignment(task, device_id)
+        return task
+
+    def _discard_stale_heads(self, heap: List[list]) -> None:
+        """Pop removed or no longer queued entries off the top of a heap"""
+        while heap:
+            task_id = heap[0][-1]
+            if task_id is None:
+                self._removed_entries -= 1
+            else:
+                task = self._tasks.get(task_id)
+                if task and task.status == TaskStatus.QUEUED:
+                    return
+                self._queue_entries.pop(task_id, None)
+            heapq.heappop(heap)
 
     def assign_task_to_device(self, task_id: str, device_id: str) -> bool:
         """Assign a specific task to a specific device"""
@@ -99,6 +146,26 @@ class TaskQueue:
             
             return True
 
+    def assign_tasks_batch(self, assignments: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Assign several (task_id, device_id) pairs under a single lock
+        
+        Returns the pairs that were assigned; tasks that are no longer
+        queued are skipped.
+        """
+        assigned = []
+        with self._lock:
+            for task_id, device_id in assignments:
+                task = self._tasks.get(task_id)
+                if not task or task.status != TaskStatus.QUEUED:
+                    continue
+                
+                self._remove_from_priority_queue(task_id)
+                self._device_queues[device_id].add(task_id)
+                assigned.append((task_id, device_id))
+        
+        return assigned
+
     def update_task_status(self, task_id: str, status: TaskStatus, result_data: Optional[Dict] = None) -> bool:
         """Update task status"""
         with self._lock:
@@ -111,47 +178,61 @@ class TaskQueue:
             
             if status == TaskStatus.RUNNING:
                 task.start_execution()
-            elif status in [TaskStatus.SUCCESS, TaskStatus.FAILED, TaskStatus.CANCELLED, TaskStatus.TIMEOUT]:
-                task.completed_at = datetime.now(timezone.utc)
+            elif status in TERMINAL_STATUSES:
+                task.mark_completed()
                 
                 # Clean up assignments
-                if task_id in self._device_assignments:
-                    device_id = self._device_assignments[task_id]
-                    if device_id in self._device_queues:
-                        self._device_queues[device_id].discard(task_id)
-                    del self._device_assignments[task_id]
+                self._clear_assignment(task_id)
             
-            self._notify_listeners('task_status_changed', task)
-            return True
+            self._count_transition(task, old_status)
+        
+        self._notify_listeners('task_status_changed', task)
+        return True
 
     def get_task(self, task_id: str) -> Optional[Task]:
         """Get a task by ID"""
         with self._lock:
             return self._tasks.get(task_id)
 
+    def peek_highest_priority(self, n: Optional[int] = None) -> List[Task]:
+        """
+        Tasks waiting in the priority queue, in dispatch order, without removing them
+        
+        Order is highest priority first, then first in. Only the n best
+        entries are selected when n is given.
+        """
+        with self._lock:
+            entries = self._queue_entries.values()
+            ordered = sorted(entries) if n is None else heapq.nsmallest(n, entries)
+            return [self._tasks[entry[-1]] for entry in ordered]
+
+    def queued_count(self) -> int:
+        """Number of tasks waiting in the priority queue for placement"""
+        return len(self._queue_entries)
+
     def get_tasks_by_status(self, status: TaskStatus) -> List[Task]:
         """Get all tasks with a specific status"""
         with self._lock:
-            return [task for task in self._tasks.values() if task.status == status]
+            return list(self._tasks_by_status.get(status, {}).values())
 
     def get_tasks_by_device(self, device_id: str) -> List[Task]:
         """Get all tasks assigned to a device"""
         with self._lock:
             return [
-                self._tasks[task_id] 
-                for task_id in self._device_assignments 
-                if self._device_assignments[task_id] == device_id and task_id in self._tasks
+                self._tasks[task_id]
+                for task_id in self._tasks_by_device.get(device_id, ())
+                if task_id in self._tasks
             ]
 
     def get_pending_tasks_count(self) -> int:
         """Get number of pending/queued tasks"""
         with self._lock:
-            return len([t for t in self._tasks.values() if t.status in [TaskStatus.PENDING, TaskStatus.QUEUED]])
+            return self._status_size(TaskStatus.PENDING) + self._status_size(TaskStatus.QUEUED)
 
     def get_running_tasks_count(self) -> int:
         """Get number of running tasks"""
         with self._lock:
-            return len([t for t in self._tasks.values() if t.status == TaskStatus.RUNNING])
+            return self._status_size(TaskStatus.RUNNING)
 
     def cancel_task(self, task_id: str) -> bool:
         """Cancel a task"""
@@ -165,15 +246,14 @@ class TaskQueue:
             
             # Remove from queues
             self._remove_from_priority_queue(task_id)
-            if task_id in self._device_assignments:
-                device_id = self._device_assignments[task_id]
-                if device_id in self._device_queues:
-                    self._device_queues[device_id].discard(task_id)
-                del self._device_assignments[task_id]
+            self._clear_assignment(task_id)
             
+            old_status = task.status
             task.cancel()
-            self._notify_listeners('task_cancelled', task)
-            return True
+            self._count_transition(task, old_status)
+        
+        self._notify_listeners('task_cancelled', task)
+        return True
 
     def retry_failed_task(self, task_id: str) -> bool:
         """Retry a failed task"""
@@ -182,35 +262,31 @@ class TaskQueue:
             if not task or not task.can_retry():
                 return False
             
+            self._count_task(task, -1)
             task.reset_for_retry()
             
             # Add back to priority queue
-            priority_value = -task.priority.value
-            timestamp = self._counter
-            self._counter += 1
-            heapq.heappush(self._priority_queue, (priority_value, timestamp, task.task_id))
+            self._push_to_priority_queue(task)
             task.status = TaskStatus.QUEUED
-            
-            self._notify_listeners('task_retried', task)
-            return True
+            self._count_task(task, 1)
+        
+        self._notify_listeners('task_retried', task)
+        return True
 
     def cleanup_completed_tasks(self, max_age_seconds: int = 3600) -> int:
         """Remove completed tasks older than max_age_seconds"""
         with self._lock:
-            current_time = datetime.now(timezone.utc)
+            cutoff_ns = time.monotonic_ns() - max_age_seconds * 1_000_000_000
             removed_count = 0
             
             tasks_to_remove = []
             for task_id, task in self._tasks.items():
-                if (task.is_terminal_status() and 
-                    task.completed_at and 
-                    (current_time - task.completed_at).total_seconds() > max_age_seconds):
+                if task.is_terminal_status() and task.completed_age_exceeds(cutoff_ns):
                     tasks_to_remove.append(task_id)
             
             for task_id in tasks_to_remove:
-                del self._tasks[task_id]
-                if task_id in self._device_assignments:
-                    del self._device_assignments[task_id]
+                self._count_task(self._tasks.pop(task_id), -1)
+                self._clear_assignment(task_id)
                 removed_count += 1
             
             return removed_count
@@ -218,29 +294,30 @@ class TaskQueue:
     def get_queue_statistics(self) -> Dict[str, Any]:
         """Get queue statistics"""
         with self._lock:
-            status_counts = defaultdict(int)
-            priority_counts = defaultdict(int)
-            device_counts = defaultdict(int)
-            
-            for task in self._tasks.values():
-                status_counts[task.status.value] += 1
-                priority_counts[task.priority.value] += 1
-                if task.assigned_device_id:
-                    device_counts[task.assigned_device_id] += 1
-            
+            # Counters are maintained on every transition, so this is
+            # independent of the number of tasks held
             return {
                 'total_tasks': len(self._tasks),
-                'by_status': dict(status_counts),
-                'by_priority': dict(priority_counts),
-                'by_device': dict(device_counts),
-                'priority_queue_size': len(self._priority_queue),
+                'by_status': {s.value: len(tasks) for s, tasks in self._tasks_by_status.items() if tasks},
+                'by_priority': {p.value: n for p, n in self._priority_counts.items() if n},
+                'by_device': {d: n for d, n in self._device_counts.items() if n},
+                'priority_queue_size': len(self._queue_entries),
                 'device_queues': {k: len(v) for k, v in self._device_queues.items()}
             }
 
     def add_listener(self, listener: Callable[[str, Task], None]) -> None:
-        """Add event listener"""
+        """
+        Add event listener
+        
+        Listeners run on a dedicated dispatcher thread and receive a shallow
+        snapshot of the task taken when the event fired.
+        """
         with self._lock:
             self._listeners.append(listener)
+            
+            if self._dispatch_thread is None:
+                self._dispatch_thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+                self._dispatch_thread.start()
 
     def remove_listener(self, listener: Callable[[str, Task], None]) -> None:
         """Remove event listener"""
@@ -248,63 +325,147 @@ class TaskQueue:
             if listener in self._listeners:
                 self._listeners.remove(listener)
 
+    async def add_async_listener(self) -> asyncio.Queue:
+        """Subscribe the running event loop; events arrive as (event_type, task) items"""
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        
+        def bridge(event_type: str, task: Task) -> None:
+            loop.call_soon_threadsafe(events.put_nowait, (event_type, task))
+        
+        self._async_listeners[events] = bridge
+        self.add_listener(bridge)
+        return events
+
+    def remove_async_listener(self, events: asyncio.Queue) -> None:
+        """Unsubscribe an asyncio queue returned by add_async_listener"""
+        bridge = self._async_listeners.pop(events, None)
+        if bridge:
+            self.remove_listener(bridge)
+
+    def flush_events(self) -> None:
+        """Block until every event fired so far has been dispatched (not from a listener)"""
+        if self._dispatch_thread is not None:
+            self._event_queue.join()
+
     def _notify_listeners(self, event_type: str, task: Task) -> None:
-        """Notify all listeners of an event"""
-        for listener in self._listeners:
+        """Queue an event for the dispatcher thread (called without holding the lock)"""
+        if self._listeners:
+            self._event_queue.put_nowait((event_type, copy.copy(task)))
+
+    def _dispatch_loop(self) -> None:
+        """Deliver queued events to listeners, one event at a time"""
+        while True:
+            event_type, task = self._event_queue.get()
             try:
-                listener(event_type, task)
-            except Exception:
-                # Continue notifying other listeners even if one fails
-                pass
+                for listener in list(self._listeners):
+                    try:
+                        listener(event_type, task)
+                    except Exception:
+                        # Continue notifying other listeners even if one fails
+                        pass
+            finally:
+                self._event_queue.task_done()
 
-    def _remove_from_priority_queue(self, task_id: str) -> None:
-        """Remove task from priority queue (mark as removed)"""
-        # Note: We don't actually remove from heapq here as it's expensive
-        # Instead, we check task status when popping from queue
-        pass
-
-    def _device_meets_requirements(self, capabilities: Dict[str, Any], requirements) -> bool:
-        """Check if device capabilities meet task requirements"""
-        # CPU cores check
-        if requirements.min_cpu_cores:
-            device_cores = capabilities.get('cpu_count', 0)
-            if device_cores < requirements.min_cpu_cores:
-                return False
-        
-        # Memory check
-        if requirements.min_memory_gb:
-            device_memory = capabilities.get('memory_total_gb', 0)
-            if device_memory < requirements.min_memory_gb:
-                return False
+    def _record_assignment(self, task_id: str, device_id: str) -> None:
+        """Record that a task is assigned to a device (caller holds the lock)"""
+        self._device_assignments[task_id] = device_id
+        self._tasks_by_device[device_id].add(task_id)
+
+    def _clear_assignment(self, task_id: str) -> None:
+        """Drop a task's device assignment (caller holds the lock)"""
+        device_id = self._device_assignments.pop(task_id, None)
+        if device_id is None:
+            return
         
-        # Storage check
-        if requirements.min_storage_gb:
-            device_storage = capabilities.get('storage_total_gb', 0)
-            if device_storage < requirements.min_storage_gb:
-                return False
+        if device_id in self._device_queues:
+            self._device_queues[device_id].discard(task_id)
         
-        # Platform check
-        if requirements.required_platform:
-            device_platform = capabilities.get('platform', '').lower()
-            if device_platform != requirements.required_platform.lower():
-                return False
+        assigned = self._tasks_by_device.get(device_id)
+        if assigned is not None:
+            assigned.discard(task_id)
+            if not assigned:
+                del self._tasks_by_device[device_id]
+
+    def _status_size(self, status: TaskStatus) -> int:
+        """Number of tasks in a status (caller holds the lock)"""
+        tasks = self._tasks_by_status.get(status)
+        return len(tasks) if tasks else 0
+
+    def _count_task(self, task: Task, delta: int) -> None:
+        """Add (1) or remove (-1) a task from the status index and counters (caller holds the lock)"""
+        if delta > 0:
+            self._tasks_by_status[task.status][task.task_id] = task
+        else:
+            self._tasks_by_status[task.status].pop(task.task_id, None)
+        self._priority_counts[task.priority] += delta
+        if task.assigned_device_id:
+            self._device_counts[task.assigned_device_id] += delta
+
+    def _count_transition(self, task: Task, old_status: TaskStatus) -> None:
+        """Move a task to its current status in the status index (caller holds the lock)"""
+        if old_status != task.status:
+            self._tasks_by_status[old_status].pop(task.task_id, None)
+            self._tasks_by_status[task.status][task.task_id] = task
+
+    def _count_assignment(self, task: Task, device_id: str) -> None:
+        """Account for a queued task being assigned to a device (caller holds the lock)"""
+        self._count_transition(task, TaskStatus.QUEUED)
+        self._device_counts[device_id] += 1
+
+    def _push_to_priority_queue(self, task: Task) -> None:
+        """Push a task onto the priority queue (caller holds the lock)"""
+        self._remove_from_priority_queue(task.task_id)
         
-        # Role check
-        if requirements.required_role:
-            device_role = capabilities.get('role', '')
-            if device_role != requirements.required_role:
-                return False
+        priority_value = -task.priority.value  # Negative for max-heap behavior
+        timestamp = next(self._counter)
+        entry = [priority_value, timestamp, task.task_id]
+        self._queue_entries[task.task_id] = entry
         
-        # Tags check
-        if requirements.required_tags:
-            device_tags = set(capabilities.get('tags', []))
-            required_tags = set(requirements.required_tags)
-            if not required_tags.issubset(device_tags):
-                return False
+        key = self._requirements_key(task.requirements)
+        heap = self._priority_queues.get(key)
+        if heap is None:
+            heap = self._priority_queues[key] = []
+            self._queue_requirements[key] = task.requirements
+        heapq.heappush(heap, entry)
+
+    def _remove_from_priority_queue(self, task_id: str) -> None:
+        """Remove task from priority queue (mark as removed)"""
+        # Removing from the middle of a heap is O(N), so the entry is marked
+        # and skipped when popped. The heaps are rebuilt once marked entries
+        # outnumber live ones.
+        entry = self._queue_entries.pop(task_id, None)
+        if entry is None:
+            return
         
-        # GPU check
-        if requirements.gpu_required:
-            if not capabilities.get('has_gpu', False):
-                return False
+        entry[-1] = None
+        self._removed_entries += 1
         
-        return True
\ No newline at end of file
+        if self._removed_entries > len(self._queue_entries):
+            for key in list(self._priority_queues):
+                heap = [e for e in self._priority_queues[key] if e[-1] is not None]
+                if heap:
+                    heapq.heapify(heap)
+                    self._priority_queues[key] = heap
+                else:
+                    del self._priority_queues[key]
+                    del self._queue_requirements[key]
+            self._removed_entries = 0
+
+    def _requirements_key(self, requirements: TaskRequirements) -> tuple:
+        """Key grouping tasks whose requirements match the same devices"""
+        return (
+            requirements.min_cpu_cores,
+            requirements.min_memory_gb,
+            requirements.min_storage_gb,
+            requirements.required_platform,
+            requirements.required_role,
+            requirements.required_tags or None,
+            requirements.gpu_required,
+        )
+
+    def _device_meets_requirements(self, capabilities, requirements: TaskRequirements) -> bool:
+        """Check if device capabilities (dict or fingerprint) meet task requirements"""
+        if not isinstance(capabilities, DeviceFingerprint):
+            capabilities = DeviceFingerprint.from_capabilities(capabilities)
+        return device_matches(capabilities, requirements)
@@ -2,16 +2,101 @@
 Task scheduler for intelligent task distribution across the cluster
 """
 
+import bisect
+import heapq
+import random
 import threading
 import time
+from collections import defaultdict
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Set, Callable, Any
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple, Callable, Any
 import logging
 
-from .task import Task, TaskStatus, TaskResult, TaskRequirements
+from .task import Task, TaskStatus, TaskResult, TaskRequirements, DeviceFingerprint, device_matches, ACTIVE_STATUSES, TERMINAL_STATUSES
 from .queue import TaskQueue
 
 
+class CapabilityIndex:
+    """
+    Inverted indices over device fingerprints for requirement matching
+    
+    Devices are indexed by platform, role, tag and GPU presence, and kept
+    sorted by CPU, memory and storage so minimum-resource checks become a
+    bisect. Matching a task is then a few set intersections instead of a
+    full requirement check per device. Results are memoized per
+    requirements value; the index is rebuilt (and the memo dropped)
+    whenever the device registry changes.
+    """
+    
+    max_cached_requirements = 1024
+    
+    def __init__(self, fingerprints: Dict[str, DeviceFingerprint]):
+        self._eligible_cache: Dict[TaskRequirements, FrozenSet[str]] = {}
+        self.by_platform: Dict[str, Set[str]] = defaultdict(set)
+        self.by_role: Dict[str, Set[str]] = defaultdict(set)
+        self.by_tag: Dict[str, Set[str]] = defaultdict(set)
+        self.gpu_devices: Set[str] = set()
+        
+        for device_id, fp in fingerprints.items():
+            self.by_platform[fp.platform].add(device_id)
+            self.by_role[fp.role].add(device_id)
+            for tag in fp.tags:
+                self.by_tag[tag].add(device_id)
+            if fp.has_gpu:
+                self.gpu_devices.add(device_id)
+        
+        # (sorted values, device ids in the same order) per resource
+        self.by_cpu = self._sorted_by(fingerprints, 'cpu_count')
+        self.by_mem = self._sorted_by(fingerprints, 'memory_gb')
+        self.by_storage = self._sorted_by(fingerprints, 'storage_gb')
+
+    @staticmethod
+    def _sorted_by(fingerprints: Dict[str, DeviceFingerprint], field: str) -> tuple:
+        pairs = sorted((getattr(fp, field), device_id) for device_id, fp in fingerprints.items())
+        return tuple(value for value, _ in pairs), [device_id for _, device_id in pairs]
+
+    def eligible(self, requirements: TaskRequirements) -> Optional[FrozenSet[str]]:
+        """Device ids meeting the requirements, or None if any device does"""
+        if requirements._is_trivial:
+            return None
+        
+        cached = self._eligible_cache.get(requirements)
+        if cached is None:
+            if len(self._eligible_cache) >= self.max_cached_requirements:
+                self._eligible_cache.clear()
+            cached = self._eligible_cache[requirements] = frozenset(self._match(requirements))
+        return cached
+
+    def _match(self, requirements: TaskRequirements) -> Set[str]:
+        """Intersect the indices for a set of requirements"""
+        # Start from the most selective exact-match index
+        candidates: List[Set[str]] = []
+        if requirements._required_platform_lower:
+            candidates.append(self.by_platform.get(requirements._required_platform_lower, set()))
+        if requirements.required_role:
+            candidates.append(self.by_role.get(requirements.required_role, set()))
+        for tag in requirements._required_tags_frozen:
+            candidates.append(self.by_tag.get(tag, set()))
+        if requirements.gpu_required:
+            candidates.append(self.gpu_devices)
+        
+        for minimum, (values, device_ids) in (
+            (requirements.min_cpu_cores, self.by_cpu),
+            (requirements.min_memory_gb, self.by_mem),
+            (requirements.min_storage_gb, self.by_storage),
+        ):
+            if minimum:
+                candidates.append(set(device_ids[bisect.bisect_left(values, minimum):]))
+        
+        candidates.sort(key=len)
+        eligible = set(candidates[0])
+        for other in candidates[1:]:
+            if not eligible:
+                break
+            eligible &= other
+        return eligible
+
+
 class TaskScheduler:
     """
     Intelligent task scheduler that distributes tasks across cluster devices
@@ -23,11 +108,27 @@ class TaskScheduler:
         
         # Device registry
         self._devices: Dict[str, Dict[str, Any]] = {}  # device_id -> capabilities
-        self._device_heartbeats: Dict[str, datetime] = {}  # device_id -> last_heartbeat
+        self._device_fingerprints: Dict[str, DeviceFingerprint] = {}  # device_id -> normalized capabilities
+        self._device_heartbeats: Dict[str, float] = {}  # device_id -> last_heartbeat (time.monotonic)
+        self._heartbeat_intervals: Dict[str, float] = {}  # device_id -> EMA of seconds between heartbeats
+        self._heartbeat_deadlines: List[Tuple[float, str]] = []  # heap of (next offline check, device_id)
+        self._deadline_tracked: Set[str] = set()  # devices with an entry in the deadline heap
         self._device_loads: Dict[str, int] = {}  # device_id -> current_task_count
+        self._capability_index: Optional[CapabilityIndex] = None  # Rebuilt after registry changes
+        
+        # Per-structure locks so heartbeat handlers and the scheduler loop
+        # only contend on the state they share. When more than one is
+        # needed they are taken in this order.
+        self._devices_lock = threading.Lock()     # _devices, _device_fingerprints, _capability_index
+        self._heartbeats_lock = threading.Lock()  # _device_heartbeats, _heartbeat_intervals, deadline heap
+        self._loads_lock = threading.Lock()       # _device_loads
         
         # Scheduling configuration
         self.heartbeat_timeout = 300  # 5 minutes
+        self.min_heartbeat_timeout = 30  # Floor for timeouts adapted to a device's heartbeat rate
+        self.heartbeat_timeout_factor = 3  # Missed heartbeats (at the observed rate) before offline
+        self.heartbeat_ema_alpha = 0.2
+        self.round_interval_jitter = 0.1  # +/- fraction applied to the periodic round interval
         self.max_tasks_per_device = 5
         self.load_balancing_enabled = True
         self.device_affinity_enabled = True
@@ -35,6 +136,8 @@ class TaskScheduler:
         # Scheduling thread
         self._scheduler_thread: Optional[threading.Thread] = None
         self._shutdown_event = threading.Event()
+        self._wakeup = threading.Event()  # Set when there may be new scheduling work
+        self._loads_stale = False  # Set when queue events changed device loads since the last refresh
         self._running = False
         
         # Statistics
@@ -46,9 +149,26 @@ class TaskScheduler:
             'last_schedule_time': None
         }
         
+        # Cached get_cluster_statistics result, reused for stats_ttl seconds
+        # unless scheduler state changed
+        self.stats_ttl = 0.5
+        self._stats_cache: Optional[Dict[str, Any]] = None
+        self._stats_cache_mono = 0.0
+        self._stats_dirty = True
+        
+        # Cluster size above which narrow requirements scan their eligible
+        # devices directly instead of walking the load heap
+        self.direct_scan_min_devices = 64
+        
+        # Maximum number of assignments committed to the queue at once
+        self.assignment_batch_size = 128
+        
         # Task placement history for affinity
         self._task_device_history: Dict[str, str] = {}  # task_type -> preferred_device_id
         
+        # Wake the loop when tasks finish or go back to the queue, whoever updates them
+        self.task_queue.add_listener(self._on_task_event)
+        
     def start(self) -> None:
         """Start the scheduler"""
         if self._running:
@@ -68,6 +188,7 @@ class TaskScheduler:
         self.logger.info("Stopping task scheduler...")
         self._running = False
         self._shutdown_event.set()
+        self._wakeup.set()
         
         if self._scheduler_thread:
             self._scheduler_thread.join(timeout=timeout)
@@ -78,37 +199,78 @@ class TaskScheduler:
 
     def register_device(self, device_id: str, capabilities: Dict[str, Any]) -> None:
         """Register a device with the scheduler"""
-        self._devices[device_id] = capabilities.copy()
-        self._device_heartbeats[device_id] = datetime.now(timezone.utc)
-        self._device_loads[device_id] = 0
+        fingerprint = DeviceFingerprint.from_capabilities(capabilities)
+        with self._devices_lock:
+            self._devices[device_id] = capabilities.copy()
+            self._device_fingerprints[device_id] = fingerprint
+            self._capability_index = None
+        with self._heartbeats_lock:
+            self._device_heartbeats[device_id] = time.monotonic()
+            self._heartbeat_intervals.pop(device_id, None)
+            self._track_heartbeat_deadline(device_id)
+        with self._loads_lock:
+            self._device_loads[device_id] = 0
+        self._stats_dirty = True
+        self._wakeup.set()
         self.logger.info(f"Registered device: {device_id}")
 
     def unregister_device(self, device_id: str) -> None:
         """Unregister a device"""
-        if device_id in self._devices:
-            del self._devices[device_id]
-        if device_id in self._device_heartbeats:
-            del self._device_heartbeats[device_id]
-        if device_id in self._device_loads:
-            del self._device_loads[device_id]
+        with self._devices_lock:
+            self._devices.pop(device_id, None)
+            self._device_fingerprints.pop(device_id, None)
+            self._capability_index = None
+        with self._heartbeats_lock:
+            self._device_heartbeats.pop(device_id, None)
+            self._heartbeat_intervals.pop(device_id, None)
+        with self._loads_lock:
+            self._device_loads.pop(device_id, None)
+        self._stats_dirty = True
         self.logger.info(f"Unregistered device: {device_id}")
 
     def update_device_heartbeat(self, device_id: str, task_count: Optional[int] = None) -> None:
         """Update device heartbeat and optionally task count"""
         if device_id in self._devices:
-            self._device_heartbeats[device_id] = datetime.now(timezone.utc)
+            with self._heartbeats_lock:
+                now = time.monotonic()
+                last_heartbeat = self._device_heartbeats.get(device_id)
+                if last_heartbeat is not None:
+                    # Track the device's heartbeat rate to adapt its timeout
+                    interval = now - last_heartbeat
+                    average = self._heartbeat_intervals.get(device_id)
+                    if average is None:
+                        average = interval
+                    else:
+                        average += self.heartbeat_ema_alpha * (interval - average)
+                    self._heartbeat_intervals[device_id] = average
+                
+                self._device_heartbeats[device_id] = now
+                self._track_heartbeat_deadline(device_id)
+            
             if task_count is not None:
-                self._device_loads[device_id] = task_count
+                with self._loads_lock:
+                    current_load = self._device_loads.get(device_id, 0)
+                    self._device_loads[device_id] = task_count
+                if task_count < current_load:
+                    # Freed capacity may let queued tasks be placed
+                    self._wakeup.set()
+                if task_count != current_load:
+                    self._stats_dirty = True
 
     def submit_task(self, task: Task) -> str:
         """Submit a task for scheduling"""
         self.task_queue.add_task(task)
+        self._stats_dirty = True
+        self._wakeup.set()
         self.logger.info(f"Submitted task {task.task_id} ({task.task_type}) with priority {task.priority.name}")
         return task.task_id
 
     def cancel_task(self, task_id: str) -> bool:
         """Cancel a task"""
-        return self.task_queue.cancel_task(task_id)
+        cancelled = self.task_queue.cancel_task(task_id)
+        if cancelled:
+            self._stats_dirty = True
+        return cancelled
 
     def get_task_status(self, task_id: str) -> Optional[TaskStatus]:
         """Get task status"""
@@ -120,23 +282,101 @@ class TaskScheduler:
         task = self.task_queue.get_task(task_id)
         return task.result if task else None
 
+    def wait_for_task(self, task_id: str, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a task reaches a terminal status
+        
+        Driven by task queue events rather than polling. Returns False on
+        timeout or when the task is unknown.
+        """
+        finished = threading.Event()
+        
+        def on_task_event(event_type: str, task: Task) -> None:
+            if task.task_id == task_id and task.status in TERMINAL_STATUSES:
+                finished.set()
+        
+        self.task_queue.add_listener(on_task_event)
+        try:
+            # Checked after subscribing so a task finishing in between is not missed
+            task = self.task_queue.get_task(task_id)
+            if task is None:
+                return False
+            if task.status in TERMINAL_STATUSES:
+                return True
+            return finished.wait(timeout)
+        finally:
+            self.task_queue.remove_listener(on_task_event)
+
     def get_online_devices(self) -> List[str]:
         """Get list of online devices"""
-        current_time = datetime.now(timezone.utc)
+        return self._partition_devices()[0]
+
+    def _partition_devices(self, now: Optional[float] = None) -> Tuple[List[str], List[str]]:
+        """Split devices into (online, offline) by heartbeat age in one pass"""
+        if now is None:
+            now = time.monotonic()
         online_devices = []
+        offline_devices = []
         
-        for device_id, last_heartbeat in self._device_heartbeats.items():
-            if (current_time - last_heartbeat).total_seconds() < self.heartbeat_timeout:
-                online_devices.append(device_id)
+        with self._heartbeats_lock:
+            for device_id, last_heartbeat in self._device_heartbeats.items():
+                if now - last_heartbeat < self._device_timeout(device_id):
+                    online_devices.append(device_id)
+                else:
+                    offline_devices.append(device_id)
         
-        return online_devices
+        return online_devices, offline_devices
+
+    def _device_timeout(self, device_id: str) -> float:
+        """
+        Seconds without a heartbeat before a device counts as offline
+        
+        Devices with an observed heartbeat rate get a multiple of their
+        average interval, clamped to [min_heartbeat_timeout,
+        heartbeat_timeout]; others get heartbeat_timeout.
+        """
+        average = self._heartbeat_intervals.get(device_id)
+        if average is None:
+            return self.heartbeat_timeout
+        adapted = max(self.min_heartbeat_timeout, average * self.heartbeat_timeout_factor)
+        return min(self.heartbeat_timeout, adapted)
+
+    def _track_heartbeat_deadline(self, device_id: str) -> None:
+        """Make sure the device has an entry in the deadline heap (caller holds _heartbeats_lock)"""
+        if device_id not in self._deadline_tracked:
+            self._deadline_tracked.add(device_id)
+            deadline = self._device_heartbeats[device_id] + self._device_timeout(device_id)
+            heapq.heappush(self._heartbeat_deadlines, (deadline, device_id))
 
     def get_device_capabilities(self, device_id: str) -> Optional[Dict[str, Any]]:
         """Get device capabilities"""
         return self._devices.get(device_id)
 
     def get_cluster_statistics(self) -> Dict[str, Any]:
-        """Get cluster and scheduling statistics"""
+        """
+        Get cluster and scheduling statistics
+        
+        The result is computed at most once per stats_ttl seconds while the
+        scheduler state is unchanged. Callers get their own copy of each
+        section and of the dicts within it; device capabilities are shared,
+        as they always were.
+        """
+        now = time.monotonic()
+        if self._stats_cache is None or self._stats_dirty or now - self._stats_cache_mono >= self.stats_ttl:
+            # Cleared first so changes made while computing mark it dirty again
+            self._stats_dirty = False
+            self._stats_cache = self._compute_cluster_statistics()
+            self._stats_cache_mono = now
+        return {
+            name: {
+                key: dict(value) if isinstance(value, dict) else value
+                for key, value in section.items()
+            } if isinstance(section, dict) else section
+            for name, section in self._stats_cache.items()
+        }
+
+    def _compute_cluster_statistics(self) -> Dict[str, Any]:
+        """Build the cluster statistics returned by get_cluster_statistics"""
         online_devices = self.get_online_devices()
         queue_stats = self.task_queue.get_queue_statistics()
         
@@ -173,9 +413,21 @@ class TaskScheduler:
     def _scheduler_loop(self) -> None:
         """Main scheduler loop"""
         while self._running and not self._shutdown_event.is_set():
+            # Cleared before the round so wakeups arriving during it are kept
+            self._wakeup.clear()
+            round_start = time.monotonic()
+            
             try:
-                self._schedule_tasks()
-                self._cleanup_offline_devices()
+                # Capacity freed since the last round must be seen before scheduling
+                if self._loads_stale:
+                    self._loads_stale = False
+                    self._update_device_loads()
+                
+                # Partition devices once and share it across the round
+                now = time.monotonic()
+                online_devices = self._partition_devices(now)[0]
+                self._schedule_tasks(online_devices)
+                self._cleanup_offline_devices(now)
                 self._update_device_loads()
                 
                 self.stats['scheduler_rounds'] += 1
@@ -184,131 +436,302 @@ class TaskScheduler:
             except Exception as e:
                 self.logger.error(f"Error in scheduler loop: {e}")
             
-            # Sleep for a short interval
-            self._shutdown_event.wait(1.0)
+            # Sleep until new work arrives, with a bounded timeout so offline
+            # devices and loads are still refreshed periodically
+            self._wakeup.wait(timeout=self._idle_timeout(time.monotonic(), round_start))
+
+    def _on_task_event(self, event_type: str, task: Task) -> None:
+        """
+        Task queue listener keeping loads current between rounds
+        
+        Every transition changes some device's load. Tasks that finish or
+        go back to the queue may also leave work that can now be placed,
+        so those wake the loop as well.
+        """
+        self._loads_stale = True
+        if task.status in TERMINAL_STATUSES or task.status == TaskStatus.QUEUED:
+            self._wakeup.set()
 
-    def _schedule_tasks(self) -> None:
+    def _schedule_tasks(self, online_devices: Optional[List[str]] = None) -> None:
         """Schedule pending tasks to available devices"""
-        online_devices = self.get_online_devices()
+        if self.task_queue.queued_count() == 0:
+            return
+        if online_devices is None:
+            online_devices = self.get_online_devices()
         if not online_devices:
             return
         
-        # Get pending tasks
-        pending_tasks = self.task_queue.get_tasks_by_status(TaskStatus.QUEUED)
-        if not pending_tasks:
+        # Decide placements in memory first, counting tentative assignments
+        # against a local copy of the loads, then commit them in batches
+        with self._loads_lock:
+            load_delta = dict(self._device_loads)
+        ranks = {device_id: rank for rank, device_id in enumerate(online_devices)}
+        
+        # Devices with free capacity, least loaded first and ties in
+        # registration order
+        load_heap = []
+        free_capacity = 0
+        for device_id, rank in ranks.items():
+            load = load_delta.get(device_id, 0)
+            if load < self.max_tasks_per_device:
+                free_capacity += self.max_tasks_per_device - load
+                load_heap.append((self._load_key(load), rank, device_id))
+        if not load_heap:
             return
+        heapq.heapify(load_heap)
         
-        # Sort tasks by priority
-        pending_tasks.sort(key=lambda t: (-t.priority.value, t.created_at))
+        tasks_by_id = {}
+        assignments = []
         
-        for task in pending_tasks:
-            best_device = self._find_best_device_for_task(task, online_devices)
+        for task in self._iter_pending_tasks(free_capacity * 4):
+            if not load_heap:
+                break
+            
+            best_device = self._pop_best_device(task, load_heap, load_delta, ranks)
             if best_device:
-                if self.task_queue.assign_task_to_device(task.task_id, best_device):
-                    self.stats['tasks_scheduled'] += 1
-                    self.logger.info(f"Scheduled task {task.task_id} to device {best_device}")
-                    
-                    # Update device affinity
-                    if self.device_affinity_enabled:
-                        self._task_device_history[task.task_type] = best_device
-
-    def _find_best_device_for_task(self, task: Task, online_devices: List[str]) -> Optional[str]:
+                tasks_by_id[task.task_id] = task
+                assignments.append((task.task_id, best_device))
+        
+        assign_batch = getattr(self.task_queue, 'assign_tasks_batch', None)
+        for start in range(0, len(assignments), self.assignment_batch_size):
+            batch = assignments[start:start + self.assignment_batch_size]
+            if assign_batch is not None:
+                committed = assign_batch(batch)
+            else:
+                committed = [
+                    (task_id, device_id) for task_id, device_id in batch
+                    if self.task_queue.assign_task_to_device(task_id, device_id)
+                ]
+            
+            self.stats['tasks_scheduled'] += len(committed)
+            if committed:
+                self._stats_dirty = True
+            for task_id, device_id in committed:
+                self.logger.info(f"Scheduled task {task_id} to device {device_id}")
+                
+                # Update device affinity
+                if self.device_affinity_enabled:
+                    self._task_device_history[tasks_by_id[task_id].task_type] = device_id
+
+    def _iter_pending_tasks(self, lookahead: int):
+        """
+        Yield queued tasks in dispatch order
+        
+        Only the first lookahead tasks are fetched up front; the rest of the
+        queue is read only if the round still has capacity after them, so
+        unplaceable high-priority tasks cannot starve the ones behind.
+        """
+        window = self.task_queue.peek_highest_priority(lookahead)
+        yield from window
+        
+        if len(window) == lookahead:
+            yield from self.task_queue.peek_highest_priority()[lookahead:]
+
+    def _load_key(self, load: int) -> int:
+        """Heap ordering key for a device load"""
+        return load if self.load_balancing_enabled else 0
+
+    def _pop_best_device(self, task: Task, load_heap: List[Tuple[int, int, str]],
+                         load_delta: Dict[str, int], ranks: Dict[str, int]) -> Optional[str]:
+        """
+        Pick a device for a task from the round's load heap and charge it one task
+        
+        Matches _find_best_device_for_task: least loaded eligible device,
+        the affinity device winning ties, then registration order. Heap
+        entries whose key no longer matches the device's load are stale
+        and dropped.
+        
+        On large clusters, a task that only a small subset of devices can
+        run scans that subset directly instead of popping past every
+        ineligible device on the heap.
+        """
+        eligible = self._get_capability_index().eligible(task.requirements)
+        scan = (eligible is not None and len(ranks) > self.direct_scan_min_devices
+                and len(eligible) * 4 <= len(load_heap))
+        
+        if scan:
+            chosen = self._scan_best_device(eligible, load_delta, ranks)
+        else:
+            # Runs once per heap entry examined; bound to locals to keep
+            # attribute lookups out of the loop
+            max_tasks = self.max_tasks_per_device
+            balancing = self.load_balancing_enabled
+            get_load = load_delta.get
+            heappop = heapq.heappop
+            chosen = None
+            skipped = []
+            
+            while load_heap:
+                entry = heappop(load_heap)
+                key, _, device_id = entry
+                load = get_load(device_id, 0)
+                if load >= max_tasks or key != (load if balancing else 0):
+                    continue
+                if eligible is None or device_id in eligible:
+                    chosen = entry
+                    break
+                skipped.append(entry)
+            
+            for entry in skipped:
+                heapq.heappush(load_heap, entry)
+        
+        if chosen is None:
+            return None
+        
+        best_device = chosen[2]
+        
+        # Apply device affinity if the preferred device is equally good
+        if self.device_affinity_enabled:
+            preferred = self._task_device_history.get(task.task_type)
+            if (preferred is not None and preferred != best_device and preferred in ranks
+                    and (eligible is None or preferred in eligible)):
+                preferred_load = load_delta.get(preferred, 0)
+                if preferred_load < self.max_tasks_per_device and self._load_key(preferred_load) == chosen[0]:
+                    if not scan:
+                        heapq.heappush(load_heap, chosen)
+                    best_device = preferred
+        
+        load = load_delta.get(best_device, 0) + 1
+        load_delta[best_device] = load
+        if load < self.max_tasks_per_device:
+            heapq.heappush(load_heap, (self._load_key(load), ranks[best_device], best_device))
+        
+        return best_device
+
+    def _scan_best_device(self, eligible: FrozenSet[str], load_delta: Dict[str, int],
+                          ranks: Dict[str, int]) -> Optional[Tuple[int, int, str]]:
+        """Best (load key, rank, device_id) among eligible online devices with free capacity"""
+        max_tasks = self.max_tasks_per_device
+        balancing = self.load_balancing_enabled
+        get_rank = ranks.get
+        get_load = load_delta.get
+        best = None
+        for device_id in eligible:
+            rank = get_rank(device_id)
+            if rank is None:
+                continue
+            load = get_load(device_id, 0)
+            if load >= max_tasks:
+                continue
+            entry = (load if balancing else 0, rank, device_id)
+            if best is None or entry < best:
+                best = entry
+        return best
+
+    def _find_best_device_for_task(self, task: Task, online_devices: List[str],
+                                   device_loads: Optional[Dict[str, int]] = None) -> Optional[str]:
         """Find the best device for executing a task"""
+        if device_loads is None:
+            device_loads = self._device_loads
+        eligible = self._get_capability_index().eligible(task.requirements)
         suitable_devices = []
         
         # Filter devices that can handle the task
         for device_id in online_devices:
-            if self._can_device_handle_task(device_id, task):
+            if eligible is None or device_id in eligible:
                 # Check device load
-                current_load = self._device_loads.get(device_id, 0)
+                current_load = device_loads.get(device_id, 0)
                 if current_load < self.max_tasks_per_device:
                     suitable_devices.append(device_id)
         
         if not suitable_devices:
             return None
         
-        # Apply device affinity if enabled
-        if self.device_affinity_enabled and task.task_type in self._task_device_history:
-            preferred_device = self._task_device_history[task.task_type]
-            if preferred_device in suitable_devices:
-                suitable_devices = [preferred_device] + [d for d in suitable_devices if d != preferred_device]
-        
-        # Apply load balancing if enabled
-        if self.load_balancing_enabled and len(suitable_devices) > 1:
-            # Sort by current load (ascending)
-            suitable_devices.sort(key=lambda d: self._device_loads.get(d, 0))
-        
+        preferred_device = None
+        if self.device_affinity_enabled:
+            preferred_device = self._task_device_history.get(task.task_type)
+        
+        # Least loaded first when load balancing, the affinity device winning
+        # ties; min keeps the first of equal keys, i.e. registration order
+        if self.load_balancing_enabled:
+            return min(suitable_devices,
+                       key=lambda d: (device_loads.get(d, 0), d != preferred_device))
+        if preferred_device in suitable_devices:
+            return preferred_device
         return suitable_devices[0]
 
+    def _get_capability_index(self) -> CapabilityIndex:
+        """Get the capability index, rebuilding it if devices changed"""
+        index = self._capability_index
+        if index is None:
+            with self._devices_lock:
+                index = self._capability_index
+                if index is None:
+                    index = self._capability_index = CapabilityIndex(self._device_fingerprints)
+        return index
+
     def _can_device_handle_task(self, device_id: str, task: Task) -> bool:
         """Check if a device can handle a specific task"""
-        capabilities = self._devices.get(device_id)
-        if not capabilities:
+        fingerprint = self._device_fingerprints.get(device_id)
+        if not fingerprint:
             return False
         
-        requirements = task.requirements
-        
-        # CPU cores check
-        if requirements.min_cpu_cores:
-            device_cores = capabilities.get('cpu_count', 0)
-            if device_cores < requirements.min_cpu_cores:
-                return False
-        
-        # Memory check
-        if requirements.min_memory_gb:
-            device_memory = capabilities.get('memory_total_gb', 0)
-            if device_memory < requirements.min_memory_gb:
-                return False
-        
-        # Storage check
-        if requirements.min_storage_gb:
-            device_storage = capabilities.get('storage_total_gb', 0)
-            if device_storage < requirements.min_storage_gb:
-                return False
-        
-        # Platform check
-        if requirements.required_platform:
-            device_platform = capabilities.get('platform', '').lower()
-            if device_platform != requirements.required_platform.lower():
-                return False
-        
-        # Role check
-        if requirements.required_role:
-            device_role = capabilities.get('role', '')
-            if device_role != requirements.required_role:
-                return False
-        
-        # Tags check
-        if requirements.required_tags:
-            device_tags = set(capabilities.get('tags', []))
-            required_tags = set(requirements.required_tags)
-            if not required_tags.issubset(device_tags):
-                return False
-        
-        # GPU check
-        if requirements.gpu_required:
-            if not capabilities.get('has_gpu', False):
-                return False
-        
-        return True
+        return device_matches(fingerprint, task.requirements)
+
+    def _idle_timeout(self, now: float, round_start: Optional[float] = None) -> float:
+        """
+        How long the loop may sleep: until the next heartbeat deadline, at most about heartbeat_timeout / 2
+        
+        The periodic interval is jittered so schedulers sharing a cluster do
+        not refresh in lockstep, and is measured from round_start so the
+        time spent in the round does not stretch the cadence.
+        """
+        jitter = self.round_interval_jitter
+        timeout = self.heartbeat_timeout / 2 * (1 + random.uniform(-jitter, jitter))
+        if round_start is not None:
+            timeout = max(0.0, timeout - (now - round_start))
+        with self._heartbeats_lock:
+            if self._heartbeat_deadlines:
+                timeout = min(timeout, max(0.0, self._heartbeat_deadlines[0][0] - now))
+        return timeout
 
-    def _cleanup_offline_devices(self) -> None:
-        """Remove offline devices from consideration"""
-        current_time = datetime.now(timezone.utc)
+    def _cleanup_offline_devices(self, now: Optional[float] = None) -> List[str]:
+        """
+        Detect devices that went offline since the last check
+        
+        Only deadline heap entries that are due are examined. A due entry
+        whose device has heartbeated since is re-armed at its new deadline.
+        Returns the devices that went offline.
+        """
+        if now is None:
+            now = time.monotonic()
         offline_devices = []
         
-        for device_id, last_heartbeat in self._device_heartbeats.items():
-            if (current_time - last_heartbeat).total_seconds() > self.heartbeat_timeout:
+        with self._heartbeats_lock:
+            while self._heartbeat_deadlines and self._heartbeat_deadlines[0][0] <= now:
+                _, device_id = heapq.heappop(self._heartbeat_deadlines)
+                last_heartbeat = self._device_heartbeats.get(device_id)
+                if last_heartbeat is None:
+                    # Unregistered
+                    self._deadline_tracked.discard(device_id)
+                    continue
+                
+                deadline = last_heartbeat + self._device_timeout(device_id)
+                if deadline > now:
+                    heapq.heappush(self._heartbeat_deadlines, (deadline, device_id))
+                    continue
+                
+                self._deadline_tracked.discard(device_id)
                 offline_devices.append(device_id)
         
         for device_id in offline_devices:
             self.logger.warning(f"Device {device_id} went offline")
             # Note: We don't remove the device entirely, just mark it as offline
             # The device can come back online with a heartbeat
+        
+        return offline_devices
 
     def _update_device_loads(self) -> None:
         """Update device load information from task queue"""
-        for device_id in self._devices:
+        with self._devices_lock:
+            device_ids = list(self._devices)
+        
+        for device_id in device_ids:
             running_tasks = self.task_queue.get_tasks_by_device(device_id)
-            active_count = len([t for t in running_tasks if t.status in [TaskStatus.ASSIGNED, TaskStatus.RUNNING]])
-            self._device_loads[device_id] = active_count
\ No newline at end of file
+            active_count = sum(1 for t in running_tasks if t.status in ACTIVE_STATUSES)
+            with self._loads_lock:
+                changed = self._device_loads.get(device_id) != active_count
+                if changed:
+                    self._device_loads[device_id] = active_count
+            if changed:
+                self._stats_dirty = True
\ No newline at end of file
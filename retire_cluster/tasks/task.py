@@ -2,12 +2,50 @@
 Task definition and management for Retire-Cluster
 """
 
+import itertools
 import json
-import uuid
+import os
+import secrets
+import time
+from functools import lru_cache
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
-from dataclasses import dataclass, asdict
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Union
+from dataclasses import dataclass, field
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+
+# Task ids are a random per-process prefix plus a counter, which is much
+# cheaper than uuid4 when tasks are submitted in bulk
+_PROCESS_PREFIX = secrets.token_hex(6)
+_TASK_COUNTER = itertools.count()
+
+
+def _reseed_task_ids() -> None:
+    """Give a forked child its own id prefix so it cannot repeat the parent's ids"""
+    global _PROCESS_PREFIX, _TASK_COUNTER
+    _PROCESS_PREFIX = secrets.token_hex(6)
+    _TASK_COUNTER = itertools.count()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reseed_task_ids)
+
+
+def _generate_task_id() -> str:
+    """Generate a task id unique across processes"""
+    return f"{_PROCESS_PREFIX}-{next(_TASK_COUNTER):x}"
 
 
 class TaskStatus(Enum):
@@ -22,6 +60,16 @@ class TaskStatus(Enum):
     TIMEOUT = "timeout"
 
 
+# Status groups for membership tests on hot paths
+ACTIVE_STATUSES = frozenset({TaskStatus.ASSIGNED, TaskStatus.RUNNING})
+TERMINAL_STATUSES = frozenset({
+    TaskStatus.SUCCESS,
+    TaskStatus.FAILED,
+    TaskStatus.CANCELLED,
+    TaskStatus.TIMEOUT,
+})
+
+
 class TaskPriority(Enum):
     """Task priority levels"""
     LOW = 1
@@ -30,22 +78,154 @@ class TaskPriority(Enum):
     URGENT = 4
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TaskRequirements:
-    """Task execution requirements"""
+    """
+    Task execution requirements
+    
+    Instances are immutable and hashable; required_tags is stored as a
+    frozenset whatever iterable it is given as.
+    """
     min_cpu_cores: Optional[int] = None
     min_memory_gb: Optional[float] = None
     min_storage_gb: Optional[float] = None
     required_platform: Optional[str] = None  # "linux", "windows", "android", etc.
     required_role: Optional[str] = None      # "compute", "mobile", "storage", etc.
-    required_tags: Optional[List[str]] = None
+    required_tags: Optional[FrozenSet[str]] = None
     gpu_required: bool = False
     internet_required: bool = False
     timeout_seconds: int = 300
     max_retries: int = 3
+    
+    # Derived in __post_init__
+    _required_tags_frozen: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    _required_platform_lower: Optional[str] = field(init=False, repr=False, compare=False)
+    _is_trivial: bool = field(init=False, repr=False, compare=False)
+    _is_platform_only: bool = field(init=False, repr=False, compare=False)
+    _hash: int = field(init=False, repr=False, compare=False)
+    _dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        set_attr = object.__setattr__
+        if self.required_tags is not None and not isinstance(self.required_tags, frozenset):
+            set_attr(self, 'required_tags', frozenset(self.required_tags))
+        
+        # Precompute normalized values used on every matching call
+        set_attr(self, '_required_tags_frozen', self.required_tags or frozenset())
+        set_attr(self, '_required_platform_lower', self.required_platform.lower() if self.required_platform else None)
+        
+        # Classify the common shapes so matching can skip the full cascade
+        other_constraints = any([
+            self.min_cpu_cores, self.min_memory_gb, self.min_storage_gb,
+            self.required_role, self._required_tags_frozen, self.gpu_required
+        ])
+        set_attr(self, '_is_trivial', not other_constraints and not self._required_platform_lower)
+        set_attr(self, '_is_platform_only', not other_constraints and bool(self._required_platform_lower))
+        
+        # Hashed once so requirements are cheap cache keys
+        set_attr(self, '_hash', hash((
+            self.min_cpu_cores, self.min_memory_gb, self.min_storage_gb,
+            self.required_platform, self.required_role, self.required_tags,
+            self.gpu_required, self.internet_required, self.timeout_seconds, self.max_retries
+        )))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to dictionary for serialization
+        
+        Built once per instance (requirements are immutable); each call
+        returns a fresh copy that callers may modify.
+        """
+        data = self._dict
+        if data is None:
+            data = self._build_dict()
+            object.__setattr__(self, '_dict', data)
+        data = data.copy()
+        if self.required_tags is not None:
+            data['required_tags'] = list(data['required_tags'])
+        return data
+
+    def _build_dict(self) -> Dict[str, Any]:
+        """Serialized form cached by to_dict, with required_tags as a sorted tuple"""
+        return {
+            'min_cpu_cores': self.min_cpu_cores,
+            'min_memory_gb': self.min_memory_gb,
+            'min_storage_gb': self.min_storage_gb,
+            'required_platform': self.required_platform,
+            'required_role': self.required_role,
+            'required_tags': tuple(sorted(self.required_tags)) if self.required_tags is not None else None,
+            'gpu_required': self.gpu_required,
+            'internet_required': self.internet_required,
+            'timeout_seconds': self.timeout_seconds,
+            'max_retries': self.max_retries,
+        }
+
+    def is_satisfied_by(self, device: 'DeviceFingerprint') -> bool:
+        """Check if a device fingerprint meets these requirements"""
+        if self._is_trivial:
+            return True
+        
+        if self._is_platform_only:
+            return device.platform == self._required_platform_lower
+        
+        if self.min_cpu_cores and device.cpu_count < self.min_cpu_cores:
+            return False
+        
+        if self.min_memory_gb and device.memory_gb < self.min_memory_gb:
+            return False
+        
+        if self.min_storage_gb and device.storage_gb < self.min_storage_gb:
+            return False
+        
+        if self._required_platform_lower and device.platform != self._required_platform_lower:
+            return False
+        
+        if self.required_role and device.role != self.required_role:
+            return False
+        
+        if self._required_tags_frozen and not self._required_tags_frozen.issubset(device.tags):
+            return False
+        
+        if self.gpu_required and not device.has_gpu:
+            return False
+        
+        return True
+
+
+@lru_cache(maxsize=4096)
+def device_matches(device: 'DeviceFingerprint', requirements: TaskRequirements) -> bool:
+    """Cached requirement check; repeated (device, requirements) pairs are a dict hit"""
+    return requirements.is_satisfied_by(device)
 
 
-@dataclass
+class DeviceFingerprint(NamedTuple):
+    """Device capabilities normalized once for requirement matching"""
+    cpu_count: int
+    memory_gb: float
+    storage_gb: float
+    platform: str
+    role: str
+    tags: FrozenSet[str]
+    has_gpu: bool
+
+    @classmethod
+    def from_capabilities(cls, capabilities: Dict[str, Any]) -> 'DeviceFingerprint':
+        """Build a fingerprint from a device capabilities dictionary"""
+        return cls(
+            cpu_count=capabilities.get('cpu_count') or 0,
+            memory_gb=capabilities.get('memory_total_gb') or 0,
+            storage_gb=capabilities.get('storage_total_gb') or 0,
+            platform=(capabilities.get('platform') or '').lower(),
+            role=capabilities.get('role') or '',
+            tags=frozenset(capabilities.get('tags') or ()),
+            has_gpu=bool(capabilities.get('has_gpu', False))
+        )
+
+
+@dataclass(slots=True)
 class TaskResult:
     """Task execution result"""
     task_id: str
@@ -61,15 +241,19 @@ class TaskResult:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization"""
-        data = asdict(self)
-        data['status'] = self.status.value
-        
-        # Convert datetime objects to ISO format
-        for field in ['started_at', 'completed_at']:
-            if data[field]:
-                data[field] = data[field].isoformat()
-        
-        return data
+        return {
+            'task_id': self.task_id,
+            'status': self.status.value,
+            'result_data': self.result_data,
+            'error_message': self.error_message,
+            'error_traceback': self.error_traceback,
+            'execution_time_seconds': self.execution_time_seconds,
+            'worker_device_id': self.worker_device_id,
+            # Convert datetime objects to ISO format
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'logs': self.logs,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'TaskResult':
@@ -85,11 +269,63 @@ class TaskResult:
         return cls(**data)
 
 
+def _monotonic_ns_to_datetime(tick_ns: int) -> datetime:
+    """Convert a time.monotonic_ns() reading to an aware wall-clock datetime"""
+    age_ns = time.monotonic_ns() - tick_ns
+    return datetime.fromtimestamp((time.time_ns() - age_ns) / 1_000_000_000, tz=timezone.utc)
+
+
+class _LazyTimestamp:
+    """
+    Datetime attribute recorded as a monotonic tick
+    
+    State transitions only store time.monotonic_ns(); the datetime is built
+    the first time the attribute is read. Assigning a datetime (or None)
+    stores it directly.
+    """
+
+    def __set_name__(self, owner, name):
+        self.value_attr = f'_{name}'
+        self.tick_attr = f'_{name}_tick'
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.value_attr)
+        if value is None:
+            tick = getattr(obj, self.tick_attr)
+            if tick is not None:
+                value = _monotonic_ns_to_datetime(tick)
+                setattr(obj, self.value_attr, value)
+        return value
+
+    def __set__(self, obj, value):
+        setattr(obj, self.value_attr, value)
+        setattr(obj, self.tick_attr, None)
+
+    def stamp(self, obj) -> None:
+        """Record the current moment without building a datetime"""
+        setattr(obj, self.value_attr, None)
+        setattr(obj, self.tick_attr, time.monotonic_ns())
+
+
 class Task:
     """
     Distributed task for execution across the cluster
     """
 
+    __slots__ = (
+        'task_id', 'task_type', 'payload', 'priority', 'requirements', 'metadata',
+        'status', 'created_at', 'assigned_device_id',
+        '_assigned_at', '_assigned_at_tick', '_started_at', '_started_at_tick',
+        '_completed_at', '_completed_at_tick',
+        'retry_count', 'error_history', 'result',
+    )
+
+    assigned_at = _LazyTimestamp()
+    started_at = _LazyTimestamp()
+    completed_at = _LazyTimestamp()
+
     def __init__(
         self,
         task_type: str,
@@ -99,7 +335,7 @@ class Task:
         requirements: Optional[TaskRequirements] = None,
         metadata: Optional[Dict[str, Any]] = None
     ):
-        self.task_id = task_id or str(uuid.uuid4())
+        self.task_id = task_id or _generate_task_id()
         self.task_type = task_type
         self.payload = payload
         self.priority = priority
@@ -128,7 +364,7 @@ class Task:
             'task_type': self.task_type,
             'payload': self.payload,
             'priority': self.priority.value,
-            'requirements': asdict(self.requirements),
+            'requirements': self.requirements.to_dict(),
             'metadata': self.metadata,
             'status': self.status.value,
             'created_at': self.created_at.isoformat(),
@@ -179,35 +415,69 @@ class Task:
         
         return task
 
-    def to_json(self) -> str:
-        """Convert task to JSON string"""
-        return json.dumps(self.to_dict(), indent=2)
+    def to_json(self, pretty: bool = False) -> str:
+        """Convert task to JSON string (indented when pretty is set)"""
+        if ORJSON_AVAILABLE:
+            option = orjson.OPT_NON_STR_KEYS
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(self.to_dict(), option=option).decode()
+        return json.dumps(self.to_dict(), indent=2 if pretty else None)
 
     @classmethod
     def from_json(cls, json_str: str) -> 'Task':
         """Create task from JSON string"""
+        if ORJSON_AVAILABLE:
+            return cls.from_dict(orjson.loads(json_str))
         return cls.from_dict(json.loads(json_str))
 
+    def to_msgpack(self) -> bytes:
+        """Convert task to a compact msgpack payload for internal transport (requires msgpack)"""
+        if not MSGPACK_AVAILABLE:
+            raise ImportError("msgpack is required for Task.to_msgpack; install it with: pip install msgpack")
+        return msgpack.packb(self.to_dict(), use_bin_type=True)
+
+    @classmethod
+    def from_msgpack(cls, data: bytes) -> 'Task':
+        """Create task from a to_msgpack payload (requires msgpack)"""
+        if not MSGPACK_AVAILABLE:
+            raise ImportError("msgpack is required for Task.from_msgpack; install it with: pip install msgpack")
+        return cls.from_dict(msgpack.unpackb(data, raw=False))
+
     def assign_to_device(self, device_id: str) -> None:
         """Assign task to a specific device"""
         self.assigned_device_id = device_id
-        self.assigned_at = datetime.now(timezone.utc)
+        Task.assigned_at.stamp(self)
         self.status = TaskStatus.ASSIGNED
 
     def start_execution(self) -> None:
         """Mark task as started"""
-        self.started_at = datetime.now(timezone.utc)
+        Task.started_at.stamp(self)
         self.status = TaskStatus.RUNNING
 
+    def mark_completed(self) -> None:
+        """Record the completion time"""
+        Task.completed_at.stamp(self)
+
+    def completed_age_exceeds(self, cutoff_ns: int) -> bool:
+        """Check if the task completed before a monotonic_ns cutoff"""
+        if self._completed_at_tick is not None:
+            return self._completed_at_tick < cutoff_ns
+        if self.completed_at is None:
+            return False
+        # Restored via from_dict, so only the wall-clock timestamp is known
+        age_ns = (datetime.now(timezone.utc) - self.completed_at).total_seconds() * 1_000_000_000
+        return age_ns > time.monotonic_ns() - cutoff_ns
+
     def complete_success(self, result: TaskResult) -> None:
         """Mark task as successfully completed"""
-        self.completed_at = datetime.now(timezone.utc)
+        self.mark_completed()
         self.status = TaskStatus.SUCCESS
         self.result = result
 
     def complete_failure(self, result: TaskResult) -> None:
         """Mark task as failed"""
-        self.completed_at = datetime.now(timezone.utc)
+        self.mark_completed()
         self.status = TaskStatus.FAILED
         self.result = result
         self.retry_count += 1
@@ -237,16 +507,11 @@ class Task:
     def cancel(self) -> None:
         """Cancel the task"""
         self.status = TaskStatus.CANCELLED
-        self.completed_at = datetime.now(timezone.utc)
+        self.mark_completed()
 
     def is_terminal_status(self) -> bool:
         """Check if task is in a terminal status"""
-        return self.status in [
-            TaskStatus.SUCCESS,
-            TaskStatus.FAILED,
-            TaskStatus.CANCELLED,
-            TaskStatus.TIMEOUT
-        ]
+        return self.status in TERMINAL_STATUSES
 
     def get_execution_time(self) -> Optional[float]:
         """Get task execution time in seconds"""
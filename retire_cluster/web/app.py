@@ -2,16 +2,236 @@
 Flask web application for Retire-Cluster CLI interface
 """
 
+import gzip
+import hashlib
+import importlib
 import json
+import threading
 import time
 from datetime import datetime
-from flask import Flask, request, jsonify, Response, render_template_string
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from operator import itemgetter
+from types import SimpleNamespace
+from flask import Flask, request, Response
 from flask_cors import CORS
 from typing import Optional, Dict, Any
 
 from .cli_parser import CommandParser
 from .cli_executor import CommandExecutor
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize to a compact JSON string, using orjson when installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, default=str)
+
+
+def _json_response(obj: Any, status: int = 200) -> Response:
+    """Build a JSON response without going through jsonify"""
+    if ORJSON_AVAILABLE:
+        body = orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        body = json.dumps(obj, default=str)
+    return Response(body, status=status, mimetype='application/json')
+
+
+# Error bodies are fixed, so they are serialized once rather than per failed request
+_NOT_FOUND_BODY = _json_dumps({
+    'status': 'error',
+    'message': 'Endpoint not found',
+    'error_code': 'NOT_FOUND'
+}).encode('utf-8')
+
+_INTERNAL_ERROR_BODY = _json_dumps({
+    'status': 'error',
+    'message': 'Internal server error',
+    'error_code': 'INTERNAL_ERROR'
+}).encode('utf-8')
+
+
+@lru_cache(maxsize=1)
+def _iso_second(second: int) -> str:
+    return datetime.fromtimestamp(second).isoformat()
+
+
+def _iso_timestamp() -> str:
+    """Current local time as an ISO string, formatted at most once per second"""
+    return _iso_second(int(time.time()))
+
+
+def _stream_devices_json(devices):
+    """Yield the /api/v1/devices envelope piece by piece as devices are encoded"""
+    yield '{"status":"success","data":{"devices":['
+    count = 0
+    for device in devices:
+        yield (',' if count else '') + _json_dumps(device)
+        count += 1
+    yield '],"count":%d,"timestamp":%s}}' % (count, _json_dumps(_iso_timestamp()))
+
+
+# Columns of the /text/devices formats and their values for missing keys
+_DEVICE_ROW_DEFAULTS = {'id': '', 'status': '', 'cpu': 0, 'memory': 0, 'tasks': 0}
+_device_row_values = itemgetter(*_DEVICE_ROW_DEFAULTS)
+
+
+def _device_rows(devices, separator: str):
+    """Yield one delimited row per device"""
+    row = separator.join(['{}'] * len(_DEVICE_ROW_DEFAULTS)).format
+    for device in devices:
+        try:
+            values = _device_row_values(device)
+        except KeyError:
+            values = _device_row_values({**_DEVICE_ROW_DEFAULTS, **device})
+        yield row(*values)
+
+
+def _stream_lines(header, rows, chunk_rows: int = 512):
+    """
+    Yield newline-separated lines, starting with header when given
+    
+    Rows are joined in blocks of chunk_rows so large exports are written
+    in a few sizeable chunks rather than one tiny chunk per row.
+    """
+    first = True
+    if header is not None:
+        yield header
+        first = False
+    
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            return
+        block = '\n'.join(chunk)
+        yield block if first else '\n' + block
+        first = False
+
+
+# Prometheus exposition for /text/metrics; only the gauge values vary
+_METRICS_TEMPLATE = '\n'.join([
+    "# HELP cluster_devices_total Total number of devices in cluster",
+    "# TYPE cluster_devices_total gauge",
+    "cluster_devices_total %s",
+    "",
+    "# HELP cluster_devices_online Number of online devices",
+    "# TYPE cluster_devices_online gauge",
+    "cluster_devices_online %s",
+    "",
+    "# HELP cluster_cpu_usage_percent CPU usage percentage",
+    "# TYPE cluster_cpu_usage_percent gauge",
+    "cluster_cpu_usage_percent %s",
+    "",
+    "# HELP cluster_memory_usage_percent Memory usage percentage",
+    "# TYPE cluster_memory_usage_percent gauge",
+    "cluster_memory_usage_percent %s",
+    "",
+    "# HELP cluster_tasks_active Number of active tasks",
+    "# TYPE cluster_tasks_active gauge",
+    "cluster_tasks_active %s",
+])
+
+
+class _SharedPoll:
+    """
+    Result of a cluster server call shared by concurrent requests
+    
+    The call runs at most once per interval however many clients are
+    connected; requests in between get the last result. Values derived
+    from a result are memoized until the next fetch.
+    """
+    
+    def __init__(self, fetch, interval: float):
+        self._fetch = fetch
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._value = None
+        self._derived: Dict[str, Any] = {}
+        self._fetched_at: Optional[float] = None
+    
+    def get(self):
+        with self._lock:
+            self._refresh()
+            return self._value
+    
+    def get_derived(self, name: str, derive):
+        """derive(result), computed once per fetched result"""
+        with self._lock:
+            self._refresh()
+            if name not in self._derived:
+                self._derived[name] = derive(self._value)
+            return self._derived[name]
+    
+    def _refresh(self) -> None:
+        """Fetch again if the interval has passed (caller holds the lock)"""
+        now = time.monotonic()
+        if self._fetched_at is None or now - self._fetched_at >= self._interval:
+            self._value = self._fetch()
+            self._derived.clear()
+            self._fetched_at = now
+
+
+def _sse_frame(event: str, data: str) -> bytes:
+    """Encode one Server-Sent Events frame, ready to write to any client"""
+    return f"event: {event}\ndata: {data}\n\n".encode('utf-8')
+
+
+_SSE_HEARTBEAT = _sse_frame('heartbeat', '{}')
+
+
+def _log_frames(logs) -> list:
+    """(device, frame) pairs for a polled log list"""
+    return [(log.get('device'), _sse_frame('log', _json_dumps(log))) for log in logs]
+
+
+def _group_by_status(devices) -> Dict[Any, list]:
+    """Partition devices by their status field, keeping their order"""
+    groups: Dict[Any, list] = {}
+    for device in devices:
+        groups.setdefault(device.get('status'), []).append(device)
+    return groups
+
+
+# Keep proxies from caching or buffering event streams
+_SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+
+# The terminal page lives in static/cli.html so a reverse proxy can serve it
+# directly; when Flask serves it, it is read, hashed and compressed once
+_CLI_HTML_BYTES = (Path(__file__).parent / 'static' / 'cli.html').read_bytes()
+_CLI_ETAG = hashlib.blake2b(_CLI_HTML_BYTES, digest_size=8).hexdigest()
+_CLI_HTML_GZIP = gzip.compress(_CLI_HTML_BYTES, compresslevel=9, mtime=0)
+_CLI_GZIP_ETAG = _CLI_ETAG + '-gzip'
+
+
+def _placeholder_cluster_server() -> SimpleNamespace:
+    """Cluster server stand-in reporting an empty, healthy cluster"""
+    status = {
+        "status": "healthy",
+        "nodes_online": 0,
+        "nodes_total": 0,
+        "cpu_cores": 0,
+        "cpu_usage": 0,
+        "memory_total": 0,
+        "memory_usage": 0,
+        "tasks_active": 0,
+        "tasks_completed": 0,
+        "uptime": "0h 0m"
+    }
+    return SimpleNamespace(
+        get_devices=lambda: [],
+        get_cluster_status=lambda: dict(status),
+        get_logs=lambda: [],
+    )
+
 
 def create_app(cluster_server=None, testing=False):
     """
@@ -27,32 +247,29 @@ def create_app(cluster_server=None, testing=False):
     app = Flask(__name__)
     app.config['TESTING'] = testing
     
+    # Seconds between SSE polls of the cluster server
+    app.config.setdefault('SSE_DEVICE_INTERVAL', 5)
+    app.config.setdefault('SSE_LOG_INTERVAL', 1)
+    
     # Enable CORS
     CORS(app, origins=['*'])
     
+    # Without a cluster server (standalone or test runs), serve an empty cluster
+    if not cluster_server:
+        cluster_server = _placeholder_cluster_server()
+    
     # Initialize CLI components
     parser = CommandParser()
-    executor = CommandExecutor(cluster_server) if cluster_server else None
+    executor = CommandExecutor(cluster_server)
     
-    # Mock cluster server for testing if needed
-    if not cluster_server:
-        from unittest.mock import Mock
-        cluster_server = Mock()
-        cluster_server.get_devices.return_value = []
-        cluster_server.get_cluster_status.return_value = {
-            "status": "healthy",
-            "nodes_online": 0,
-            "nodes_total": 0,
-            "cpu_cores": 0,
-            "cpu_usage": 0,
-            "memory_total": 0,
-            "memory_usage": 0,
-            "tasks_active": 0,
-            "tasks_completed": 0,
-            "uptime": "0h 0m"
-        }
-        cluster_server.get_logs.return_value = []
-        executor = CommandExecutor(cluster_server)
+    # Cluster server reads are shared between requests for a short TTL so
+    # polling dashboards do not each hit the backend; test apps read
+    # through so mock changes show up immediately
+    app.config.setdefault('CLUSTER_CACHE_TTL', 0.5)
+    cache_ttl = 0 if testing else app.config['CLUSTER_CACHE_TTL']
+    cached_status = _SharedPoll(lambda: cluster_server.get_cluster_status(), cache_ttl)
+    cached_devices = _SharedPoll(lambda: cluster_server.get_devices(), cache_ttl)
+    cached_logs = _SharedPoll(lambda: cluster_server.get_logs(), cache_ttl)
     
     # Root route - redirect to CLI interface
     @app.route('/', methods=['GET'])
@@ -70,38 +287,40 @@ def create_app(cluster_server=None, testing=False):
             accept_header = request.headers.get('Accept', 'text/plain')
             status_filter = request.args.get('status')
             
-            devices = cluster_server.get_devices()
-            
-            # Apply filter
+            # Apply filter; the status partition is built once per device
+            # snapshot and shared by every filtered request
             if status_filter:
-                devices = [d for d in devices if d.get('status') == status_filter]
+                devices = cached_devices.get_derived('by_status', _group_by_status).get(status_filter, [])
+            else:
+                devices = cached_devices.get()
             
-            # Format based on Accept header
+            # Format based on Accept header; rows are streamed so large
+            # exports are not joined into one string first
             if 'text/csv' in accept_header:
                 # CSV format
-                lines = ['id,status,cpu,memory,tasks']
-                for device in devices:
-                    lines.append(f"{device.get('id', '')},{device.get('status', '')},{device.get('cpu', 0)},{device.get('memory', 0)},{device.get('tasks', 0)}")
-                response_text = '\n'.join(lines)
+                header = 'id,status,cpu,memory,tasks'
+                rows = _device_rows(devices, ',')
                 content_type = 'text/csv'
             
             elif 'text/tab-separated-values' in accept_header:
                 # TSV format
-                lines = ['id\tstatus\tcpu\tmemory\ttasks']
-                for device in devices:
-                    lines.append(f"{device.get('id', '')}\t{device.get('status', '')}\t{device.get('cpu', 0)}\t{device.get('memory', 0)}\t{device.get('tasks', 0)}")
-                response_text = '\n'.join(lines)
+                header = 'id\tstatus\tcpu\tmemory\ttasks'
+                rows = _device_rows(devices, '\t')
                 content_type = 'text/tab-separated-values'
             
+            elif 'application/x-ndjson' in accept_header:
+                # NDJSON format, one full device record per line
+                header = None
+                rows = (_json_dumps(device) for device in devices)
+                content_type = 'application/x-ndjson'
+            
             else:
                 # Default pipe-delimited format
-                lines = []
-                for device in devices:
-                    lines.append(f"{device.get('id', '')}|{device.get('status', '')}|{device.get('cpu', 0)}|{device.get('memory', 0)}|{device.get('tasks', 0)}")
-                response_text = '\n'.join(lines)
+                header = None
+                rows = _device_rows(devices, '|')
                 content_type = 'text/plain'
             
-            return Response(response_text, mimetype=content_type, headers={'Content-Type': f'{content_type}; charset=utf-8'})
+            return Response(_stream_lines(header, rows), mimetype=content_type, headers={'Content-Type': f'{content_type}; charset=utf-8'})
             
         except Exception as e:
             # Return error response 
@@ -110,87 +329,65 @@ def create_app(cluster_server=None, testing=False):
     @app.route('/text/status', methods=['GET'])
     def text_status():
         """Return cluster status in plain text format"""
-        status = cluster_server.get_cluster_status()
+        status = cached_status.get()
         
-        lines = [
-            f"STATUS: {status.get('status', 'unknown')}",
-            f"NODES: {status.get('nodes_online', 0)}/{status.get('nodes_total', 0)} online",
-            f"CPU: {status.get('cpu_cores', 0)} cores ({status.get('cpu_usage', 0)}% utilized)",
-            f"MEMORY: {status.get('memory_total', 0)}GB ({status.get('memory_usage', 0)}% used)",
-            f"TASKS: {status.get('tasks_active', 0)} active, {status.get('tasks_completed', 0)} completed today",
+        body = (
+            f"STATUS: {status.get('status', 'unknown')}\n"
+            f"NODES: {status.get('nodes_online', 0)}/{status.get('nodes_total', 0)} online\n"
+            f"CPU: {status.get('cpu_cores', 0)} cores ({status.get('cpu_usage', 0)}% utilized)\n"
+            f"MEMORY: {status.get('memory_total', 0)}GB ({status.get('memory_usage', 0)}% used)\n"
+            f"TASKS: {status.get('tasks_active', 0)} active, {status.get('tasks_completed', 0)} completed today\n"
             f"UPTIME: {status.get('uptime', 'N/A')}"
-        ]
+        )
         
-        return Response('\n'.join(lines), mimetype='text/plain', headers={'Content-Type': 'text/plain; charset=utf-8'})
+        return Response(body, mimetype='text/plain', headers={'Content-Type': 'text/plain; charset=utf-8'})
     
     @app.route('/text/metrics', methods=['GET'])
     def text_metrics():
         """Return metrics in Prometheus format"""
-        status = cluster_server.get_cluster_status()
-        devices = cluster_server.get_devices()
+        status = cached_status.get()
+        devices = cached_devices.get()
         
-        online_devices = len([d for d in devices if d.get('status') == 'online'])
+        online_devices = len(cached_devices.get_derived('by_status', _group_by_status).get('online', ()))
         
-        lines = [
-            "# HELP cluster_devices_total Total number of devices in cluster",
-            "# TYPE cluster_devices_total gauge",
-            f"cluster_devices_total {len(devices)}",
-            "",
-            "# HELP cluster_devices_online Number of online devices",
-            "# TYPE cluster_devices_online gauge",
-            f"cluster_devices_online {online_devices}",
-            "",
-            "# HELP cluster_cpu_usage_percent CPU usage percentage",
-            "# TYPE cluster_cpu_usage_percent gauge",
-            f"cluster_cpu_usage_percent {status.get('cpu_usage', 0)}",
-            "",
-            "# HELP cluster_memory_usage_percent Memory usage percentage",
-            "# TYPE cluster_memory_usage_percent gauge",
-            f"cluster_memory_usage_percent {status.get('memory_usage', 0)}",
-            "",
-            "# HELP cluster_tasks_active Number of active tasks",
-            "# TYPE cluster_tasks_active gauge",
-            f"cluster_tasks_active {status.get('tasks_active', 0)}",
-        ]
+        body = _METRICS_TEMPLATE % (
+            len(devices),
+            online_devices,
+            status.get('cpu_usage', 0),
+            status.get('memory_usage', 0),
+            status.get('tasks_active', 0),
+        )
         
-        return Response('\n'.join(lines), mimetype='text/plain', headers={'Content-Type': 'text/plain; charset=utf-8'})
+        return Response(body, mimetype='text/plain', headers={'Content-Type': 'text/plain; charset=utf-8'})
     
     @app.route('/text/logs', methods=['GET'])
     def text_logs():
         """Return logs in plain text format"""
-        logs = cluster_server.get_logs()
+        logs = cached_logs.get()
         
-        lines = []
-        for log in logs:
-            timestamp = log.get('timestamp', '')
-            level = log.get('level', 'INFO')
-            message = log.get('message', '')
-            lines.append(f"[{timestamp}] {level}: {message}")
+        # Streamed so a deep log buffer is never held as one joined body
+        lines = (
+            f"[{log.get('timestamp', '')}] {log.get('level', 'INFO')}: {log.get('message', '')}"
+            for log in logs
+        )
         
-        return Response('\n'.join(lines), mimetype='text/plain', headers={'Content-Type': 'text/plain; charset=utf-8'})
+        return Response(_stream_lines(None, lines), mimetype='text/plain', headers={'Content-Type': 'text/plain; charset=utf-8'})
     
     # JSON API Endpoints
     
     @app.route('/api/v1/devices', methods=['GET'])
     def api_devices():
-        """Return devices in JSON format"""
-        devices = cluster_server.get_devices()
+        """Return devices in JSON format, streamed one device at a time"""
+        devices = cached_devices.get()
         
-        return jsonify({
-            'status': 'success',
-            'data': {
-                'devices': devices,
-                'count': len(devices),
-                'timestamp': datetime.now().isoformat()
-            }
-        })
+        return Response(_stream_devices_json(devices), mimetype='application/json')
     
     @app.route('/api/v1/cluster/status', methods=['GET'])
     def api_cluster_status():
         """Return cluster status in JSON format"""
-        status = cluster_server.get_cluster_status()
+        status = cached_status.get()
         
-        return jsonify({
+        return _json_response({
             'status': 'success',
             'data': {
                 'cluster_status': status.get('status'),
@@ -206,43 +403,55 @@ def create_app(cluster_server=None, testing=False):
             }
         })
     
+    @lru_cache(maxsize=1024)
+    def _parse_valid_command(command_str: str) -> Optional[Dict[str, Any]]:
+        """Parsed command, or None if invalid; memoized as terminals resend the same commands"""
+        parsed = parser.parse(command_str)
+        return parsed if parser.validate(parsed) else None
+    
+    def _parse_and_validate(command_str: str) -> Optional[Dict[str, Any]]:
+        """Copy of the memoized parse so the executor cannot alter the cached one"""
+        parsed = _parse_valid_command(command_str)
+        if parsed is None:
+            return None
+        return dict(parsed, options=dict(parsed['options']), arguments=list(parsed['arguments']))
+    
     @app.route('/api/v1/command', methods=['POST'])
     def api_command():
         """Execute a CLI command"""
         data = request.get_json()
         
         if not data or 'command' not in data:
-            return jsonify({
+            return _json_response({
                 'status': 'error',
                 'message': 'Command required',
                 'error_code': 'MISSING_COMMAND'
-            }), 400
+            }, 400)
         
         command_str = data.get('command')
         format_type = data.get('format', 'text')
         
-        # Parse command
-        parsed = parser.parse(command_str)
+        # Parse and validate command
+        parsed = _parse_and_validate(command_str) if isinstance(command_str, str) else None
         
-        # Validate command
-        if not parser.validate(parsed):
-            return jsonify({
+        if parsed is None:
+            return _json_response({
                 'status': 'error',
                 'message': f"Invalid command: {command_str}",
                 'error_code': 'INVALID_COMMAND'
-            }), 400
+            }, 400)
         
         # Execute command
-        result = executor.execute(parsed)
+        result = executor.execute(parsed, timestamp=_iso_timestamp())
         
         if result['status'] == 'error':
-            return jsonify({
+            return _json_response({
                 'status': 'error',
                 'message': result.get('error', 'Command execution failed'),
                 'error_code': 'EXECUTION_ERROR'
-            }), 400
+            }, 400)
         
-        return jsonify({
+        return _json_response({
             'status': 'success',
             'command': command_str,
             'format': format_type,
@@ -252,6 +461,18 @@ def create_app(cluster_server=None, testing=False):
     
     # Streaming Endpoints (SSE)
     
+    # One poll of the cluster server per interval, shared by all streams;
+    # test apps poll on every request so mock changes show up immediately.
+    # Frames are encoded once per poll and written as-is to every client
+    def _device_frame():
+        return _sse_frame('device_update', _json_dumps({
+            'timestamp': _iso_timestamp(),
+            'devices': cached_devices.get()
+        }))
+    
+    shared_devices = _SharedPoll(_device_frame, 0 if testing else app.config['SSE_DEVICE_INTERVAL'])
+    shared_logs = _SharedPoll(cached_logs.get, 0 if testing else app.config['SSE_LOG_INTERVAL'])
+    
     @app.route('/stream/devices', methods=['GET'])
     def stream_devices():
         """Stream device updates using Server-Sent Events"""
@@ -260,18 +481,13 @@ def create_app(cluster_server=None, testing=False):
             max_events = 1 if app.config.get('TESTING') else float('inf')
             
             while count < max_events:
-                devices = cluster_server.get_devices()
-                data = json.dumps({
-                    'timestamp': datetime.now().isoformat(),
-                    'devices': devices
-                })
-                yield f"event: device_update\ndata: {data}\n\n"
+                yield shared_devices.get()
                 count += 1
                 
                 if not app.config.get('TESTING'):
-                    time.sleep(5)  # Update every 5 seconds
+                    time.sleep(app.config['SSE_DEVICE_INTERVAL'])
         
-        return Response(generate(), mimetype='text/event-stream')
+        return Response(generate(), mimetype='text/event-stream', headers=_SSE_HEADERS)
     
     @app.route('/stream/logs', methods=['GET'])
     def stream_logs():
@@ -284,226 +500,148 @@ def create_app(cluster_server=None, testing=False):
             max_events = 1 if app.config.get('TESTING') else float('inf')
             
             while count < max_events:
-                logs = cluster_server.get_logs()
+                frames = shared_logs.get_derived('frames', _log_frames)
                 
                 # Send new logs only
-                if len(logs) > last_index:
-                    new_logs = logs[last_index:]
-                    for log in new_logs:
-                        if device_filter and log.get('device') != device_filter:
+                if len(frames) > last_index:
+                    for device, frame in frames[last_index:]:
+                        if device_filter and device != device_filter:
                             continue
                         
-                        data = json.dumps(log)
-                        yield f"event: log\ndata: {data}\n\n"
+                        yield frame
                         count += 1
                     
-                    last_index = len(logs)
+                    last_index = len(frames)
                 else:
                     # Send a heartbeat event for testing
-                    yield f"event: heartbeat\ndata: {{}}\n\n"
+                    yield _SSE_HEARTBEAT
                     count += 1
                 
                 if not app.config.get('TESTING'):
-                    time.sleep(1)  # Check for new logs every second
+                    time.sleep(app.config['SSE_LOG_INTERVAL'])
         
-        return Response(generate(), mimetype='text/event-stream')
+        return Response(generate(), mimetype='text/event-stream', headers=_SSE_HEADERS)
     
     # CLI Terminal Interface
     
     @app.route('/cli', methods=['GET'])
     def cli_interface():
         """Render CLI terminal interface"""
-        html = """
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Retire-Cluster Terminal</title>
-            <link rel="stylesheet" href="/static/css/terminal.css">
-            <link rel="icon" href="data:image/svg+xml,<svg xmlns=%22http://www.w3.org/2000/svg%22 viewBox=%220 0 100 100%22><text y=%22.9em%22 font-size=%2290%22>⚡</text></svg>">
-        </head>
-        <body class="theme-matrix">
-            <!-- Terminal Header -->
-            <div class="terminal-header">
-                <div class="terminal-title">
-                    <span class="icon">⚡</span>
-                    <span>RETIRE-CLUSTER</span>
-                    <span style="font-size: 12px; opacity: 0.7;">v1.1.0</span>
-                </div>
-                
-                <div class="terminal-status">
-                    <div>
-                        <span class="status-indicator online"></span>
-                        <span class="status-text">Connected</span>
-                    </div>
-                    <div id="currentTime"></div>
-                    <div>
-                        <select id="themeSelect" style="background: var(--bg-secondary); color: var(--text-primary); border: 1px solid var(--text-dim); font-size: 12px;">
-                            <option value="matrix">Matrix</option>
-                            <option value="amber">Amber</option>
-                            <option value="blue">Blue</option>
-                        </select>
-                    </div>
-                    <button id="sidebarToggle" style="background: none; border: 1px solid var(--text-dim); color: var(--text-primary); padding: 5px 10px; cursor: pointer; font-size: 12px;">
-                        Info
-                    </button>
-                </div>
-            </div>
-            
-            <!-- Terminal Main Area -->
-            <div class="terminal-main">
-                <div class="terminal-container">
-                    <div id="terminal"></div>
-                </div>
-                
-                <!-- Sidebar -->
-                <div class="terminal-sidebar">
-                    <div class="sidebar-section">
-                        <h3>Quick Commands</h3>
-                        <ul>
-                            <li><code>help</code> - Show all commands</li>
-                            <li><code>cluster status</code> - Cluster overview</li>
-                            <li><code>devices list</code> - List all devices</li>
-                            <li><code>tasks list</code> - Show active tasks</li>
-                            <li><code>monitor devices</code> - Real-time monitoring</li>
-                            <li><code>export devices --format=csv</code> - Export data</li>
-                        </ul>
-                    </div>
-                    
-                    <div class="sidebar-section">
-                        <h3>Keyboard Shortcuts</h3>
-                        <ul>
-                            <li><strong>Tab</strong> - Auto-complete</li>
-                            <li><strong>↑/↓</strong> - Command history</li>
-                            <li><strong>Ctrl+C</strong> - Cancel command</li>
-                            <li><strong>Ctrl+L</strong> - Clear screen</li>
-                            <li><strong>Ctrl+R</strong> - Search history</li>
-                        </ul>
-                    </div>
-                    
-                    <div class="sidebar-section">
-                        <h3>Output Formats</h3>
-                        <ul>
-                            <li><code>--format=table</code> - ASCII table</li>
-                            <li><code>--format=json</code> - JSON output</li>
-                            <li><code>--format=csv</code> - CSV format</li>
-                            <li><code>--format=tsv</code> - Tab-separated</li>
-                        </ul>
-                    </div>
-                    
-                    <div class="sidebar-section">
-                        <h3>Examples</h3>
-                        <ul>
-                            <li><code>devices list --status=online</code></li>
-                            <li><code>tasks submit echo --payload='{"msg":"test"}'</code></li>
-                            <li><code>monitor logs --device=android-001</code></li>
-                        </ul>
-                    </div>
-                </div>
-            </div>
-            
-            <!-- Terminal Footer -->
-            <div class="terminal-footer">
-                <div class="footer-shortcuts">
-                    <span><span class="key">F1</span> Help</span>
-                    <span><span class="key">F2</span> Devices</span>
-                    <span><span class="key">F3</span> Tasks</span>
-                    <span><span class="key">F4</span> Logs</span>
-                    <span><span class="key">Ctrl+L</span> Clear</span>
-                </div>
-                
-                <div class="footer-info">
-                    <span id="connectionInfo">API: Ready</span>
-                    <span>⚡ CLI-First Design</span>
-                </div>
-            </div>
-            
-            <!-- Load xterm.js -->
-            <script src="https://cdn.jsdelivr.net/npm/xterm@5.3.0/lib/xterm.js"></script>
-            <script src="https://cdn.jsdelivr.net/npm/xterm-addon-fit@0.8.0/lib/xterm-addon-fit.js"></script>
-            <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/xterm@5.3.0/css/xterm.css" />
-            
-            <!-- Load our terminal implementation -->
-            <script src="/static/js/terminal.js"></script>
-            
-            <script>
-                // Update time display
-                function updateTime() {
-                    const now = new Date();
-                    document.getElementById('currentTime').textContent = now.toLocaleTimeString();
-                }
-                
-                updateTime();
-                setInterval(updateTime, 1000);
-                
-                // Handle function keys
-                document.addEventListener('keydown', (event) => {
-                    if (event.key === 'F1') {
-                        event.preventDefault();
-                        if (window.terminal) {
-                            window.terminal.term.write('help\\r');
-                            window.terminal.executeCommand();
-                        }
-                    }
-                });
-                
-                // Ensure proper sizing after page load
-                window.addEventListener('load', function() {
-                    setTimeout(function() {
-                        if (window.terminal && window.terminal.fitAddon) {
-                            window.terminal.fitAddon.fit();
-                        }
-                    }, 100);
-                });
-                
-                // Handle page visibility changes
-                document.addEventListener('visibilitychange', function() {
-                    if (!document.hidden && window.terminal && window.terminal.fitAddon) {
-                        setTimeout(function() {
-                            window.terminal.fitAddon.fit();
-                        }, 50);
-                    }
-                });
-            </script>
-        </body>
-        </html>
-        """
-        return render_template_string(html)
+        headers = {'Cache-Control': 'public, max-age=3600', 'Vary': 'Accept-Encoding'}
+        if request.accept_encodings['gzip']:
+            headers['Content-Encoding'] = 'gzip'
+            response = Response(_CLI_HTML_GZIP, mimetype='text/html', headers=headers)
+            response.set_etag(_CLI_GZIP_ETAG)
+        else:
+            response = Response(_CLI_HTML_BYTES, mimetype='text/html', headers=headers)
+            response.set_etag(_CLI_ETAG)
+        return response.make_conditional(request)
     
     # Error handlers
     
     @app.errorhandler(404)
     def not_found(error):
-        return jsonify({
-            'status': 'error',
-            'message': 'Endpoint not found',
-            'error_code': 'NOT_FOUND'
-        }), 404
+        return Response(_NOT_FOUND_BODY, status=404, mimetype='application/json')
     
     @app.errorhandler(500)
     def internal_error(error):
-        return jsonify({
-            'status': 'error',
-            'message': 'Internal server error',
-            'error_code': 'INTERNAL_ERROR'
-        }), 500
+        return Response(_INTERNAL_ERROR_BODY, status=500, mimetype='application/json')
     
     return app
 
 
-def run_server(cluster_server=None, host='0.0.0.0', port=8081, debug=False):
+def _green_worker_class() -> Optional[str]:
+    """Gunicorn worker class for the installed green-thread library, if any"""
+    for module, worker_class in (('gevent', 'gevent'), ('eventlet', 'eventlet')):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        return worker_class
+    return None
+
+
+def _load_app_factory(app_factory: str):
+    """Import the 'module:callable' named by app_factory"""
+    module_name, _, attr = app_factory.partition(':')
+    module = importlib.import_module(module_name)
+    return getattr(module, attr)
+
+
+def _run_gunicorn(app_factory: str, host: str, port: int, workers: int) -> None:
+    """
+    Serve the app built by app_factory with gunicorn and green-thread workers
+    
+    The factory is imported and called in each worker, after the worker
+    has monkey-patched the process, so every worker opens its own cluster
+    connection and the app's locks are green locks.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise RuntimeError("server='gunicorn' requires gunicorn to be installed")
+    
+    worker_class = _green_worker_class()
+    if worker_class is None:
+        raise RuntimeError("server='gunicorn' requires gevent or eventlet to be installed")
+    
+    # gunicorn's arbiter installs signal handlers, which only the main thread may do
+    if threading.current_thread() is not threading.main_thread():
+        raise RuntimeError("server='gunicorn' must be started from the main thread")
+    
+    class _Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', workers)
+            self.cfg.set('worker_class', worker_class)
+            # SSE clients hold their connection open indefinitely
+            self.cfg.set('timeout', 0)
+        
+        def load(self):
+            return _load_app_factory(app_factory)()
+    
+    _Application().run()
+
+
+def run_server(cluster_server=None, host='0.0.0.0', port=8081, debug=False,
+               server='werkzeug', workers=1, app_factory: Optional[str] = None):
     """
     Run the Flask web server
     
+    By default the app is served by the threaded Werkzeug server in this
+    process, so it sees the live state of an in-process cluster_server.
+    
+    server='gunicorn' serves it with gevent or eventlet workers instead.
+    Gunicorn always forks its workers, even when there is only one, so an
+    in-process cluster_server cannot be shared with them. Instead,
+    app_factory names a 'module:callable' that each worker calls to build
+    its app, typically create_app() around a connection to the cluster.
+    This mode must be started from the main thread.
+    
     Args:
-        cluster_server: Cluster server instance
+        cluster_server: Cluster server instance (Werkzeug only)
         host: Host to bind to
         port: Port to bind to
-        debug: Enable debug mode
+        debug: Enable debug mode (Werkzeug only)
+        server: 'werkzeug' or 'gunicorn'
+        workers: Gunicorn worker processes
+        app_factory: 'module:callable' returning the app (gunicorn only)
     """
+    if server == 'gunicorn':
+        if cluster_server is not None:
+            raise ValueError("server='gunicorn' forks worker processes and cannot "
+                             "share an in-process cluster_server; pass app_factory")
+        if not app_factory or ':' not in app_factory:
+            raise ValueError("server='gunicorn' requires app_factory='module:callable'")
+        if debug:
+            raise ValueError("debug mode requires server='werkzeug'")
+        _run_gunicorn(app_factory, host, port, workers)
+        return
+    if server != 'werkzeug':
+        raise ValueError(f"Unknown server: {server}")
+    
     app = create_app(cluster_server)
-    app.run(host=host, port=port, debug=debug)
+    app.run(host=host, port=port, debug=debug, threaded=True)
 
 
 if __name__ == '__main__':
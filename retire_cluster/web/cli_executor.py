@@ -3,15 +3,153 @@ CLI command executor for Retire-Cluster web interface
 """
 
 import json
-import csv
-import io
+import threading
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps_json(obj: Any) -> str:
+    """Serialize command output to indented JSON, using orjson when installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(obj, default=str, indent=2)
+
+
+def _dumps_json_line(obj: Any) -> str:
+    """Serialize one record to compact single-line JSON"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str).decode('utf-8')
+    return json.dumps(obj, default=str, separators=(',', ':'))
+
+
+_HELP_TEXT = """Available commands:
+
+  cluster status    Show cluster status
+  cluster health    Check cluster health
+  cluster metrics   Show cluster metrics
+  
+  devices list      List all devices
+  devices show      Show device details
+  devices ping      Ping device(s)
+  
+  tasks list        List tasks
+  tasks submit      Submit new task
+  tasks show        Show task details
+  
+  monitor devices   Monitor device status
+  monitor tasks     Monitor task execution
+  monitor logs      Monitor logs
+  
+  export devices    Export device data
+  export tasks      Export task data
+  
+  help              Show this help
+  clear             Clear screen
+  exit              Exit interface
+"""
+
+# Results of the fixed commands; handlers return copies so callers may mutate them
+_HELP_RESULT = {
+    "status": "success",
+    "output": _HELP_TEXT,
+    "format": "text",
+    "exit_code": 0
+}
+
+_CLEAR_RESULT = {
+    "status": "success",
+    "action": "clear",
+    "exit_code": 0
+}
+
+_EXIT_RESULT = {
+    "status": "success",
+    "action": "exit",
+    "exit_code": 0
+}
+
+
+# Fixed error results, copied on return like the results above
+_NO_COMMAND_ERROR = {
+    "status": "error",
+    "error": "No command specified",
+    "exit_code": 2
+}
+
+_DEVICE_ID_ERROR = {
+    "status": "error",
+    "error": "Device ID required",
+    "exit_code": 1
+}
+
+
+def _error(message: str, exit_code: int = 1) -> Dict[str, Any]:
+    """Error result for a message only known at run time"""
+    return {"status": "error", "error": message, "exit_code": exit_code}
+
+
+# Singular verbs accepted as aliases of the plural command groups
+_VERB_ALIASES = {'device': 'devices', 'task': 'tasks'}
+
+
+def _with_verb_aliases(table: Dict[Any, str]) -> Dict[Any, str]:
+    """Copy of a table keyed by verb or (verb, noun) with entries for the singular aliases"""
+    aliased = dict(table)
+    for alias, verb in _VERB_ALIASES.items():
+        for key, value in table.items():
+            if key == verb:
+                aliased[alias] = value
+            elif isinstance(key, tuple) and key[0] == verb:
+                aliased[(alias,) + key[1:]] = value
+    return aliased
+
 
 class CommandExecutor:
     """Execute parsed CLI commands"""
     
+    _TABLE_HEADER = "ID           STATUS   CPU    MEM     TASKS  UPTIME\n" + "─" * 54 + "\n"
+    _TABLE_ROW = "%-12s %-8s %3s%%   %4.1fGB  %3s    %s\n"
+    
+    # Dispatch tables hold method names, resolved per call, so they are built
+    # once per class instead of as bound methods in every instance
+    
+    # Verbs handled the same whatever the noun
+    _VERB_HANDLERS = {
+        'help': '_handle_help',
+        'clear': '_handle_clear',
+        'exit': '_handle_exit',
+        'monitor': '_handle_monitor',
+    }
+    
+    # Leaf handlers keyed by (verb, noun), so dispatch is one lookup
+    _DISPATCH = _with_verb_aliases({
+        ('cluster', 'status'): '_get_cluster_status',
+        ('cluster', 'health'): '_get_cluster_health',
+        ('cluster', 'metrics'): '_get_cluster_metrics',
+        ('devices', 'list'): '_list_devices',
+        ('devices', 'show'): '_show_device',
+        ('devices', 'ping'): '_ping_device',
+        ('tasks', 'list'): '_list_tasks',
+        ('tasks', 'submit'): '_submit_task',
+        ('tasks', 'show'): '_show_task',
+        ('export', 'devices'): '_export_devices',
+        ('export', 'tasks'): '_export_tasks',
+    })
+    
+    # Error prefix for a known verb given an unknown noun
+    _UNKNOWN_NOUN_ERRORS = _with_verb_aliases({
+        'cluster': 'Unknown cluster command',
+        'devices': 'Unknown devices command',
+        'tasks': 'Unknown tasks command',
+        'export': 'Unknown export target',
+    })
+    
     def __init__(self, cluster_server):
         """
         Initialize command executor
@@ -20,163 +158,59 @@ class CommandExecutor:
             cluster_server: Cluster server instance
         """
         self.cluster_server = cluster_server
-        self.command_handlers = {
-            'help': self._handle_help,
-            'clear': self._handle_clear,
-            'exit': self._handle_exit,
-            'cluster': self._handle_cluster,
-            'devices': self._handle_devices,
-            'device': self._handle_device,
-            'tasks': self._handle_tasks,
-            'task': self._handle_task,
-            'monitor': self._handle_monitor,
-            'export': self._handle_export,
-        }
+        
+        # Per-thread state of the command being executed
+        self._request = threading.local()
     
-    def execute(self, parsed_command: Dict[str, Any]) -> Dict[str, Any]:
+    def execute(self, parsed_command: Dict[str, Any],
+                timestamp: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute a parsed command
         
         Args:
             parsed_command: Parsed command dictionary
+            timestamp: ISO timestamp of the request; taken once on first use if omitted
             
         Returns:
             Execution result with status and output
         """
+        self._request.timestamp = timestamp
         verb = parsed_command.get('verb')
         
         if not verb:
-            return {
-                "status": "error",
-                "error": "No command specified",
-                "exit_code": 2
-            }
+            return dict(_NO_COMMAND_ERROR)
         
-        if verb not in self.command_handlers:
-            return {
-                "status": "error",
-                "error": f"Unknown command: {verb}",
-                "exit_code": 1
-            }
+        name = self._VERB_HANDLERS.get(verb)
+        if name is None:
+            noun = parsed_command.get('noun')
+            name = self._DISPATCH.get((verb, noun))
+            if name is None:
+                prefix = self._UNKNOWN_NOUN_ERRORS.get(verb)
+                return _error(f"{prefix}: {noun}" if prefix else f"Unknown command: {verb}")
         
         try:
-            handler = self.command_handlers[verb]
-            return handler(parsed_command)
+            return getattr(self, name)(parsed_command)
         except Exception as e:
-            return {
-                "status": "error",
-                "error": str(e),
-                "exit_code": 1
-            }
+            return _error(str(e))
+    
+    def _request_timestamp(self) -> str:
+        """ISO timestamp of the command being executed, computed at most once"""
+        timestamp = getattr(self._request, 'timestamp', None)
+        if timestamp is None:
+            timestamp = self._request.timestamp = datetime.now().isoformat()
+        return timestamp
     
     def _handle_help(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """Handle help command"""
-        help_text = """Available commands:
-
-  cluster status    Show cluster status
-  cluster health    Check cluster health
-  cluster metrics   Show cluster metrics
-  
-  devices list      List all devices
-  devices show      Show device details
-  devices ping      Ping device(s)
-  
-  tasks list        List tasks
-  tasks submit      Submit new task
-  tasks show        Show task details
-  
-  monitor devices   Monitor device status
-  monitor tasks     Monitor task execution
-  monitor logs      Monitor logs
-  
-  export devices    Export device data
-  export tasks      Export task data
-  
-  help              Show this help
-  clear             Clear screen
-  exit              Exit interface
-"""
-        return {
-            "status": "success",
-            "output": help_text,
-            "format": "text",
-            "exit_code": 0
-        }
+        return dict(_HELP_RESULT)
     
     def _handle_clear(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """Handle clear command"""
-        return {
-            "status": "success",
-            "action": "clear",
-            "exit_code": 0
-        }
+        return dict(_CLEAR_RESULT)
     
     def _handle_exit(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """Handle exit command"""
-        return {
-            "status": "success",
-            "action": "exit",
-            "exit_code": 0
-        }
-    
-    def _handle_cluster(self, command: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle cluster commands"""
-        noun = command.get('noun')
-        
-        if noun == 'status':
-            return self._get_cluster_status(command)
-        elif noun == 'health':
-            return self._get_cluster_health(command)
-        elif noun == 'metrics':
-            return self._get_cluster_metrics(command)
-        else:
-            return {
-                "status": "error",
-                "error": f"Unknown cluster command: {noun}",
-                "exit_code": 1
-            }
-    
-    def _handle_devices(self, command: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle devices commands"""
-        noun = command.get('noun')
-        
-        if noun == 'list':
-            return self._list_devices(command)
-        elif noun == 'show':
-            return self._show_device(command)
-        elif noun == 'ping':
-            return self._ping_device(command)
-        else:
-            return {
-                "status": "error",
-                "error": f"Unknown devices command: {noun}",
-                "exit_code": 1
-            }
-    
-    def _handle_device(self, command: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle single device commands"""
-        return self._handle_devices(command)
-    
-    def _handle_tasks(self, command: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle tasks commands"""
-        noun = command.get('noun')
-        
-        if noun == 'list':
-            return self._list_tasks(command)
-        elif noun == 'submit':
-            return self._submit_task(command)
-        elif noun == 'show':
-            return self._show_task(command)
-        else:
-            return {
-                "status": "error",
-                "error": f"Unknown tasks command: {noun}",
-                "exit_code": 1
-            }
-    
-    def _handle_task(self, command: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle single task commands"""
-        return self._handle_tasks(command)
+        return dict(_EXIT_RESULT)
     
     def _handle_monitor(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """Handle monitor commands"""
@@ -190,21 +224,6 @@ class CommandExecutor:
             "exit_code": 0
         }
     
-    def _handle_export(self, command: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle export commands"""
-        noun = command.get('noun')
-        
-        if noun == 'devices':
-            return self._export_devices(command)
-        elif noun == 'tasks':
-            return self._export_tasks(command)
-        else:
-            return {
-                "status": "error",
-                "error": f"Unknown export target: {noun}",
-                "exit_code": 1
-            }
-    
     def _get_cluster_status(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """Get cluster status"""
         try:
@@ -226,11 +245,7 @@ Uptime:       {status.get('uptime', 'N/A')}
                 "exit_code": 0
             }
         except Exception as e:
-            return {
-                "status": "error",
-                "error": str(e),
-                "exit_code": 1
-            }
+            return _error(str(e))
     
     def _get_cluster_health(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """Get cluster health"""
@@ -267,11 +282,12 @@ Uptime:       {status.get('uptime', 'N/A')}
             
             # Format output based on requested format
             if format_type == 'json':
-                output = {
+                # Serialized here so callers ship the text as-is
+                output = _dumps_json({
                     "devices": devices,
                     "count": len(devices),
-                    "timestamp": datetime.now().isoformat()
-                }
+                    "timestamp": self._request_timestamp()
+                })
                 return {
                     "status": "success",
                     "output": output,
@@ -279,6 +295,16 @@ Uptime:       {status.get('uptime', 'N/A')}
                     "exit_code": 0
                 }
             
+            elif format_type == 'ndjson':
+                # One device per line, so large listings never hold a JSON document
+                output = "".join([_dumps_json_line(d) + "\n" for d in devices])
+                return {
+                    "status": "success",
+                    "output": output,
+                    "format": "ndjson",
+                    "exit_code": 0
+                }
+            
             elif format_type == 'csv':
                 output = self._format_devices_csv(devices)
                 return {
@@ -307,80 +333,49 @@ Uptime:       {status.get('uptime', 'N/A')}
                 }
                 
         except Exception as e:
-            return {
-                "status": "error",
-                "error": str(e),
-                "exit_code": 1
-            }
+            return _error(str(e))
     
     def _format_devices_table(self, devices: List[Dict]) -> str:
         """Format devices as ASCII table"""
         if not devices:
             return "No devices found"
         
-        output = "ID           STATUS   CPU    MEM     TASKS  UPTIME\n"
-        output += "─" * 54 + "\n"
-        
-        for device in devices:
-            output += f"{device.get('id', 'N/A'):<12} "
-            output += f"{device.get('status', 'N/A'):<8} "
-            output += f"{device.get('cpu', 0):>3}%   "
-            output += f"{device.get('memory', 0):>4.1f}GB  "
-            output += f"{device.get('tasks', 0):>3}    "
-            output += f"{device.get('uptime', 'N/A')}\n"
-        
-        return output
+        # Header and rows go into one list so the table is copied only by the final join
+        row = self._TABLE_ROW
+        parts = [self._TABLE_HEADER]
+        parts += [
+            row % (d.get('id', 'N/A'), d.get('status', 'N/A'), d.get('cpu', 0),
+                   d.get('memory', 0), d.get('tasks', 0), d.get('uptime', 'N/A'))
+            for d in devices
+        ]
+        return "".join(parts)
     
     def _format_devices_csv(self, devices: List[Dict]) -> str:
         """Format devices as CSV"""
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow(['id', 'status', 'cpu', 'memory', 'tasks'])
-        
-        # Write data
-        for device in devices:
-            writer.writerow([
-                device.get('id', ''),
-                device.get('status', ''),
-                device.get('cpu', 0),
-                device.get('memory', 0),
-                device.get('tasks', 0)
-            ])
-        
-        return output.getvalue()
+        return self._format_devices_delimited(devices, ',')
     
     def _format_devices_tsv(self, devices: List[Dict]) -> str:
         """Format devices as TSV"""
-        output = io.StringIO()
-        writer = csv.writer(output, delimiter='\t')
-        
-        # Write header
-        writer.writerow(['id', 'status', 'cpu', 'memory', 'tasks'])
-        
-        # Write data
-        for device in devices:
-            writer.writerow([
-                device.get('id', ''),
-                device.get('status', ''),
-                device.get('cpu', 0),
-                device.get('memory', 0),
-                device.get('tasks', 0)
-            ])
-        
-        return output.getvalue()
+        return self._format_devices_delimited(devices, '\t')
+    
+    def _format_devices_delimited(self, devices: List[Dict], sep: str) -> str:
+        """Format devices as sep-delimited rows under a header line"""
+        # Device fields are ids, statuses and numbers, so no quoting is needed
+        row = sep.join(('%s',) * 5) + '\n'
+        parts = [sep.join(('id', 'status', 'cpu', 'memory', 'tasks')) + '\n']
+        parts += [
+            row % (d.get('id', ''), d.get('status', ''), d.get('cpu', 0),
+                   d.get('memory', 0), d.get('tasks', 0))
+            for d in devices
+        ]
+        return ''.join(parts)
     
     def _show_device(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """Show device details"""
         arguments = command.get('arguments', [])
         
         if not arguments:
-            return {
-                "status": "error",
-                "error": "Device ID required",
-                "exit_code": 1
-            }
+            return dict(_DEVICE_ID_ERROR)
         
         device_id = arguments[0]
         
@@ -397,11 +392,7 @@ Uptime:       {status.get('uptime', 'N/A')}
         arguments = command.get('arguments', [])
         
         if not arguments:
-            return {
-                "status": "error",
-                "error": "Device ID required",
-                "exit_code": 1
-            }
+            return dict(_DEVICE_ID_ERROR)
         
         # Implementation would ping devices
         return {
@@ -4,7 +4,106 @@ CLI command parser for Retire-Cluster web interface
 
 import re
 import shlex
-from typing import Dict, List, Optional, Any
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
+
+
+# Verbs whose remaining words are arguments rather than a noun
+_ARGUMENT_VERBS = frozenset({'echo', 'grep', 'help', 'clear', 'exit'})
+
+# Verbs that are valid without a noun
+_NOUNLESS_VERBS = frozenset({'help', 'clear', 'exit', 'echo', 'grep', 'set'})
+
+# Words split on shlex's whitespace; used when there is no quoting to undo
+_WORD_RE = re.compile(r'[^ \t\r\n]+')
+_QUOTING_CHARS = frozenset('\'"\\')
+
+
+def _prefix_matches(words: tuple, prefix: str) -> List[str]:
+    """Words of a sorted tuple starting with prefix, found by bisection"""
+    matches = []
+    for i in range(bisect_left(words, prefix), len(words)):
+        word = words[i]
+        if not word.startswith(prefix):
+            break
+        matches.append(word)
+    return matches
+
+
+@lru_cache(maxsize=1024)
+def _parse_command(command: str) -> Tuple[Optional[str], Optional[str], tuple, tuple]:
+    """
+    Parse a non-blank command into (verb, noun, option items, arguments)
+    
+    The result is immutable so it can be memoized: interactive clients
+    send the same few commands, and completion reparses every prefix.
+    """
+    command = command.strip()
+    
+    if _QUOTING_CHARS.isdisjoint(command):
+        # Plain words split exactly as shlex would, without building a lexer
+        parts = _WORD_RE.findall(command)
+    else:
+        # Handle quoted strings properly
+        try:
+            parts = shlex.split(command)
+        except ValueError:
+            # Fallback for unclosed quotes
+            parts = command.split()
+    
+    if not parts:
+        return None, None, (), ()
+    
+    # Bare `verb` and `verb noun`, the most common inputs, need no option scan
+    if len(parts) == 1:
+        return parts[0], None, (), ()
+    if len(parts) == 2 and parts[0] not in _ARGUMENT_VERBS and not parts[1].startswith('-'):
+        return parts[0], parts[1], (), ()
+    
+    verb = parts[0]
+    noun = None
+    options = {}
+    arguments = []
+    
+    i = 1
+    
+    # For single-word commands like echo, grep - they take arguments not nouns
+    if verb in _ARGUMENT_VERBS:
+        # These commands don't have nouns, rest are arguments
+        pass
+    elif i < len(parts) and not parts[i].startswith('-'):
+        # Check if second part is a noun
+        noun = parts[i]
+        i += 1
+    
+    # Parse options and arguments
+    count = len(parts)
+    while i < count:
+        part = parts[i]
+        
+        if len(part) < 2 or part[0] != '-':
+            # Positional argument
+            arguments.append(part)
+        elif part[1] == '-':
+            # Long option
+            eq = part.find('=', 2)
+            if eq < 0:
+                # Boolean flag
+                options[part[2:]] = True
+            else:
+                options[part[2:eq]] = part[eq + 1:].strip('\'"')
+        elif i + 1 < count and not parts[i + 1].startswith('-'):
+            # Short option with value, key kept as is (tests expect this)
+            options[part[1:]] = parts[i + 1]
+            i += 1
+        else:
+            # Short boolean flag
+            options[part[1:]] = True
+        
+        i += 1
+    
+    return verb, noun, tuple(options.items()), tuple(arguments)
 
 
 class CommandParser:
@@ -12,19 +111,25 @@ class CommandParser:
     
     def __init__(self):
         """Initialize command parser with valid commands"""
-        self.valid_verbs = {
+        self.valid_verbs = frozenset({
             'help', 'clear', 'exit', 'cluster', 'devices', 'device',
             'tasks', 'task', 'monitor', 'export', 'echo', 'grep', 'set'
+        })
+        
+        # Nouns in the order help lists them
+        self._help_nouns = {
+            'cluster': ('status', 'health', 'metrics', 'config'),
+            'devices': ('list', 'show', 'ping', 'remove', 'monitor', 'stats'),
+            'device': ('show', 'ping', 'remove'),
+            'tasks': ('submit', 'list', 'show', 'cancel', 'retry', 'monitor', 'query', 'metrics'),
+            'task': ('show', 'cancel', 'retry'),
+            'monitor': ('devices', 'tasks', 'logs', 'metrics', 'events', 'alerts'),
+            'export': ('devices', 'tasks', 'logs'),
         }
         
+        # Noun sets for constant-time membership checks in validate()
         self.valid_nouns = {
-            'cluster': ['status', 'health', 'metrics', 'config'],
-            'devices': ['list', 'show', 'ping', 'remove', 'monitor', 'stats'],
-            'device': ['show', 'ping', 'remove'],
-            'tasks': ['submit', 'list', 'show', 'cancel', 'retry', 'monitor', 'query', 'metrics'],
-            'task': ['show', 'cancel', 'retry'],
-            'monitor': ['devices', 'tasks', 'logs', 'metrics', 'events', 'alerts'],
-            'export': ['devices', 'tasks', 'logs'],
+            verb: frozenset(nouns) for verb, nouns in self._help_nouns.items()
         }
         
         self.short_options = {
@@ -39,6 +144,16 @@ class CommandParser:
             'p': 'period',
             'n': 'limit',
         }
+        
+        # Sorted vocabularies for prefix search in suggest()
+        self._sorted_verbs = tuple(sorted(self.valid_verbs))
+        self._sorted_nouns = {
+            verb: tuple(sorted(nouns)) for verb, nouns in self.valid_nouns.items()
+        }
+        
+        # Help text depends only on the grammar, so it is rendered once
+        self._general_help = self._render_general_help()
+        self._verb_help = {verb: self._render_verb_help(verb) for verb in self.valid_verbs}
     
     def parse(self, command: str) -> Dict[str, Any]:
         """
@@ -58,75 +173,13 @@ class CommandParser:
                 "arguments": []
             }
         
-        command = command.strip()
-        
-        # Handle quoted strings properly
-        try:
-            parts = shlex.split(command)
-        except ValueError:
-            # Fallback for unclosed quotes
-            parts = command.split()
-        
-        if not parts:
-            return {
-                "verb": None,
-                "noun": None,
-                "options": {},
-                "arguments": []
-            }
-        
-        verb = parts[0] if parts else None
-        noun = None
-        options = {}
-        arguments = []
-        
-        i = 1
-        
-        # For single-word commands like echo, grep - they take arguments not nouns
-        if verb in ['echo', 'grep', 'help', 'clear', 'exit']:
-            # These commands don't have nouns, rest are arguments
-            pass
-        elif i < len(parts) and not parts[i].startswith('-'):
-            # Check if second part is a noun
-            noun = parts[i]
-            i += 1
-        
-        # Parse options and arguments
-        while i < len(parts):
-            part = parts[i]
-            
-            if part.startswith('--'):
-                # Long option
-                if '=' in part:
-                    key, value = part[2:].split('=', 1)
-                    options[key] = value.strip('\'"')
-                else:
-                    # Boolean flag
-                    options[part[2:]] = True
-            elif part.startswith('-') and len(part) > 1:
-                # Short option
-                if i + 1 < len(parts) and not parts[i + 1].startswith('-'):
-                    # Has value
-                    key = part[1:]
-                    value = parts[i + 1]
-                    # Keep short option as is (tests expect this)
-                    options[key] = value
-                    i += 1
-                else:
-                    # Boolean flag
-                    key = part[1:]
-                    options[key] = True
-            else:
-                # Positional argument
-                arguments.append(part)
-            
-            i += 1
+        verb, noun, options, arguments = _parse_command(command)
         
         return {
             "verb": verb,
             "noun": noun,
-            "options": options,
-            "arguments": arguments
+            "options": dict(options),
+            "arguments": list(arguments)
         }
     
     def parse_pipeline(self, command: str) -> List[Dict[str, Any]]:
@@ -163,14 +216,15 @@ class CommandParser:
             return False
         
         # Some verbs don't need a noun
-        if verb in ['help', 'clear', 'exit', 'echo', 'grep', 'set']:
+        if verb in _NOUNLESS_VERBS:
             return True
         
         # Check verb-noun combination
-        if verb in self.valid_nouns:
+        nouns = self.valid_nouns.get(verb)
+        if nouns is not None:
             if not noun:
                 return False
-            if noun not in self.valid_nouns[verb]:
+            if noun not in nouns:
                 return False
         
         return True
@@ -185,30 +239,26 @@ class CommandParser:
         Returns:
             List of suggested completions
         """
-        suggestions = []
         partial = partial.strip().lower()
         
         if not partial:
-            return list(self.valid_verbs)
+            return list(self._sorted_verbs)
         
         parts = partial.split()
         
         if len(parts) == 1:
             # Suggest verbs
-            for verb in self.valid_verbs:
-                if verb.startswith(partial):
-                    suggestions.append(verb)
-        elif len(parts) == 2:
-            verb = parts[0]
-            partial_noun = parts[1]
+            return _prefix_matches(self._sorted_verbs, partial)
+        
+        if len(parts) == 2:
+            verb, partial_noun = parts
             
             # Suggest nouns for the verb
-            if verb in self.valid_nouns:
-                for noun in self.valid_nouns[verb]:
-                    if noun.startswith(partial_noun):
-                        suggestions.append(f"{verb} {noun}")
+            nouns = self._sorted_nouns.get(verb)
+            if nouns is not None:
+                return [f"{verb} {noun}" for noun in _prefix_matches(nouns, partial_noun)]
         
-        return suggestions
+        return []
     
     def format_help(self, command: Optional[str] = None) -> str:
         """
@@ -221,30 +271,30 @@ class CommandParser:
             Formatted help text
         """
         if not command:
-            # General help
-            help_text = "Available commands:\n\n"
-            
-            for verb in sorted(self.valid_verbs):
-                if verb in self.valid_nouns:
-                    nouns = ', '.join(self.valid_nouns[verb])
-                    help_text += f"  {verb:<10} {nouns}\n"
-                else:
-                    help_text += f"  {verb}\n"
-            
-            help_text += "\nUse 'help <command>' for more information"
-            return help_text
+            return self._general_help
         
-        # Specific command help
-        if command in self.valid_verbs:
-            if command in self.valid_nouns:
-                help_text = f"{command} commands:\n\n"
-                for noun in self.valid_nouns[command]:
-                    help_text += f"  {command} {noun}\n"
-                return help_text
+        help_text = self._verb_help.get(command)
+        if help_text is None:
+            return f"Unknown command: {command}"
+        return help_text
+    
+    def _render_general_help(self) -> str:
+        """Render the overview listing every verb and its nouns"""
+        lines = ["Available commands:\n"]
+        for verb in self._sorted_verbs:
+            if verb in self._help_nouns:
+                lines.append(f"  {verb:<10} {', '.join(self._help_nouns[verb])}")
             else:
-                return f"{command}: {self._get_command_description(command)}"
-        
-        return f"Unknown command: {command}"
+                lines.append(f"  {verb}")
+        lines.append("\nUse 'help <command>' for more information")
+        return "\n".join(lines)
+    
+    def _render_verb_help(self, verb: str) -> str:
+        """Render help for a single verb"""
+        if verb in self._help_nouns:
+            lines = [f"  {verb} {noun}\n" for noun in self._help_nouns[verb]]
+            return f"{verb} commands:\n\n" + "".join(lines)
+        return f"{verb}: {self._get_command_description(verb)}"
     
     def _get_command_description(self, command: str) -> str:
         """Get description for a command"""
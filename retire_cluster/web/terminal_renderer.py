@@ -3,14 +3,122 @@ Terminal UI renderer for CLI-style output
 """
 
 import re
-import math
+import textwrap
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
 
 
+# Color of each log level in rendered log entries
+_LOG_LEVEL_COLORS = {
+    'DEBUG': 'gray',
+    'INFO': 'blue',
+    'WARNING': 'yellow',
+    'ERROR': 'red',
+    'CRITICAL': 'red',
+}
+
+
+# ANSI color/style escape sequences, which take no room on screen
+_ANSI_RE = re.compile(r'\x1b\[[0-9;]*m')
+
+
+def _visible_len(text: str) -> int:
+    """Length of text as displayed, not counting ANSI color codes"""
+    if '\x1b' not in text:
+        return len(text)
+    return len(_ANSI_RE.sub('', text))
+
+
+def _ljust_visible(text: str, width: int) -> str:
+    """text left-justified to a displayed width"""
+    return text.ljust(width + len(text) - _visible_len(text))
+
+
+def _fit_cell(value: str, width: int) -> str:
+    """Table cell padded to width, or truncated with '...' when too long"""
+    if _visible_len(value) <= width:
+        return _ljust_visible(value, width)
+    # Colors are dropped rather than cutting through an escape sequence
+    value = _ANSI_RE.sub('', value)
+    return f"{value[:width-3]}...".ljust(width)
+
+
+def _uncolored(text: str, color: str = '', style: str = '') -> str:
+    """colorize() and its shortcuts when colors are disabled"""
+    return text
+
+
+_BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+
+# Dashboards format the same sizes and durations frame after frame, so the
+# formatters are memoized by value; typed, as 90 and 90.0 format differently
+@lru_cache(maxsize=1024, typed=True)
+def _format_bytes(bytes_value: int) -> str:
+    """Human readable size such as 1.5GB"""
+    size = float(bytes_value)
+    
+    if size < 1024.0:
+        return f"{int(size)}B"  # No decimal for bytes
+    
+    # Each unit is 10 bits, so the unit comes straight from the bit length
+    try:
+        index = min(len(_BYTE_UNITS) - 1, (int(size).bit_length() - 1) // 10)
+    except (OverflowError, ValueError):
+        index = len(_BYTE_UNITS) - 1  # inf and nan
+    
+    return f"{size / (1 << (index * 10)):.1f}{_BYTE_UNITS[index]}"
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _format_duration(seconds: int) -> str:
+    """Human readable duration such as 1h 30m 45s"""
+    days = seconds // 86400
+    hours = (seconds % 86400) // 3600
+    minutes = (seconds % 3600) // 60
+    secs = seconds % 60
+    
+    if days > 0:
+        return f"{days}d {hours}h {minutes}m"
+    elif hours > 0:
+        return f"{hours}h {minutes}m {secs}s"
+    elif minutes > 0:
+        return f"{minutes}m {secs}s"
+    else:
+        return f"{secs}s"
+
+
+@lru_cache(maxsize=16)
+def _grid_borders(cols: int) -> tuple:
+    """Top, row separator and bottom borders of a device grid with cols columns"""
+    return (
+        '┌' + '─────┬' * (cols - 1) + '─────┐',
+        '├' + '─────┼' * (cols - 1) + '─────┤',
+        '└' + '─────┴' * (cols - 1) + '─────┘',
+    )
+
+
 class TerminalColors:
     """ANSI color codes for terminal output"""
     
+    # Shared instances by (class, enabled flag), see get()
+    _instances: Dict[tuple, 'TerminalColors'] = {}
+    
+    @classmethod
+    def get(cls, enabled: bool = True) -> 'TerminalColors':
+        """
+        Shared instance for the given setting
+        
+        Instances are never modified after construction, so renderers can
+        share one instead of each building their own.
+        """
+        key = (cls, bool(enabled))
+        instance = cls._instances.get(key)
+        if instance is None:
+            instance = cls._instances.setdefault(key, cls(key[1]))
+        return instance
+    
     def __init__(self, enabled: bool = True):
         """
         Initialize terminal colors
@@ -45,13 +153,14 @@ class TerminalColors:
                     'BOLD', 'DIM', 'UNDERLINE', 'BLINK', 'REVERSE', 'RESET']
             for attr in attrs:
                 setattr(self, attr, '')
-    
-    def colorize(self, text: str, color: str, style: str = '') -> str:
-        """Apply color and style to text"""
-        if not self.enabled:
-            return text
+            
+            # Every call would return the text unchanged, so skip the lookups
+            for method in ('colorize', 'red', 'green', 'yellow', 'blue', 'cyan',
+                           'gray', 'bold', 'underline'):
+                setattr(self, method, _uncolored)
         
-        color_map = {
+        # Name lookups for colorize(), built once
+        self._color_map = {
             'red': self.RED,
             'green': self.GREEN,
             'yellow': self.YELLOW,
@@ -62,15 +171,17 @@ class TerminalColors:
             'gray': self.GRAY,
         }
         
-        style_map = {
+        self._style_map = {
             'bold': self.BOLD,
             'dim': self.DIM,
             'underline': self.UNDERLINE,
             'blink': self.BLINK,
             'reverse': self.REVERSE,
         }
-        
-        prefix = color_map.get(color, '') + style_map.get(style, '')
+    
+    def colorize(self, text: str, color: str, style: str = '') -> str:
+        """Apply color and style to text"""
+        prefix = self._color_map.get(color, '') + self._style_map.get(style, '')
         return f"{prefix}{text}{self.RESET}" if prefix else text
     
     def red(self, text: str) -> str:
@@ -219,8 +330,14 @@ class TerminalRenderer:
             colors_enabled: Enable color output
         """
         self.colors_enabled = colors_enabled
-        self.colors = TerminalColors(colors_enabled)
+        self.colors = TerminalColors.get(colors_enabled)
         self.ascii_art = ASCIIArt()
+        
+        # Log levels with their color codes applied, built once
+        self._level_colored = {
+            level: self.colors.colorize(level, color)
+            for level, color in _LOG_LEVEL_COLORS.items()
+        }
     
     def render_table(self, data: List[Dict], headers: List[str], 
                     fields: List[str], max_width: Optional[int] = None) -> str:
@@ -236,16 +353,41 @@ class TerminalRenderer:
         Returns:
             ASCII table string
         """
-        if not data:
-            return "No data available"
+        return '\n'.join(self._iter_table(data, headers, fields, max_width))
+    
+    def write_table(self, writer, data: List[Dict], headers: List[str],
+                    fields: List[str], max_width: Optional[int] = None) -> None:
+        """
+        Write a table to writer line by line, as render_table() lays it out
         
-        # Calculate column widths
-        col_widths = []
-        for i, (header, field) in enumerate(zip(headers, fields)):
-            # Width is max of header and data values
-            header_width = len(header)
-            data_width = max(len(str(row.get(field, ''))) for row in data)
-            col_widths.append(max(header_width, data_width))
+        Args:
+            writer: Text stream with a writelines() method
+            data: List of data dictionaries
+            headers: Table headers
+            fields: Field names corresponding to headers
+            max_width: Maximum table width
+        """
+        writer.writelines(line + '\n' for line in self._iter_table(data, headers, fields, max_width))
+    
+    def _iter_table(self, data: List[Dict], headers: List[str],
+                    fields: List[str], max_width: Optional[int]):
+        """Yield the lines of a table, without newlines"""
+        if not data:
+            yield "No data available"
+            return
+        
+        # Stringify every cell once; widths are the max of header and values
+        fields = fields[:len(headers)]
+        str_rows = [[str(row.get(field, '')) for field in fields] for row in data]
+        col_widths = [len(header) for header in headers[:len(fields)]]
+        for str_row in str_rows:
+            for i, value in enumerate(str_row):
+                visible = _visible_len(value)
+                if visible > col_widths[i]:
+                    col_widths[i] = visible
+        
+        # Columns only need truncating when max_width shrinks them below their content
+        natural_widths = col_widths
         
         # Apply max width constraint if specified
         if max_width:
@@ -255,43 +397,20 @@ class TerminalRenderer:
                 scale = max_width / total_width
                 col_widths = [max(5, int(w * scale)) for w in col_widths]
         
-        # Build table
-        result = []
-        
         # Header row
-        header_row = ''
-        for i, (header, width) in enumerate(zip(headers, col_widths)):
-            if i > 0:
-                header_row += ' '
-            header_row += header.ljust(width)
-        result.append(header_row)
+        yield ' '.join(_ljust_visible(header, width) for header, width in zip(headers, col_widths))
         
         # Separator row
-        separator = ''
-        for i, width in enumerate(col_widths):
-            if i > 0:
-                separator += ' '
-            separator += '─' * width
-        result.append(separator)
-        
-        # Data rows
-        for row in data:
-            data_row = ''
-            for i, (field, width) in enumerate(zip(fields, col_widths)):
-                if i > 0:
-                    data_row += ' '
-                
-                value = str(row.get(field, ''))
-                
-                # Truncate if too long
-                if len(value) > width:
-                    value = value[:width-3] + '...'
-                
-                data_row += value.ljust(width)
-            
-            result.append(data_row)
+        yield ' '.join('─' * width for width in col_widths)
         
-        return '\n'.join(result)
+        # Data rows, truncating values that are too long
+        fitters = [
+            _fit_cell if width < natural else _ljust_visible
+            for width, natural in zip(col_widths, natural_widths)
+        ]
+        columns = list(zip(fitters, col_widths))
+        for str_row in str_rows:
+            yield ' '.join(fit(value, width) for value, (fit, width) in zip(str_row, columns))
     
     def render_progress_bar(self, percentage: float, width: int = 20, 
                            filled_char: str = '█', empty_char: str = '░') -> str:
@@ -307,11 +426,11 @@ class TerminalRenderer:
         Returns:
             Progress bar string
         """
-        filled_width = int((percentage / 100) * width)
-        empty_width = width - filled_width
+        # Scale before dividing so exact percentages fill exactly (29% of 100
+        # is 29 cells, not 28.999...), and keep the bar within its width
+        filled_width = max(0, min(width, int(percentage * width) // 100))
         
-        bar = '[' + (filled_char * filled_width) + (empty_char * empty_width) + ']'
-        return bar
+        return f"[{filled_char * filled_width}{empty_char * (width - filled_width)}]"
     
     def render_status_indicator(self, status: str) -> str:
         """
@@ -358,27 +477,27 @@ class TerminalRenderer:
         min_val = min(data)
         max_val = max(data)
         
+        # Only the points that fit the width are drawn, so only they are scaled
+        points = data[:width] if len(data) > width else data
+        
         if max_val == min_val:
             # All values are the same
-            normalized = [height // 2] * len(data)
+            normalized = [height // 2] * len(points)
         else:
-            normalized = [
-                int(((val - min_val) / (max_val - min_val)) * (height - 1))
-                for val in data
-            ]
-        
-        # Create chart grid
-        chart = []
-        for y in range(height - 1, -1, -1):  # Top to bottom
-            line = ""
-            for x in range(min(width, len(data))):
-                if x < len(normalized) and normalized[x] == y:
-                    line += "█"
-                elif x < len(normalized) and normalized[x] > y:
-                    line += "│"
-                else:
-                    line += " "
-            chart.append(line)
+            span = max_val - min_val
+            top = height - 1
+            normalized = [int((val - min_val) / span * top) for val in points]
+        
+        # Create chart grid, top row first, then draw each point's column
+        columns = max(0, min(width, len(data)))
+        grid = [[" "] * columns for _ in range(height)]
+        if grid:
+            for x, value in enumerate(normalized[:columns]):
+                top_row = height - 1 - value
+                grid[top_row][x] = "█"
+                for row in grid[top_row + 1:]:
+                    row[x] = "│"
+        chart = [''.join(row) for row in grid]
         
         # Add title if provided
         if title:
@@ -433,13 +552,14 @@ class TerminalRenderer:
             return "No devices"
         
         # Calculate grid dimensions
-        rows = math.ceil(len(devices) / cols)
+        rows = (len(devices) + cols - 1) // cols
+        
+        top_border, separator, bottom_border = _grid_borders(cols)
         
         # Build grid
         result = []
         
         # Top border
-        top_border = '┌' + '─────┬' * (cols - 1) + '─────┐'
         result.append(top_border)
         
         for row in range(rows):
@@ -464,11 +584,9 @@ class TerminalRenderer:
             
             # Row separator (except for last row)
             if row < rows - 1:
-                separator = '├' + '─────┼' * (cols - 1) + '─────┤'
                 result.append(separator)
         
         # Bottom border
-        bottom_border = '└' + '─────┴' * (cols - 1) + '─────┘'
         result.append(bottom_border)
         
         # Add legend
@@ -488,10 +606,26 @@ class TerminalRenderer:
         Returns:
             Formatted log entries
         """
+        return '\n'.join(self._iter_log_entries(logs, max_entries))
+    
+    def write_log_entries(self, writer, logs: List[Dict], max_entries: int = 50) -> None:
+        """
+        Write log entries to writer line by line, as render_log_entries() formats them
+        
+        Args:
+            writer: Text stream with a writelines() method
+            logs: List of log dictionaries
+            max_entries: Maximum number of entries to show
+        """
+        writer.writelines(line + '\n' for line in self._iter_log_entries(logs, max_entries))
+    
+    def _iter_log_entries(self, logs: List[Dict], max_entries: int):
+        """Yield formatted log lines, without newlines"""
         if not logs:
-            return "No log entries"
+            yield "No log entries"
+            return
         
-        result = []
+        level_colors = self._level_colored
         
         # Show most recent entries first
         recent_logs = logs[-max_entries:] if len(logs) > max_entries else logs
@@ -503,20 +637,13 @@ class TerminalRenderer:
             message = log.get('message', '')
             
             # Color code log level
-            level_colored = self.colors.colorize(level, {
-                'DEBUG': 'gray',
-                'INFO': 'blue',
-                'WARNING': 'yellow',
-                'ERROR': 'red',
-                'CRITICAL': 'red'
-            }.get(level, 'white'))
+            level_colored = level_colors.get(level)
+            if level_colored is None:
+                level_colored = self.colors.colorize(level, 'white')
             
             # Format log line
             device_part = f" {device}" if device else ""
-            log_line = f"[{timestamp}] {level_colored}:{device_part} {message}"
-            result.append(log_line)
-        
-        return '\n'.join(result)
+            yield f"[{timestamp}] {level_colored}:{device_part} {message}"
     
     def colorize(self, text: str, color: str) -> str:
         """
@@ -541,18 +668,7 @@ class TerminalRenderer:
         Returns:
             Formatted string (e.g., "1.5GB")
         """
-        units = ['B', 'KB', 'MB', 'GB', 'TB']
-        size = float(bytes_value)
-        
-        for unit in units:
-            if size < 1024.0:
-                if unit == 'B':
-                    return f"{int(size)}{unit}"  # No decimal for bytes
-                else:
-                    return f"{size:.1f}{unit}"
-            size /= 1024.0
-        
-        return f"{size:.1f}PB"
+        return _format_bytes(bytes_value)
     
     def format_duration(self, seconds: int) -> str:
         """
@@ -564,19 +680,7 @@ class TerminalRenderer:
         Returns:
             Formatted string (e.g., "1h 30m 45s")
         """
-        days = seconds // 86400
-        hours = (seconds % 86400) // 3600
-        minutes = (seconds % 3600) // 60
-        secs = seconds % 60
-        
-        if days > 0:
-            return f"{days}d {hours}h {minutes}m"
-        elif hours > 0:
-            return f"{hours}h {minutes}m {secs}s"
-        elif minutes > 0:
-            return f"{minutes}m {secs}s"
-        else:
-            return f"{secs}s"
+        return _format_duration(seconds)
     
     def wrap_text(self, text: str, width: int) -> str:
         """
@@ -589,7 +693,6 @@ class TerminalRenderer:
         Returns:
             Wrapped text
         """
-        import textwrap
         return textwrap.fill(text, width=width)
     
     def align_text(self, text: str, width: int, alignment: str = 'left') -> str:
@@ -604,6 +707,9 @@ class TerminalRenderer:
         Returns:
             Aligned text
         """
+        # Widen by the length of any color codes, which take no room on screen
+        width += len(text) - _visible_len(text)
+        
         if alignment == 'left':
             return text.ljust(width)
         elif alignment == 'right':
@@ -625,7 +731,9 @@ class TerminalRenderer:
         Returns:
             Truncated text
         """
-        if len(text) <= max_length:
+        if _visible_len(text) <= max_length:
             return text
         
+        # Colors are dropped rather than cutting through an escape sequence
+        text = _ANSI_RE.sub('', text)
         return text[:max_length - len(suffix)] + suffix
\ No newline at end of file
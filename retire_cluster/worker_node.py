@@ -7,6 +7,7 @@ import os
 import sys
 import signal
 import platform
+from functools import lru_cache
 from pathlib import Path
 
 from .core.config import WorkerConfig
@@ -20,8 +21,13 @@ def signal_handler(signum, frame):
     sys.exit(0)
 
 
+@lru_cache(maxsize=1)
 def generate_device_id() -> str:
-    """Generate a unique device ID based on system information"""
+    """
+    Generate a unique device ID based on system information
+    
+    The host facts cannot change within a process, so the ID is computed once.
+    """
     try:
         import socket
         hostname = socket.gethostname()
@@ -162,44 +168,50 @@ Examples:
         client = ClusterClient(config)
         
         if args.test:
-            # Test mode - show device info and test connection
-            logger.info("=" * 50)
-            logger.info("Retire-Cluster Worker Node Test Mode")
-            logger.info("=" * 50)
+            # Test mode - show device info and test connection. Each report
+            # is collected and logged as one record instead of line by line.
+            lines = [
+                "=" * 50,
+                "Retire-Cluster Worker Node Test Mode",
+                "=" * 50,
+            ]
             
             # Show device profile
             profile = client.profiler.get_device_profile()
-            logger.info("Device Profile:")
+            lines.append("Device Profile:")
             for key, value in profile.items():
                 if isinstance(value, dict):
-                    logger.info(f"  {key}:")
+                    lines.append(f"  {key}:")
                     for k, v in value.items():
-                        logger.info(f"    {k}: {v}")
+                        lines.append(f"    {k}: {v}")
                 elif isinstance(value, list):
-                    logger.info(f"  {key}: {', '.join(map(str, value))}")
+                    lines.append(f"  {key}: {', '.join(map(str, value))}")
                 else:
-                    logger.info(f"  {key}: {value}")
+                    lines.append(f"  {key}: {value}")
             
-            logger.info("-" * 50)
-            logger.info("Testing connection to main node...")
+            lines.append("-" * 50)
+            lines.append("Testing connection to main node...")
+            logger.info("\n".join(lines))
             
             if client.test_connection():
-                logger.info("✅ Connection test successful!")
+                lines = ["✅ Connection test successful!"]
                 
                 # Try to get cluster status
                 status = client.get_cluster_status()
                 if status:
-                    logger.info("Cluster Status:")
+                    lines.append("Cluster Status:")
                     cluster_stats = status.get('cluster_stats', {})
-                    logger.info(f"  Total devices: {cluster_stats.get('total_devices', 0)}")
-                    logger.info(f"  Online devices: {cluster_stats.get('online_devices', 0)}")
-                    logger.info(f"  Cluster health: {cluster_stats.get('health_percentage', 0)}%")
+                    lines.append(f"  Total devices: {cluster_stats.get('total_devices', 0)}")
+                    lines.append(f"  Online devices: {cluster_stats.get('online_devices', 0)}")
+                    lines.append(f"  Cluster health: {cluster_stats.get('health_percentage', 0)}%")
                     
                     by_role = cluster_stats.get('by_role', {})
                     if by_role:
-                        logger.info("  Devices by role:")
+                        lines.append("  Devices by role:")
                         for role, count in by_role.items():
-                            logger.info(f"    {role}: {count}")
+                            lines.append(f"    {role}: {count}")
+                
+                logger.info("\n".join(lines))
             else:
                 logger.error("❌ Connection test failed!")
                 sys.exit(1)
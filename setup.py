@@ -20,11 +20,16 @@ optional_requirements = {
         "flask>=2.0.0",
         "flask-cors>=4.0.0",
         "jsonschema>=4.0.0",
+        "orjson>=3.6.0",
     ],
     "integrations": [
         "temporalio>=1.0.0",
         "celery>=5.0.0",
         "requests>=2.25.0",
+        "fastapi>=0.100.0",
+        "uvicorn>=0.23.0",
+        "orjson>=3.6.0",
+        "msgpack>=1.0.0",
     ],
     "mcp": ["mcp>=0.1.0"],
     "dev": [
@@ -41,6 +46,10 @@ optional_requirements = {
         "temporalio>=1.0.0",
         "celery>=5.0.0",
         "requests>=2.25.0",
+        "fastapi>=0.100.0",
+        "uvicorn>=0.23.0",
+        "orjson>=3.6.0",
+        "msgpack>=1.0.0",
     ]
 }
 
@@ -80,6 +89,9 @@ setup(
         ],
     },
     include_package_data=True,
+    package_data={
+        "retire_cluster.web": ["static/*.html", "static/css/*.css", "static/js/*.js"],
+    },
     zip_safe=False,
     keywords="cluster, distributed, devices, iot, automation, monitoring",
     project_urls={
@@ -142,6 +142,27 @@ class TestTextAPIEndpoints(unittest.TestCase):
         # Check first data row
         self.assertEqual(lines[1], 'android-001,online,42,2.1,3')
     
+    def test_csv_format_fills_missing_fields(self):
+        """Test devices lacking some fields get the default column values"""
+        self.mock_cluster.get_devices.return_value = [{"id": "bare-001", "cpu": 5}]
+        
+        response = self.client.get('/text/devices', headers={'Accept': 'text/csv'})
+        
+        lines = response.data.decode('utf-8').split('\n')
+        self.assertEqual(lines, ['id,status,cpu,memory,tasks', 'bare-001,,5,0,0'])
+    
+    def test_ndjson_format_devices(self):
+        """Test devices endpoint with NDJSON format"""
+        response = self.client.get('/text/devices?status=online',
+                                  headers={'Accept': 'application/x-ndjson'})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('application/x-ndjson', response.content_type)
+        
+        records = [json.loads(line) for line in response.data.decode('utf-8').split('\n')]
+        self.assertEqual([r['id'] for r in records], ['android-001', 'laptop-002'])
+        self.assertEqual(records[0]['memory'], 2.1)
+    
     def test_tsv_format_devices(self):
         """Test devices endpoint with TSV format"""
         response = self.client.get('/text/devices',
@@ -189,6 +210,20 @@ class TestJSONAPIEndpoints(unittest.TestCase):
         self.assertEqual(len(data['data']['devices']), 1)
         self.assertEqual(data['data']['devices'][0]['id'], 'android-001')
     
+    def test_api_devices_streams_any_iterable(self):
+        """Test the streamed device list is valid JSON for generators and empty lists"""
+        devices = [{"id": f"dev-{i}", "status": "online"} for i in range(3)]
+        self.mock_cluster.get_devices.return_value = (device for device in devices)
+        
+        data = json.loads(self.client.get('/api/v1/devices').data)
+        self.assertEqual(data['data']['devices'], devices)
+        self.assertEqual(data['data']['count'], 3)
+        self.assertIn('timestamp', data['data'])
+        
+        self.mock_cluster.get_devices.return_value = []
+        data = json.loads(self.client.get('/api/v1/devices').data)
+        self.assertEqual(data['data'], {'devices': [], 'count': 0, 'timestamp': data['data']['timestamp']})
+    
     def test_api_cluster_status(self):
         """Test /api/v1/cluster/status endpoint"""
         self.mock_cluster.get_cluster_status.return_value = {
@@ -279,6 +314,28 @@ class TestCommandAPIEndpoint(unittest.TestCase):
         self.assertEqual(data['status'], 'error')
         self.assertIn('message', data)
     
+    def test_repeated_command_parsed_once(self):
+        """Test repeated commands reuse the cached parse"""
+        from unittest.mock import patch
+        from retire_cluster.web.cli_parser import CommandParser
+        
+        command_data = json.dumps({"command": "devices list --status=online"})
+        
+        with patch.object(CommandParser, 'parse', autospec=True,
+                          side_effect=CommandParser.parse) as parse:
+            for _ in range(3):
+                response = self.client.post('/api/v1/command',
+                                           data=command_data,
+                                           content_type='application/json')
+                self.assertEqual(response.status_code, 200)
+        
+        self.assertEqual(parse.call_count, 1)
+        
+        response = self.client.post('/api/v1/command',
+                                   data=json.dumps({"command": 42}),
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+    
     def test_command_with_json_format(self):
         """Test command execution with JSON format"""
         command_data = {
@@ -349,5 +406,48 @@ class TestStreamingEndpoints(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
 
 
+
+class TestRunServer(unittest.TestCase):
+    """Test server selection in run_server"""
+    
+    def test_werkzeug_is_default(self):
+        """Test the threaded Werkzeug server serves the given cluster server"""
+        from retire_cluster.web import app as web_app
+        
+        cluster = Mock()
+        with patch('flask.Flask.run') as run:
+            web_app.run_server(cluster, host='127.0.0.1', port=9999)
+        
+        run.assert_called_once_with(host='127.0.0.1', port=9999, debug=False, threaded=True)
+    
+    def test_gunicorn_refuses_in_process_cluster(self):
+        """Test gunicorn is refused when its workers would copy the cluster"""
+        from retire_cluster.web import app as web_app
+        
+        factory = 'retire_cluster.web.app:create_app'
+        with patch.object(web_app, '_run_gunicorn') as run_gunicorn:
+            with self.assertRaises(ValueError):
+                web_app.run_server(Mock(), server='gunicorn', app_factory=factory)
+            with self.assertRaises(ValueError):
+                web_app.run_server(server='gunicorn')
+            with self.assertRaises(ValueError):
+                web_app.run_server(server='gunicorn', debug=True, app_factory=factory)
+            with self.assertRaises(ValueError):
+                web_app.run_server(server='hypercorn')
+        
+        run_gunicorn.assert_not_called()
+    
+    def test_gunicorn_builds_app_from_factory(self):
+        """Test gunicorn mode hands the factory path to the workers"""
+        from retire_cluster.web import app as web_app
+        
+        factory = 'retire_cluster.web.app:create_app'
+        with patch.object(web_app, '_run_gunicorn') as run_gunicorn:
+            web_app.run_server(server='gunicorn', app_factory=factory, port=9999, workers=2)
+        
+        run_gunicorn.assert_called_once_with(factory, '0.0.0.0', 9999, 2)
+        self.assertIs(web_app._load_app_factory(factory), web_app.create_app)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -191,6 +191,23 @@ class TestCommandParser(unittest.TestCase):
                 for expected in expected_suggestions:
                     self.assertIn(expected, suggestions)
     
+    def test_suggestions_are_sorted_prefix_matches(self):
+        """Test suggestions list every prefix match in sorted order"""
+        self.assertEqual(self.parser.suggest("ex"), ["exit", "export"])
+        self.assertEqual(self.parser.suggest("tasks m"), ["tasks metrics", "tasks monitor"])
+        self.assertEqual(self.parser.suggest("zz"), [])
+        self.assertEqual(self.parser.suggest(""), sorted(self.parser.valid_verbs))
+    
+    def test_repeated_parse_results_are_independent(self):
+        """Test memoized parses hand out fresh options and arguments"""
+        first = self.parser.parse("devices show node-1 --format=json")
+        first["options"]["format"] = "csv"
+        first["arguments"].append("node-2")
+        
+        second = self.parser.parse("devices show node-1 --format=json")
+        self.assertEqual(second["options"], {"format": "json"})
+        self.assertEqual(second["arguments"], ["node-1"])
+    
     def test_parse_empty_or_whitespace(self):
         """Test parsing empty or whitespace-only commands"""
         test_cases = [
@@ -278,6 +295,23 @@ class TestCommandExecutor(unittest.TestCase):
         self.assertIn("error", result)
         self.assertIn("Unknown command", result["error"])
     
+    def test_execute_unknown_noun(self):
+        """Test known verbs with unknown nouns name the command group"""
+        cases = [
+            ("cluster", "bogus", "Unknown cluster command: bogus"),
+            ("device", "remove", "Unknown devices command: remove"),
+            ("task", None, "Unknown tasks command: None"),
+            ("export", "logs", "Unknown export target: logs"),
+        ]
+        
+        for verb, noun, error in cases:
+            with self.subTest(verb=verb, noun=noun):
+                result = self.executor.execute({"verb": verb, "noun": noun,
+                                               "options": {}, "arguments": []})
+                
+                self.assertEqual(result["status"], "error")
+                self.assertEqual(result["error"], error)
+    
     def test_execute_with_format_option(self):
         """Test executing command with format option"""
         test_cases = ["json", "csv", "tsv", "text"]
@@ -293,6 +327,65 @@ class TestCommandExecutor(unittest.TestCase):
                 self.assertEqual(result["status"], "success")
                 self.assertEqual(result["format"], format_type)
 
+    
+    def test_devices_list_json_is_serialized(self):
+        """Test JSON device listings are returned as JSON text"""
+        import json
+        
+        result = self.executor.execute({
+            "verb": "devices", "noun": "list",
+            "options": {"format": "json", "status": "online"},
+            "arguments": []
+        })
+        
+        self.assertIsInstance(result["output"], str)
+        data = json.loads(result["output"])
+        self.assertEqual(data["count"], 2)
+        self.assertEqual([d["id"] for d in data["devices"]], ["android-001", "laptop-002"])
+
+    
+    def test_devices_list_ndjson_output(self):
+        """Test NDJSON device listings hold one record per line"""
+        import json
+        
+        result = self.executor.execute({
+            "verb": "devices", "noun": "list",
+            "options": {"format": "ndjson"},
+            "arguments": []
+        })
+        
+        self.assertEqual(result["format"], "ndjson")
+        lines = result["output"].splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.mock_cluster.get_devices.return_value)
+    
+    def test_devices_list_delimited_output(self):
+        """Test CSV and TSV device listings"""
+        for format_type, sep in (("csv", ","), ("tsv", "\t")):
+            with self.subTest(format=format_type):
+                result = self.executor.execute({
+                    "verb": "devices", "noun": "list",
+                    "options": {"format": format_type, "status": "offline"},
+                    "arguments": []
+                })
+                
+                lines = result["output"].splitlines()
+                self.assertEqual(lines[0], sep.join(["id", "status", "cpu", "memory", "tasks"]))
+                self.assertEqual(lines[1:], [sep.join(["raspi-003", "offline", "0", "0", "0"])])
+
+    
+    def test_execute_uses_request_timestamp(self):
+        """Test JSON listings carry the timestamp given for the request"""
+        import json
+        
+        command = {"verb": "devices", "noun": "list",
+                   "options": {"format": "json"}, "arguments": []}
+        
+        result = self.executor.execute(command, timestamp="2024-01-15T10:30:15")
+        self.assertEqual(json.loads(result["output"])["timestamp"], "2024-01-15T10:30:15")
+        
+        result = self.executor.execute(command)
+        self.assertNotEqual(json.loads(result["output"])["timestamp"], "2024-01-15T10:30:15")
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -274,6 +274,8 @@ class TestWebInterfaceIntegration(unittest.TestCase):
         
         self.assertEqual(response.status_code, 200)
         self.assertIn('text/event-stream', response.headers.get('Content-Type', ''))
+        self.assertEqual(response.headers.get('Cache-Control'), 'no-cache')
+        self.assertEqual(response.headers.get('X-Accel-Buffering'), 'no')
     
     def test_cli_interface_endpoint(self):
         """Test CLI interface HTML endpoint"""
@@ -287,6 +289,51 @@ class TestWebInterfaceIntegration(unittest.TestCase):
         self.assertIn('terminal', content)
         self.assertIn('xterm.js', content)  # Updated to check for xterm.js instead
     
+    def test_cli_interface_matches_baseline_page(self):
+        """Test the static CLI page matches the page the app used to render inline"""
+        import difflib
+        
+        fixture = os.path.join(os.path.dirname(__file__), 'fixtures', 'cli_baseline.html')
+        with open(fixture, encoding='utf-8') as f:
+            baseline = f.read()
+        
+        content = self.client.get('/cli').data.decode('utf-8')
+        
+        # The inline page was indented inside a Python string; compare the
+        # content of each line, which is where escaping slips would show up
+        def lines(html):
+            return [line.strip() for line in html.splitlines() if line.strip()]
+        
+        diff = list(difflib.unified_diff(lines(baseline), lines(content), lineterm=''))
+        self.assertEqual(diff, [], '\n'.join(diff))
+    
+    def test_cli_interface_revalidation(self):
+        """Test the CLI page carries an ETag and answers 304 when it matches"""
+        response = self.client.get('/cli')
+        etag = response.headers.get('ETag')
+        self.assertTrue(etag)
+        
+        cached = self.client.get('/cli', headers={'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.data, b'')
+        
+        stale = self.client.get('/cli', headers={'If-None-Match': '"other"'})
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(stale.data, response.data)
+    
+    def test_cli_interface_gzip(self):
+        """Test the CLI page is served pre-compressed to clients accepting gzip"""
+        import gzip
+        
+        plain = self.client.get('/cli')
+        self.assertIsNone(plain.headers.get('Content-Encoding'))
+        
+        compressed = self.client.get('/cli', headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(compressed.headers.get('Content-Encoding'), 'gzip')
+        self.assertEqual(compressed.headers.get('Vary'), 'Accept-Encoding')
+        self.assertNotEqual(compressed.headers.get('ETag'), plain.headers.get('ETag'))
+        self.assertEqual(gzip.decompress(compressed.data), plain.data)
+    
     def test_metrics_prometheus_format(self):
         """Test Prometheus metrics format"""
         response = self.client.get('/text/metrics')
@@ -406,6 +453,36 @@ class TestPerformanceIntegration(unittest.TestCase):
         # Header + 1000 devices
         self.assertEqual(len(lines), 1001)
         self.assertEqual(lines[0], 'id,status,cpu,memory,tasks')
+    
+    def test_streams_share_one_poll_per_interval(self):
+        """Test concurrent device streams trigger a single cluster poll"""
+        from retire_cluster.web.app import create_app
+        
+        app = create_app(self.mock_cluster, testing=False)
+        app.config['TESTING'] = True  # one event per stream
+        client = app.test_client()
+        
+        frames = [client.get('/stream/devices').data for _ in range(5)]
+        
+        self.assertEqual(self.mock_cluster.get_devices.call_count, 1)
+        self.assertEqual(len(set(frames)), 1)
+        self.assertTrue(frames[0].startswith(b'event: device_update\ndata: {'))
+        self.assertTrue(frames[0].endswith(b'\n\n'))
+    
+    def test_cluster_reads_cached_between_requests(self):
+        """Test status and device reads are reused within the cache TTL"""
+        from retire_cluster.web.app import create_app
+        
+        app = create_app(self.mock_cluster, testing=False)
+        client = app.test_client()
+        
+        for _ in range(3):
+            client.get('/text/status')
+            client.get('/text/metrics')
+            client.get('/api/v1/devices')
+        
+        self.assertEqual(self.mock_cluster.get_cluster_status.call_count, 1)
+        self.assertEqual(self.mock_cluster.get_devices.call_count, 1)
 
 
 class TestErrorRecoveryIntegration(unittest.TestCase):
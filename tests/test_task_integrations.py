@@ -0,0 +1,150 @@
+"""
+Test suite for external framework integrations
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestTerminalResultCache(unittest.TestCase):
+    """Test caching of finished task results"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        from retire_cluster.tasks.integrations import TerminalResultCache
+        self.cache = TerminalResultCache(maxsize=2)
+
+    def _result(self, task_id, status):
+        from retire_cluster.tasks import TaskResult
+        return TaskResult(task_id=task_id, status=status)
+
+    def test_only_terminal_results_are_cached(self):
+        """Test running results are never cached"""
+        from retire_cluster.tasks import TaskStatus
+
+        self.cache.put("a", self._result("a", TaskStatus.RUNNING))
+        self.cache.put("b", None)
+        self.assertEqual(len(self.cache), 0)
+
+        done = self._result("a", TaskStatus.SUCCESS)
+        self.cache.put("a", done)
+        self.assertIs(self.cache.get("a"), done)
+
+    def test_least_recently_used_is_evicted(self):
+        """Test the cache stays within maxsize"""
+        from retire_cluster.tasks import TaskStatus
+
+        for task_id in ("a", "b"):
+            self.cache.put(task_id, self._result(task_id, TaskStatus.SUCCESS))
+        self.cache.get("a")
+        self.cache.put("c", self._result("c", TaskStatus.FAILED))
+
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+    def test_integration_polls_cluster_once_for_finished_task(self):
+        """Test repeated polls of a finished task hit the cache"""
+        from retire_cluster.tasks import TaskStatus, TemporalIntegration
+
+        client = Mock()
+        client.get_task_result.return_value = self._result("task-1", TaskStatus.SUCCESS)
+
+        integration = TemporalIntegration(client)
+        integration._workflows["wf-1"] = {'task_id': "task-1", 'status': 'running'}
+
+        for _ in range(3):
+            self.assertEqual(integration.get_task_result("wf-1").status, TaskStatus.SUCCESS)
+            self.assertEqual(integration.get_task_status("wf-1"), TaskStatus.SUCCESS)
+
+        client.get_task_result.assert_called_once_with("task-1")
+        client.get_task_status.assert_not_called()
+
+
+class TestCeleryIntegration(unittest.TestCase):
+    """Test the Celery task body against an in-process scheduler"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        from retire_cluster.tasks import TaskQueue, TaskScheduler, CeleryIntegration
+        self.queue = TaskQueue()
+        self.scheduler = TaskScheduler(self.queue)
+        self.integration = CeleryIntegration(self.scheduler)
+        self.celery_task = Mock()
+        self.celery_task.request.id = "celery-1"
+
+    def _finish_submitted_task(self, result_data):
+        """Complete the first task submitted to the queue, as a worker would"""
+        import time
+        from retire_cluster.tasks import TaskResult, TaskStatus
+
+        deadline = time.monotonic() + 5
+        while not self.integration._task_mapping and time.monotonic() < deadline:
+            time.sleep(0.01)
+        task_id = self.integration._task_mapping["celery-1"]
+        self.queue.get_task(task_id).result = TaskResult(
+            task_id=task_id, status=TaskStatus.SUCCESS, result_data=result_data
+        )
+        self.queue.update_task_status(task_id, TaskStatus.SUCCESS)
+
+    def test_waits_for_queue_event_instead_of_retrying(self):
+        """Test the task blocks until the cluster task finishes, without Celery retries"""
+        import threading
+
+        worker = threading.Thread(target=self._finish_submitted_task, args=({"answer": 42},))
+        worker.start()
+        try:
+            result = self.integration._execute_on_cluster(self.celery_task, "echo", {"x": 1})
+        finally:
+            worker.join()
+
+        self.assertEqual(result, {"answer": 42})
+        self.celery_task.retry.assert_not_called()
+
+    def test_wait_times_out(self):
+        """Test a task that never finishes raises once its timeout passes"""
+        self.assertFalse(self.scheduler.wait_for_task("missing", timeout=0.01))
+        with self.assertRaises(TimeoutError):
+            self.integration._execute_on_cluster(
+                self.celery_task, "echo", {}, {"timeout_seconds": 0.05}
+            )
+        self.celery_task.retry.assert_not_called()
+
+
+class TestSimpleTaskBridge(unittest.TestCase):
+    """Test the HTTP task bridge endpoints"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        from retire_cluster.tasks.integrations import SimpleTaskBridge
+        self.cluster_client = Mock()
+        self.cluster_client.submit_task.return_value = "task-1"
+        self.bridge = SimpleTaskBridge(self.cluster_client)
+        if not self.bridge.flask_available:
+            self.skipTest("Flask not installed")
+        self.client = self.bridge._create_flask_app().test_client()
+
+    def test_submit_task(self):
+        """Test a valid submission is passed to the cluster"""
+        response = self.client.post('/tasks', data=b'{"task_type": "echo", "payload": {"x": 1}}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'task_id': 'task-1', 'status': 'submitted'})
+
+    def test_malformed_body_is_rejected(self):
+        """Test bad JSON and non-object bodies get a 400 rather than a 500"""
+        for body in (b'', b'{not json', b'[1, 2]', b'"echo"'):
+            with self.subTest(body=body):
+                response = self.client.post('/tasks', data=body)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.get_json())
+
+        self.cluster_client.submit_task.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,699 @@
+"""
+Test suite for task queue and scheduler
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestTaskQueue(unittest.TestCase):
+    """Test task queue functionality"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        from retire_cluster.tasks import TaskQueue
+        self.queue = TaskQueue()
+        self.capabilities = {
+            "cpu_count": 4,
+            "memory_total_gb": 8,
+            "platform": "linux",
+            "role": "worker",
+            "tags": ["python"],
+        }
+
+    def _make_task(self, task_type="echo", **kwargs):
+        from retire_cluster.tasks import Task
+        return Task(task_type=task_type, payload={}, **kwargs)
+
+    def test_add_and_get_next_task(self):
+        """Test that queued tasks are handed out by priority"""
+        from retire_cluster.tasks import TaskStatus, TaskPriority
+
+        low = self._make_task(priority=TaskPriority.LOW)
+        high = self._make_task(priority=TaskPriority.HIGH)
+        self.queue.add_task(low)
+        self.queue.add_task(high)
+
+        self.assertEqual(low.status, TaskStatus.QUEUED)
+
+        task = self.queue.get_next_task("device-1", self.capabilities)
+        self.assertIs(task, high)
+        self.assertEqual(task.status, TaskStatus.ASSIGNED)
+        self.assertEqual(task.assigned_device_id, "device-1")
+
+        self.assertIs(self.queue.get_next_task("device-1", self.capabilities), low)
+        self.assertIsNone(self.queue.get_next_task("device-1", self.capabilities))
+
+    def test_duplicate_task_rejected(self):
+        """Test adding the same task twice"""
+        task = self._make_task()
+        self.queue.add_task(task)
+
+        with self.assertRaises(ValueError):
+            self.queue.add_task(task)
+
+    def test_generated_task_ids_are_unique(self):
+        """Test generated ids are distinct and explicit ids are kept"""
+        ids = {self._make_task().task_id for _ in range(1000)}
+        self.assertEqual(len(ids), 1000)
+        self.assertEqual(self._make_task(task_id="fixed").task_id, "fixed")
+
+    def test_listener_can_reenter_queue(self):
+        """Test listeners are called outside the queue lock"""
+        events = []
+
+        def listener(event_type, task):
+            # Calling back into the queue must not deadlock
+            events.append((event_type, self.queue.get_task(task.task_id)))
+
+        self.queue.add_listener(listener)
+        task = self._make_task()
+        self.queue.add_task(task)
+        self.queue.get_next_task("device-1", self.capabilities)
+        self.queue.flush_events()
+
+        self.assertEqual([e for e, _ in events], ['task_added', 'task_assigned'])
+        self.assertTrue(all(t is task for _, t in events))
+
+    def test_listeners_receive_task_snapshots(self):
+        """Test listeners see the task as it was when the event fired"""
+        from retire_cluster.tasks import TaskStatus
+
+        statuses = []
+        self.queue.add_listener(lambda event_type, task: statuses.append((event_type, task.status)))
+
+        task = self._make_task()
+        self.queue.add_task(task)
+        self.queue.get_next_task("device-1", self.capabilities)
+        self.queue.update_task_status(task.task_id, TaskStatus.SUCCESS)
+        self.queue.flush_events()
+
+        self.assertEqual(statuses, [
+            ('task_added', TaskStatus.QUEUED),
+            ('task_assigned', TaskStatus.ASSIGNED),
+            ('task_status_changed', TaskStatus.SUCCESS),
+        ])
+
+    def test_async_listener(self):
+        """Test events are delivered into an asyncio queue"""
+        import asyncio
+
+        async def run():
+            events = await self.queue.add_async_listener()
+            task = self._make_task()
+            self.queue.add_task(task)
+            event_type, snapshot = await asyncio.wait_for(events.get(), timeout=5)
+            self.queue.remove_async_listener(events)
+            return event_type, snapshot.task_id, task.task_id
+
+        event_type, received_id, task_id = asyncio.run(run())
+        self.assertEqual(event_type, 'task_added')
+        self.assertEqual(received_id, task_id)
+
+    def test_failing_listener_does_not_break_queue(self):
+        """Test a raising listener is isolated from the queue"""
+        def listener(event_type, task):
+            raise RuntimeError("boom")
+
+        self.queue.add_listener(listener)
+        task = self._make_task()
+        self.queue.add_task(task)
+        self.queue.flush_events()
+
+        self.assertIs(self.queue.get_task(task.task_id), task)
+
+    def test_update_status_and_device_tasks(self):
+        """Test status updates clean up device assignments"""
+        from retire_cluster.tasks import TaskStatus
+
+        task = self._make_task()
+        self.queue.add_task(task)
+        self.queue.get_next_task("device-1", self.capabilities)
+        self.assertEqual(self.queue.get_tasks_by_device("device-1"), [task])
+
+        self.queue.update_task_status(task.task_id, TaskStatus.RUNNING)
+        self.assertEqual(self.queue.get_running_tasks_count(), 1)
+
+        self.queue.update_task_status(task.task_id, TaskStatus.SUCCESS)
+        self.assertEqual(self.queue.get_tasks_by_device("device-1"), [])
+        self.assertEqual(self.queue.get_tasks_by_status(TaskStatus.SUCCESS), [task])
+
+    def test_transition_timestamps(self):
+        """Test transition times read back as stable wall-clock datetimes"""
+        from datetime import datetime, timezone, timedelta
+        from retire_cluster.tasks import TaskStatus
+
+        task = self._make_task()
+        self.queue.add_task(task)
+        self.assertIsNone(task.assigned_at)
+
+        self.queue.get_next_task("device-1", self.capabilities)
+        self.queue.update_task_status(task.task_id, TaskStatus.RUNNING)
+        self.queue.update_task_status(task.task_id, TaskStatus.SUCCESS)
+
+        now = datetime.now(timezone.utc)
+        for moment in (task.assigned_at, task.started_at, task.completed_at):
+            self.assertLess(abs(now - moment), timedelta(seconds=5))
+        self.assertIs(task.completed_at, task.completed_at)
+        self.assertEqual(task.to_dict()['completed_at'], task.completed_at.isoformat())
+
+    def test_cleanup_completed_tasks(self):
+        """Test only sufficiently old terminal tasks are removed"""
+        from datetime import datetime, timezone, timedelta
+        from retire_cluster.tasks import Task, TaskStatus
+
+        done = self._make_task()
+        running = self._make_task()
+        for task in (done, running):
+            self.queue.add_task(task)
+        self.queue.update_task_status(done.task_id, TaskStatus.SUCCESS)
+        self.queue.update_task_status(running.task_id, TaskStatus.RUNNING)
+
+        self.assertEqual(self.queue.cleanup_completed_tasks(max_age_seconds=3600), 0)
+        self.assertEqual(self.queue.cleanup_completed_tasks(max_age_seconds=0), 1)
+        self.assertIsNone(self.queue.get_task(done.task_id))
+        self.assertIs(self.queue.get_task(running.task_id), running)
+
+        # Restored tasks only carry a wall-clock completion time
+        restored = Task.from_dict(done.to_dict())
+        restored.completed_at = datetime.now(timezone.utc) - timedelta(hours=2)
+        self.queue.add_task(restored)
+        self.assertEqual(self.queue.cleanup_completed_tasks(max_age_seconds=3600), 1)
+
+    def test_cancel_task(self):
+        """Test cancelling a queued task"""
+        from retire_cluster.tasks import TaskStatus
+
+        task = self._make_task()
+        self.queue.add_task(task)
+
+        self.assertTrue(self.queue.cancel_task(task.task_id))
+        self.assertEqual(task.status, TaskStatus.CANCELLED)
+        self.assertFalse(self.queue.cancel_task(task.task_id))
+        self.assertIsNone(self.queue.get_next_task("device-1", self.capabilities))
+
+    def test_cancelled_tasks_leave_priority_queue(self):
+        """Test cancelled tasks are removed from the priority queue"""
+        tasks = [self._make_task() for _ in range(10)]
+        for task in tasks:
+            self.queue.add_task(task)
+
+        for task in tasks[:9]:
+            self.queue.cancel_task(task.task_id)
+
+        stats = self.queue.get_queue_statistics()
+        self.assertEqual(stats['priority_queue_size'], 1)
+        self.assertIs(self.queue.get_next_task("device-1", self.capabilities), tasks[9])
+
+    def test_statistics_track_transitions(self):
+        """Test incremental statistics match the tasks held"""
+        from collections import Counter
+        from retire_cluster.tasks import TaskStatus, TaskPriority
+
+        tasks = [self._make_task(priority=p) for p in (TaskPriority.LOW, TaskPriority.HIGH, TaskPriority.HIGH)]
+        for task in tasks:
+            self.queue.add_task(task)
+
+        running = self.queue.get_next_task("device-1", self.capabilities)
+        self.queue.update_task_status(running.task_id, TaskStatus.RUNNING)
+        failed = self.queue.get_next_task("device-2", self.capabilities)
+        self.queue.update_task_status(failed.task_id, TaskStatus.FAILED)
+        self.queue.retry_failed_task(failed.task_id)
+        self.queue.cancel_task(tasks[0].task_id)
+
+        stats = self.queue.get_queue_statistics()
+        self.assertEqual(stats['by_status'], dict(Counter(t.status.value for t in tasks)))
+        self.assertEqual(stats['by_priority'], {TaskPriority.LOW.value: 1, TaskPriority.HIGH.value: 2})
+        self.assertEqual(stats['by_device'], {"device-1": 1})
+        self.assertEqual(self.queue.get_running_tasks_count(), 1)
+        self.assertEqual(self.queue.get_pending_tasks_count(), 1)
+        for status in TaskStatus:
+            self.assertEqual(self.queue.get_tasks_by_status(status),
+                             [t for t in tasks if t.status == status])
+
+        self.queue.update_task_status(running.task_id, TaskStatus.SUCCESS)
+        self.queue.cleanup_completed_tasks(max_age_seconds=0)
+        stats = self.queue.get_queue_statistics()
+        self.assertEqual(stats['by_status'], {TaskStatus.QUEUED.value: 1})
+        self.assertEqual(stats['by_device'], {})
+        self.assertEqual(self.queue.get_tasks_by_status(TaskStatus.SUCCESS), [])
+        self.assertEqual(self.queue.get_tasks_by_status(TaskStatus.QUEUED), [failed])
+
+    def test_requirements_matching(self):
+        """Test tasks are only handed to devices meeting requirements"""
+        from retire_cluster.tasks.task import TaskRequirements
+
+        task = self._make_task(requirements=TaskRequirements(min_cpu_cores=8))
+        self.queue.add_task(task)
+
+        self.assertIsNone(self.queue.get_next_task("device-1", self.capabilities))
+
+        big_device = dict(self.capabilities, cpu_count=16)
+        self.assertIs(self.queue.get_next_task("device-2", big_device), task)
+
+    def test_requirements_are_frozen_and_hashable(self):
+        """Test equal requirements hash alike regardless of tag order"""
+        from dataclasses import FrozenInstanceError
+        from retire_cluster.tasks.task import TaskRequirements
+
+        first = TaskRequirements(required_tags=["python", "cuda"])
+        second = TaskRequirements(required_tags=("cuda", "python"))
+
+        self.assertEqual(first, second)
+        self.assertEqual(len({first, second}), 1)
+        self.assertEqual(first.required_tags, frozenset({"python", "cuda"}))
+        self.assertEqual(TaskRequirements(**first.to_dict()), first)
+        with self.assertRaises(FrozenInstanceError):
+            first.gpu_required = True
+
+    def test_requirements_dict_is_cached_but_not_shared(self):
+        """Test callers can modify to_dict output without affecting later calls"""
+        from retire_cluster.tasks.task import TaskRequirements
+
+        requirements = TaskRequirements(required_tags=["python", "cuda"], min_cpu_cores=2)
+        data = requirements.to_dict()
+        self.assertEqual(data['required_tags'], ["cuda", "python"])
+        data['required_tags'].append("arm")
+        data['min_cpu_cores'] = 64
+
+        again = requirements.to_dict()
+        self.assertEqual(again['required_tags'], ["cuda", "python"])
+        self.assertEqual(again['min_cpu_cores'], 2)
+        self.assertIsNone(TaskRequirements().to_dict()['required_tags'])
+
+    def test_unfit_head_task_does_not_block_queue(self):
+        """Test a device still gets work when the top task needs another device"""
+        from retire_cluster.tasks import TaskPriority
+        from retire_cluster.tasks.task import TaskRequirements
+
+        gpu_task = self._make_task(
+            priority=TaskPriority.URGENT,
+            requirements=TaskRequirements(gpu_required=True)
+        )
+        plain_task = self._make_task(priority=TaskPriority.LOW)
+        self.queue.add_task(gpu_task)
+        self.queue.add_task(plain_task)
+
+        self.assertIs(self.queue.get_next_task("device-1", self.capabilities), plain_task)
+
+        gpu_device = dict(self.capabilities, has_gpu=True)
+        self.assertIs(self.queue.get_next_task("device-2", gpu_device), gpu_task)
+
+
+class TestTaskSerialization(unittest.TestCase):
+    """Test task serialization round trips"""
+
+    def _finished_task(self):
+        from retire_cluster.tasks import Task, TaskResult, TaskStatus, TaskPriority
+        from retire_cluster.tasks.task import TaskRequirements
+
+        task = Task(
+            task_type="echo",
+            payload={"message": "hi"},
+            priority=TaskPriority.HIGH,
+            requirements=TaskRequirements(min_cpu_cores=2, required_tags=["python"])
+        )
+        task.assign_to_device("device-1")
+        task.start_execution()
+        task.complete_success(TaskResult(task_id=task.task_id, status=TaskStatus.SUCCESS,
+                                         result_data={"echo": "hi"}))
+        return task
+
+    def test_json_round_trip(self):
+        """Test a finished task survives to_json/from_json"""
+        import copy
+        from retire_cluster.tasks import Task
+
+        task = self._finished_task()
+
+        for pretty in (False, True):
+            with self.subTest(pretty=pretty):
+                restored = Task.from_json(task.to_json(pretty=pretty))
+                self.assertEqual(restored.to_dict(), task.to_dict())
+
+        snapshot = copy.copy(task)
+        self.assertEqual(snapshot.completed_at, task.completed_at)
+        self.assertFalse(hasattr(task, '__dict__'))
+
+    def test_msgpack_round_trip(self):
+        """Test a finished task survives to_msgpack/from_msgpack"""
+        from retire_cluster.tasks import Task
+        from retire_cluster.tasks.task import MSGPACK_AVAILABLE
+
+        task = self._finished_task()
+        if not MSGPACK_AVAILABLE:
+            with self.assertRaises(ImportError):
+                task.to_msgpack()
+            self.skipTest("msgpack not installed")
+
+        payload = task.to_msgpack()
+        self.assertIsInstance(payload, bytes)
+        self.assertEqual(Task.from_msgpack(payload).to_dict(), task.to_dict())
+
+
+class TestTaskScheduler(unittest.TestCase):
+    """Test task scheduler device selection"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        from retire_cluster.tasks import TaskQueue, TaskScheduler
+        self.queue = TaskQueue()
+        self.scheduler = TaskScheduler(self.queue)
+        self.scheduler.register_device("linux-001", {
+            "cpu_count": 4, "memory_total_gb": 8, "platform": "Linux",
+            "role": "worker", "tags": ["python"],
+        })
+        self.scheduler.register_device("gpu-001", {
+            "cpu_count": 16, "memory_total_gb": 64, "platform": "linux",
+            "role": "compute", "tags": ["python", "cuda"], "has_gpu": True,
+        })
+
+    def _make_task(self, task_type="echo", **kwargs):
+        from retire_cluster.tasks import Task
+        return Task(task_type=task_type, payload={}, **kwargs)
+
+    def test_find_best_device_respects_requirements(self):
+        """Test requirement filtering picks only capable devices"""
+        from retire_cluster.tasks.task import TaskRequirements
+
+        online = self.scheduler.get_online_devices()
+        cases = [
+            (TaskRequirements(gpu_required=True), "gpu-001"),
+            (TaskRequirements(required_tags=["cuda"]), "gpu-001"),
+            (TaskRequirements(min_memory_gb=32), "gpu-001"),
+            (TaskRequirements(required_role="worker"), "linux-001"),
+            (TaskRequirements(required_platform="LINUX", required_role="worker"), "linux-001"),
+            (TaskRequirements(required_platform="android"), None),
+        ]
+
+        for requirements, expected in cases:
+            with self.subTest(requirements=requirements):
+                task = self._make_task(requirements=requirements)
+                self.assertEqual(self.scheduler._find_best_device_for_task(task, online), expected)
+
+    def test_capability_index_matches_requirement_check(self):
+        """Test index lookups agree with per-device requirement checks"""
+        from retire_cluster.tasks.scheduler import CapabilityIndex
+        from retire_cluster.tasks.task import TaskRequirements
+
+        fingerprints = self.scheduler._device_fingerprints
+        index = CapabilityIndex(fingerprints)
+        cases = [
+            TaskRequirements(min_cpu_cores=4),
+            TaskRequirements(min_cpu_cores=5, required_tags=["python"]),
+            TaskRequirements(min_memory_gb=8, min_storage_gb=1),
+            TaskRequirements(required_platform="linux", gpu_required=True),
+            TaskRequirements(required_role="worker", required_tags=["cuda"]),
+            TaskRequirements(required_tags=["python"]),
+        ]
+
+        for requirements in cases:
+            with self.subTest(requirements=requirements):
+                expected = {d for d, fp in fingerprints.items() if requirements.is_satisfied_by(fp)}
+                self.assertEqual(index.eligible(requirements), expected)
+        self.assertIsNone(index.eligible(TaskRequirements()))
+
+    def test_eligibility_is_memoized_until_devices_change(self):
+        """Test eligibility is reused for equal requirements and reset on registration"""
+        from retire_cluster.tasks.task import TaskRequirements
+
+        index = self.scheduler._get_capability_index()
+        first = index.eligible(TaskRequirements(required_tags=["python"]))
+        self.assertIs(index.eligible(TaskRequirements(required_tags=["python"])), first)
+
+        self.scheduler.register_device("linux-002", {"cpu_count": 2, "tags": ["python"]})
+        index = self.scheduler._get_capability_index()
+        self.assertIn("linux-002", index.eligible(TaskRequirements(required_tags=["python"])))
+
+    def test_find_best_device_prefers_least_loaded(self):
+        """Test load balancing across capable devices"""
+        self.scheduler.device_affinity_enabled = False
+        self.scheduler._device_loads["linux-001"] = 3
+
+        task = self._make_task()
+        online = self.scheduler.get_online_devices()
+        self.assertEqual(self.scheduler._find_best_device_for_task(task, online), "gpu-001")
+
+    def test_schedule_tasks_assigns_queued_tasks(self):
+        """Test a scheduling round routes tasks to device queues"""
+        from retire_cluster.tasks.task import TaskRequirements
+
+        task = self._make_task(requirements=TaskRequirements(gpu_required=True))
+        self.scheduler.submit_task(task)
+        self.scheduler._schedule_tasks()
+
+        self.assertEqual(self.scheduler.stats['tasks_scheduled'], 1)
+        gpu_caps = self.scheduler.get_device_capabilities("gpu-001")
+        self.assertIs(self.queue.get_next_task("gpu-001", gpu_caps), task)
+
+    def test_schedule_tasks_skips_round_without_queued_tasks(self):
+        """Test an empty queue short-circuits the round before partitioning devices"""
+        from unittest.mock import patch
+
+        with patch.object(self.scheduler, 'get_online_devices') as online:
+            self.scheduler._schedule_tasks()
+        online.assert_not_called()
+
+        task = self._make_task()
+        self.scheduler.submit_task(task)
+        self.assertEqual(self.queue.queued_count(), 1)
+        self.scheduler._schedule_tasks()
+        self.assertEqual(self.queue.queued_count(), 0)
+
+    def test_schedule_tasks_spreads_batch_across_devices(self):
+        """Test tentative assignments in a round count towards device load"""
+        self.scheduler.device_affinity_enabled = False
+        self.scheduler.max_tasks_per_device = 2
+
+        tasks = [self._make_task() for _ in range(5)]
+        for task in tasks:
+            self.scheduler.submit_task(task)
+        self.scheduler._schedule_tasks()
+
+        self.assertEqual(self.scheduler.stats['tasks_scheduled'], 4)
+        stats = self.queue.get_queue_statistics()
+        self.assertEqual(stats['device_queues'], {"linux-001": 2, "gpu-001": 2})
+        self.assertEqual(stats['priority_queue_size'], 1)
+
+    def test_stale_heartbeat_marks_device_offline(self):
+        """Test devices are partitioned by heartbeat age"""
+        self.scheduler._device_heartbeats["linux-001"] -= self.scheduler.heartbeat_timeout + 1
+
+        self.assertEqual(self.scheduler.get_online_devices(), ["gpu-001"])
+        self.assertEqual(self.scheduler._partition_devices()[1], ["linux-001"])
+
+        self.scheduler.update_device_heartbeat("linux-001")
+        self.assertEqual(self.scheduler.get_online_devices(), ["linux-001", "gpu-001"])
+
+    def test_load_heap_matches_best_device_search(self):
+        """Test heap-based placement picks the same devices as the linear search"""
+        import heapq
+        import random
+        from retire_cluster.tasks.task import TaskRequirements
+
+        rng = random.Random(7)
+        for i in range(12):
+            self.scheduler.register_device(f"dev-{i:02d}", {
+                "cpu_count": rng.choice([2, 4, 8]), "memory_total_gb": 8,
+                "platform": "linux", "role": rng.choice(["worker", "compute"]),
+                "tags": rng.sample(["python", "cuda", "arm"], 2), "has_gpu": rng.random() < 0.3,
+            })
+            self.scheduler._device_loads[f"dev-{i:02d}"] = rng.randrange(0, 6)
+        self.scheduler._task_device_history = {"typed": "dev-03", "other": "dev-07"}
+        requirement_choices = [
+            TaskRequirements(), TaskRequirements(min_cpu_cores=4),
+            TaskRequirements(required_tags=["cuda"]), TaskRequirements(required_role="compute"),
+            TaskRequirements(gpu_required=True, required_tags=["cuda", "arm"]),
+        ]
+
+        for balancing, scan_min in ((True, 64), (False, 64), (True, 0), (False, 0)):
+            with self.subTest(load_balancing=balancing, direct_scan_min_devices=scan_min):
+                self.scheduler.load_balancing_enabled = balancing
+                self.scheduler.direct_scan_min_devices = scan_min
+                online = self.scheduler.get_online_devices()
+                ranks = {d: r for r, d in enumerate(online)}
+                expected_loads = dict(self.scheduler._device_loads)
+                heap_loads = dict(self.scheduler._device_loads)
+                heap = [(self.scheduler._load_key(heap_loads[d]), r, d) for d, r in ranks.items()
+                        if heap_loads[d] < self.scheduler.max_tasks_per_device]
+                heapq.heapify(heap)
+
+                for _ in range(40):
+                    task = self._make_task(rng.choice(["typed", "other", "plain"]),
+                                           requirements=rng.choice(requirement_choices))
+                    expected = self.scheduler._find_best_device_for_task(task, online, expected_loads)
+                    if expected:
+                        expected_loads[expected] += 1
+                    self.assertEqual(self.scheduler._pop_best_device(task, heap, heap_loads, ranks), expected)
+
+    def test_peek_highest_priority_skips_routed_tasks(self):
+        """Test peeked tasks are in dispatch order and exclude device-routed ones"""
+        from retire_cluster.tasks import TaskPriority
+
+        low = self._make_task(priority=TaskPriority.LOW)
+        urgent = self._make_task(priority=TaskPriority.URGENT)
+        normal = self._make_task()
+        routed = self._make_task(priority=TaskPriority.URGENT)
+        for task in (low, urgent, normal, routed):
+            self.queue.add_task(task)
+        self.queue.assign_task_to_device(routed.task_id, "gpu-001")
+
+        self.assertEqual(self.queue.peek_highest_priority(), [urgent, normal, low])
+        self.assertEqual(self.queue.peek_highest_priority(2), [urgent, normal])
+
+    def test_offline_detection_uses_deadline_heap(self):
+        """Test due deadlines are re-armed or reported offline exactly once"""
+        import time
+
+        now = time.monotonic()
+        due = now + self.scheduler.heartbeat_timeout + 1
+        self.assertEqual(self.scheduler._cleanup_offline_devices(now), [])
+
+        # gpu-001 heartbeats later on, linux-001 stays silent
+        self.scheduler._device_heartbeats["gpu-001"] = now + 100
+        self.assertEqual(self.scheduler._cleanup_offline_devices(due), ["linux-001"])
+        self.assertEqual(self.scheduler._cleanup_offline_devices(due), [])
+        self.assertEqual(self.scheduler._heartbeat_deadlines[0][1], "gpu-001")
+
+        # A heartbeat puts the device back under watch
+        self.scheduler.update_device_heartbeat("linux-001")
+        self.assertIn("linux-001", self.scheduler._deadline_tracked)
+
+    def test_heartbeat_timeout_adapts_to_heartbeat_rate(self):
+        """Test frequent heartbeats shorten the device timeout down to the floor"""
+        self.assertEqual(self.scheduler._device_timeout("gpu-001"), self.scheduler.heartbeat_timeout)
+
+        self.scheduler._heartbeat_intervals["gpu-001"] = 20.0
+        self.assertEqual(self.scheduler._device_timeout("gpu-001"), 60.0)
+
+        self.scheduler._heartbeat_intervals["gpu-001"] = 1.0
+        self.assertEqual(self.scheduler._device_timeout("gpu-001"), self.scheduler.min_heartbeat_timeout)
+
+        self.scheduler.update_device_heartbeat("gpu-001")
+        self.assertLess(self.scheduler._heartbeat_intervals["gpu-001"], 1.0)
+
+    def test_idle_timeout_is_jittered_and_paced(self):
+        """Test the periodic wait varies within the jitter band and excludes round time"""
+        import time
+
+        self.scheduler._heartbeat_deadlines.clear()
+        base = self.scheduler.heartbeat_timeout / 2
+        now = time.monotonic()
+
+        timeouts = {self.scheduler._idle_timeout(now) for _ in range(50)}
+        self.assertGreater(len(timeouts), 1)
+        for timeout in timeouts:
+            self.assertGreaterEqual(timeout, base * 0.9)
+            self.assertLessEqual(timeout, base * 1.1)
+
+        self.scheduler.round_interval_jitter = 0
+        self.assertAlmostEqual(self.scheduler._idle_timeout(now, round_start=now - 10), base - 10)
+        self.assertEqual(self.scheduler._idle_timeout(now, round_start=now - base * 2), 0.0)
+
+    def test_cluster_statistics_cached_until_state_changes(self):
+        """Test statistics are reused within the TTL and refreshed on changes"""
+        first = self.scheduler.get_cluster_statistics()
+        first['cluster_stats']['online_devices'] = 99
+        first['device_stats']['linux-001']['load'] = 99
+        first['queue_stats']['by_status']['queued'] = 99
+        second = self.scheduler.get_cluster_statistics()
+        self.assertEqual(second['cluster_stats']['online_devices'], 2)
+        self.assertEqual(second['device_stats']['linux-001']['load'], 0)
+        self.assertNotIn('queued', second['queue_stats']['by_status'])
+
+        self.scheduler.stats_ttl = 3600
+        self.scheduler.get_cluster_statistics()
+        self.scheduler.register_device("linux-002", {"cpu_count": 2})
+        self.assertEqual(self.scheduler.get_cluster_statistics()['cluster_stats']['online_devices'], 3)
+
+    def test_heartbeats_race_scheduling_rounds(self):
+        """Test concurrent registry changes and heartbeats do not break scheduling rounds"""
+        import threading
+
+        errors = []
+        stop = threading.Event()
+
+        def churn():
+            try:
+                i = 0
+                while not stop.is_set():
+                    device_id = f"churn-{i % 20:02d}"
+                    self.scheduler.register_device(device_id, {"cpu_count": 2})
+                    self.scheduler.update_device_heartbeat(device_id, task_count=i % 3)
+                    if i % 2:
+                        self.scheduler.unregister_device(device_id)
+                    i += 1
+            except Exception as e:
+                errors.append(e)
+
+        worker = threading.Thread(target=churn)
+        worker.start()
+        try:
+            for _ in range(200):
+                self.scheduler.submit_task(self._make_task())
+                online = self.scheduler._partition_devices()[0]
+                self.scheduler._schedule_tasks(online)
+                self.scheduler._cleanup_offline_devices()
+                self.scheduler._update_device_loads()
+        finally:
+            stop.set()
+            worker.join()
+
+        self.assertEqual(errors, [])
+        self.assertGreater(self.scheduler.stats['tasks_scheduled'], 0)
+
+    def test_submit_wakes_scheduler(self):
+        """Test the running scheduler places a new task without waiting for a poll"""
+        import time
+
+        self.scheduler.start()
+        try:
+            task = self._make_task()
+            self.scheduler.submit_task(task)
+
+            deadline = time.monotonic() + 5
+            while self.scheduler.stats['tasks_scheduled'] < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(self.scheduler.stats['tasks_scheduled'], 1)
+        finally:
+            self.scheduler.stop()
+        self.assertFalse(self.scheduler._scheduler_thread.is_alive())
+
+    def test_finished_task_wakes_saturated_scheduler(self):
+        """Test a task finishing on a full device lets the next queued task be placed promptly"""
+        import time
+        from retire_cluster.tasks import TaskStatus
+
+        self.scheduler.unregister_device("gpu-001")
+        self.scheduler.max_tasks_per_device = 1
+
+        def wait_for(condition, timeout=5):
+            deadline = time.monotonic() + timeout
+            while not condition() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            return condition()
+
+        self.scheduler.start()
+        try:
+            self.scheduler.submit_task(self._make_task())
+            self.assertTrue(wait_for(lambda: self.scheduler.stats['tasks_scheduled'] == 1))
+            running = self.queue.get_next_task("linux-001", {"cpu_count": 4})
+            self.assertIsNotNone(running)
+            self.queue.flush_events()
+
+            # The device is now full, so the next task stays queued
+            self.scheduler.submit_task(self._make_task())
+            self.assertFalse(wait_for(lambda: self.scheduler.stats['tasks_scheduled'] == 2, 0.3))
+
+            # Finished through the queue, as a worker result would be, with no heartbeat
+            self.queue.update_task_status(running.task_id, TaskStatus.SUCCESS)
+            self.assertTrue(wait_for(lambda: self.scheduler.stats['tasks_scheduled'] == 2))
+        finally:
+            self.scheduler.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
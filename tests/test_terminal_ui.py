@@ -49,6 +49,37 @@ class TestTerminalRenderer(unittest.TestCase):
         self.assertIn("laptop-002", table)
         self.assertIn("raspi-003", table)
     
+    def test_write_matches_render(self):
+        """Test streamed tables and logs match their rendered strings"""
+        import io
+        
+        data = [{"id": "android-001", "cpu": 42}, {"id": "raspi-003", "cpu": 0}]
+        logs = [{"timestamp": "10:30:15", "level": "INFO", "message": "up"}]
+        
+        out = io.StringIO()
+        self.renderer.write_table(out, data, headers=["ID", "CPU"], fields=["id", "cpu"])
+        self.assertEqual(out.getvalue(),
+                         self.renderer.render_table(data, ["ID", "CPU"], ["id", "cpu"]) + "\n")
+        
+        out = io.StringIO()
+        self.renderer.write_log_entries(out, logs)
+        self.assertEqual(out.getvalue(), self.renderer.render_log_entries(logs) + "\n")
+    
+    def test_colored_cells_keep_columns_aligned(self):
+        """Test ANSI color codes do not count toward column widths"""
+        from retire_cluster.web.terminal_renderer import TerminalRenderer
+        
+        colored = TerminalRenderer(colors_enabled=True).colors.green("ok")
+        table = self.renderer.render_table(
+            [{"status": colored, "id": "a"}, {"status": "offline", "id": "b"}],
+            headers=["STATUS", "ID"], fields=["status", "id"]
+        )
+        
+        lines = table.split('\n')
+        self.assertEqual(lines[2], colored + "      a ")
+        self.assertEqual(lines[3], "offline b ")
+        self.assertEqual(self.renderer.align_text(colored, 4, 'right'), "  " + colored)
+    
     def test_render_progress_bar(self):
         """Test rendering progress bar"""
         # Test different percentages
@@ -68,6 +99,12 @@ class TestTerminalRenderer(unittest.TestCase):
             if percentage > 0:
                 self.assertIn(expected_char, bar)
     
+    def test_progress_bar_fill_is_exact_and_clamped(self):
+        """Test progress bars fill exact cells and never exceed their width"""
+        self.assertEqual(self.renderer.render_progress_bar(29, 100).count('█'), 29)
+        self.assertEqual(self.renderer.render_progress_bar(150, 10), '[' + '█' * 10 + ']')
+        self.assertEqual(self.renderer.render_progress_bar(-5, 10), '[' + '░' * 10 + ']')
+    
     def test_render_status_indicator(self):
         """Test rendering status indicators"""
         test_cases = [
@@ -225,6 +262,12 @@ class TestTerminalRenderer(unittest.TestCase):
             formatted = self.renderer.format_duration(seconds)
             self.assertEqual(formatted, expected)
     
+    def test_formatters_cache_by_type(self):
+        """Test memoized formatters keep int and float results apart"""
+        self.assertEqual(self.renderer.format_duration(90), "1m 30s")
+        self.assertEqual(self.renderer.format_duration(90.0), "1.0m 30.0s")
+        self.assertEqual(self.renderer.format_duration(90), "1m 30s")
+    
     def test_wrap_text(self):
         """Test text wrapping utility"""
         long_text = "This is a very long line of text that should be wrapped at a specific width"
@@ -316,6 +359,25 @@ class TestTerminalColors(unittest.TestCase):
         underline_text = self.colors.underline(text)
         if self.colors.enabled:
             self.assertIn('\033[4m', underline_text)  # Underline ANSI code
+    
+    def test_shared_instances(self):
+        """Test get() returns one shared instance per setting"""
+        from retire_cluster.web.terminal_renderer import TerminalColors, TerminalRenderer
+        
+        self.assertIs(TerminalColors.get(True), TerminalColors.get(True))
+        self.assertIsNot(TerminalColors.get(True), TerminalColors.get(False))
+        self.assertFalse(TerminalColors.get(False).enabled)
+        self.assertIs(TerminalRenderer(colors_enabled=True).colors, TerminalColors.get(True))
+    
+    def test_disabled_colors_return_text_unchanged(self):
+        """Test every color helper is a no-op when colors are disabled"""
+        from retire_cluster.web.terminal_renderer import TerminalColors
+        
+        colors = TerminalColors(enabled=False)
+        self.assertEqual(colors.colorize("test", 'red', 'bold'), "test")
+        for method in ('red', 'green', 'yellow', 'blue', 'cyan', 'gray', 'bold', 'underline'):
+            self.assertEqual(getattr(colors, method)("test"), "test")
+        self.assertEqual(TerminalColors(enabled=True).red("test"), "\033[31mtest\033[0m")
 
 
 class TestASCIIArt(unittest.TestCase):